@@ -0,0 +1,87 @@
+# astcache.py
+"""On-disk cache of parsed ASTs, in the spirit of Python's __pycache__.
+
+Each script gets a `__bscache__/<file name>.<tag>.bsc` file next to it, or under
+the directory named by BSCACHEPREFIX. A cache file holds a magic number, a
+SHA-256 of the interpreter tag plus the source text, and the marshalled AST.
+Any mismatch simply falls back to lexing and parsing again.
+"""
+
+import hashlib
+import marshal
+import os
+from lexer import iter_tokens
+from parser import Parser, AST_VERSION
+from interpreter import VERSION
+
+MAGIC = b'BSC\x01'
+CACHE_DIRNAME = '__bscache__'
+CACHE_TAG = f"bs-{VERSION}-ast{AST_VERSION}"
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+def cache_path(filename, cache_prefix=None):
+    if cache_prefix is None:
+        cache_prefix = os.environ.get('BSCACHEPREFIX')
+    directory, name = os.path.split(os.path.abspath(filename))
+    if cache_prefix:
+        # Mirror the script's absolute directory under the prefix
+        directory = os.path.join(cache_prefix, os.path.splitdrive(directory)[1].lstrip(os.sep))
+    else:
+        directory = os.path.join(directory, CACHE_DIRNAME)
+    # Keep the extension: foo.bs and foo.lava are different scripts
+    return os.path.join(directory, f"{name}.{CACHE_TAG}.bsc")
+
+def source_digest(code):
+    return hashlib.sha256(CACHE_TAG.encode() + b'\0' + code.encode('utf-8')).digest()
+
+def read_cached_ast(path, digest):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    header_size = len(MAGIC) + DIGEST_SIZE
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC):header_size] != digest:
+        return None
+    try:
+        return marshal.loads(data[header_size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+def write_cached_ast(path, digest, ast):
+    """Best effort: an unwritable cache directory, or an AST marshal can't
+    store, just means no caching"""
+    try:
+        data = MAGIC + digest + marshal.dumps(ast)
+    except ValueError:
+        return
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        # Don't leave a partial temp file behind
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+def load_ast(filename, code, use_cache=True, lexer="regex", cache_prefix=None):
+    """Return the AST for a script's source, reusing the on-disk cache when it matches"""
+    if not use_cache:
+        return Parser(iter_tokens(code, lexer)).parse()
+
+    path = cache_path(filename, cache_prefix)
+    digest = source_digest(code)
+    ast = read_cached_ast(path, digest)
+    if ast is not None:
+        return ast
+
+    parser = Parser(iter_tokens(code, lexer))
+    ast = parser.parse()
+    # Scripts with syntax errors are never cached so the errors show up on every run
+    if not parser.errors:
+        write_cached_ast(path, digest, ast)
+    return ast
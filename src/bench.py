@@ -0,0 +1,743 @@
+# bench.py
+"""Micro-benchmarks for the BS-Lang toolchain.
+
+Usage: python bench.py [benchmark ...]
+Runs every benchmark when none is named.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import io
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from lexer import iter_tokens, tokenize, pack_tokens, LEXER_ENGINES
+from parser import parse
+from astcache import load_ast, cache_path
+
+
+def generate_source(lines):
+    """Build a synthetic but representative .bs program of at least the given
+    line count, always ending on a complete function"""
+    chunk = [
+        'on_read{{generated helper}}',
+        'cook helper_{i}(a, b) {{',
+        '    sigma total_{i} = a * 2 + b / 3.5 - 1',
+        '    rizz_check total_{i} >= 10 frfr slay maybe cap {{',
+        '        hawk_tuah("big " + total_{i})',
+        '    }} nah_fam {{',
+        '        squad xs_{i} = [1, -2, "three", slay, nvm]',
+        '    }}',
+        '    yeet total_{i}',
+        '}}',
+    ]
+    out = []
+    i = 0
+    while len(out) < lines:
+        out.extend(line.format(i=i) for line in chunk)
+        i += 1
+    return '\n'.join(out) + '\n'
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def bench_lexer():
+    """Token throughput per engine; tests/test_lexer.py checks they agree"""
+    code = generate_source(50000)
+    print(f"lexer: timing {len(code) / 1e6:.1f} MB")
+
+    for engine in LEXER_ENGINES:
+        elapsed, count = best_of(lambda: sum(1 for _ in iter_tokens(code, engine)))
+        print(f"  {engine:>6}: {count / elapsed:>12,.0f} tokens/sec ({elapsed * 1000:.0f} ms)")
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_parse():
+    code = generate_source(100000)
+    front_ends = {
+        'token list': lambda: parse(tokenize(code)),
+        'token stream': lambda: parse(iter_tokens(code)),
+        'token buffer': lambda: parse(pack_tokens(code)),
+    }
+    reference = front_ends['token list']()
+    print("parse: lex + parse of a generated 100k-line script")
+    for name, front_end in front_ends.items():
+        elapsed, ast = best_of(front_end)
+        if ast != reference:
+            raise AssertionError(f"{name} produced a different AST")
+        peak = peak_memory(front_end)
+        print(f"  {name:>12}: {elapsed * 1000:>6.0f} ms, peak {peak / 2**20:>6.1f} MiB")
+
+    buffer = pack_tokens(code)
+    tokens = tokenize(code)
+    print(f"  token storage: list {peak_memory(lambda: tokenize(code)) / 2**20:.1f} MiB,"
+          f" buffer {peak_memory(lambda: pack_tokens(code)) / 2**20:.1f} MiB"
+          f" for {len(tokens):,} tokens")
+    del buffer, tokens
+
+def bench_parallel_parse():
+    """Stress test: parse many programs from a thread pool and compare with serial ASTs"""
+    programs = [generate_source(200 + 37 * i) for i in range(64)]
+    start = time.perf_counter()
+    serial = [parse(iter_tokens(code)) for code in programs]
+    serial_time = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(5):
+            start = time.perf_counter()
+            parallel = list(pool.map(lambda code: parse(iter_tokens(code)), programs))
+            parallel_time = time.perf_counter() - start
+            if parallel != serial:
+                raise AssertionError("parallel parse produced different ASTs")
+    print(f"parallel-parse: {len(programs)} programs x 5 rounds on 8 threads match serial ASTs"
+          f" (serial {serial_time * 1000:.0f} ms, last parallel round {parallel_time * 1000:.0f} ms)")
+
+def bench_startup():
+    """Cold (lex + parse + cache write) versus warm (cache read) script loading"""
+    workdir = tempfile.mkdtemp(prefix='bsbench-')
+    try:
+        print("startup: cold vs warm AST cache")
+        for lines in (100, 2000, 20000):
+            filename = os.path.join(workdir, f'script{lines}.bs')
+            code = generate_source(lines)
+            with open(filename, 'w') as f:
+                f.write(code)
+
+            def cold():
+                if os.path.exists(cache_path(filename)):
+                    os.remove(cache_path(filename))
+                return load_ast(filename, code)
+
+            cold_time, ast = best_of(cold)
+            warm_time, cached = best_of(lambda: load_ast(filename, code))
+            if cached != ast:
+                raise AssertionError("cached AST differs from the parsed one")
+            print(f"  {lines:>6} lines: cold {cold_time * 1000:>7.2f} ms, warm {warm_time * 1000:>7.2f} ms")
+
+        bs_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bs.py')
+        filename = os.path.join(workdir, 'script2000.bs')
+        for label, extra in (('--no-cache', ['--no-cache']), ('cached', [])):
+            elapsed, _ = best_of(lambda: subprocess.run([sys.executable, bs_script] + extra + [filename], check=True))
+            print(f"  whole process, 2000 lines, {label:>10}: {elapsed * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(workdir)
+
+DISPATCH_PROGRAM = """
+cook factorial(n){
+    sigma product = 1
+    flex n > 0 {
+        product = product * n
+        n = n - 1
+    }
+    yeet product
+}
+sigma i = 0
+flex i < 2000 {
+    sigma f = factorial(20)
+    i = i + 1
+}
+"""
+# Nodes dispatched per inner flex iteration: condition (3), product = product * n (4), n = n - 1 (4)
+DISPATCH_NODES_PER_ITERATION = 11
+DISPATCH_ITERATIONS = 2000 * 20
+
+def bench_dispatch():
+    """Per-node dispatch cost of the tree-walking interpreter on a factorial-style loop"""
+    from interpreter import run
+    ast = parse(iter_tokens(DISPATCH_PROGRAM))
+    elapsed, _ = best_of(lambda: run(ast))
+    per_node = elapsed / (DISPATCH_ITERATIONS * DISPATCH_NODES_PER_ITERATION)
+    print(f"dispatch: {elapsed * 1000:.0f} ms for {DISPATCH_ITERATIONS:,} loop iterations,"
+          f" ~{per_node * 1e9:.0f} ns per node")
+
+ENGINE_PROGRAMS = {
+    'factorial loop': DISPATCH_PROGRAM,
+    'nested yap': """
+sigma total = 0
+yap i till 1 to 300 {
+    yap j till 1 to 100 {
+        rizz_check j > i {
+            total = total + 1
+        } nah_fam {
+            total = total - 1
+        }
+    }
+}
+hawk_tuah(total)
+""",
+    'recursive fib': """
+cook fib(n){
+    rizz_check n < 2 {
+        yeet n
+    }
+    sigma a = fib(n - 1)
+    sigma b = fib(n - 2)
+    sigma r = a + b
+    yeet r
+}
+hawk_tuah(fib(18))
+""",
+    'tail recursion': """
+cook sum_to(n, acc){
+    rizz_check n == 0 {
+        yeet acc
+    }
+    yeet sum_to(n - 1, acc + n)
+}
+hawk_tuah(sum_to(20000, 0))
+""",
+}
+
+def run_captured(ast, engine, env=None):
+    """Output of a run; memoization is off unless env says otherwise, so call
+    benchmarks measure calls rather than cache hits"""
+    from interpreter import run, Environment
+    from memo import MemoSettings
+    if env is None:
+        env = Environment(memo=MemoSettings(enabled=False))
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        run(ast, env, engine)
+    return buffer.getvalue()
+
+def bench_engines():
+    """Run loop-heavy programs on every execution engine and compare output and time"""
+    from interpreter import ENGINE_MODULES
+    engines = ['tree'] + list(ENGINE_MODULES)
+    print("engines: " + ", ".join(engines))
+    for name, program in ENGINE_PROGRAMS.items():
+        ast = parse(iter_tokens(program))
+        reference = run_captured(ast, 'tree')
+        timings = []
+        for engine in engines:
+            elapsed, output = best_of(lambda: run_captured(ast, engine))
+            if output != reference:
+                raise AssertionError(f"engine '{engine}' printed different output for {name}")
+            timings.append(elapsed)
+        print(f"  {name:>15}: " + ", ".join(
+            f"{engine} {elapsed * 1000:.0f} ms ({timings[0] / elapsed:.1f}x)"
+            for engine, elapsed in zip(engines, timings)))
+
+CALLS_PROGRAM = """
+cook fib(n){
+    rizz_check n < 2 {
+        yeet n
+    }
+    sigma r = fib(n - 1) + fib(n - 2)
+    yeet r
+}
+hawk_tuah(fib(20))
+"""
+# fib(20) makes 2 * fib(21) - 1 calls
+CALLS_PER_RUN = 2 * 10946 - 1
+
+def bench_calls():
+    """BS-Lang function calls per second on a recursive fibonacci, per engine"""
+    from interpreter import ENGINE_MODULES
+    ast = parse(iter_tokens(CALLS_PROGRAM))
+    reference = run_captured(ast, 'tree')
+    print(f"calls: recursive fib(20), {CALLS_PER_RUN:,} calls per run")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        elapsed, output = best_of(lambda: run_captured(ast, engine))
+        if output != reference:
+            raise AssertionError(f"engine '{engine}' printed different output")
+        print(f"  {engine:>9}: {CALLS_PER_RUN / elapsed:>12,.0f} calls/sec")
+
+OPTIMIZER_PROGRAM = """
+sigma total = 0
+yap i till 1 to 20000 {
+    rizz_check slay frfr nah cap {
+        total = total + 60 * 60 * 24 - 86400 + 1
+    } nah_fam {
+        hawk_tuah("never")
+    }
+    tweet label = "run" + " " + "id"
+}
+hawk_tuah(total)
+"""
+
+def bench_optimizer():
+    """Tree-walker time with and without -O; the optimized AST must print the same output"""
+    from optimizer import optimize
+    print("optimizer: tree engine, plain vs -O")
+    programs = dict(ENGINE_PROGRAMS, **{'constant-heavy loop': OPTIMIZER_PROGRAM})
+    for name, program in programs.items():
+        ast = parse(iter_tokens(program))
+        optimized, report = optimize(ast)
+        plain_time, reference = best_of(lambda: run_captured(ast, 'tree'))
+        optimized_time, output = best_of(lambda: run_captured(optimized, 'tree'))
+        if output != reference:
+            raise AssertionError(f"optimized AST printed different output for {name}")
+        print(f"  {name:>19}: {plain_time * 1000:.0f} ms -> {optimized_time * 1000:.0f} ms;"
+              f" {report.split(': ', 1)[1]}")
+
+TYPED_PROGRAM = """
+sigma i = 0
+sigma total = 0
+tweet label = "n"
+flex i < 30000 {
+    sigma step = i * 2 - 1
+    total = total + step
+    label = "n"
+    i = i + 1
+}
+hawk_tuah(total)
+"""
+
+def bench_types():
+    """Every engine on an -O AST with and without the type inference pass"""
+    from optimizer import Optimizer
+    from typeinfer import infer_types
+    from interpreter import ENGINE_MODULES
+    ast = Optimizer().block(parse(iter_tokens(TYPED_PROGRAM)))
+    typed, count = infer_types(ast)
+    reference = run_captured(ast, 'tree')
+    print(f"types: declare/assign loop, 30,000 iterations, {count} coercions removed")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        checked, _ = best_of(lambda: run_captured(ast, engine))
+        unchecked, output = best_of(lambda: run_captured(typed, engine))
+        if output != reference:
+            raise AssertionError(f"engine '{engine}' printed different output for the typed AST")
+        print(f"  {engine:>9}: {checked * 1000:.0f} ms -> {unchecked * 1000:.0f} ms")
+
+DEEP_RECURSION_PROGRAM = """
+cook depth(n){
+    rizz_check n == 0 {
+        yeet 0
+    }
+    sigma r = depth(n - 1) + 1
+    yeet r
+}
+hawk_tuah(depth(DEPTH))
+"""
+
+def bench_stackless():
+    """Non-tail recursion depth on the stackless engine, and the cost of pausing
+    it after every statement instead of running straight through"""
+    from stackless import Machine, DEFAULT_MEMORY_BUDGET
+    for depth in (900, 50000):
+        ast = parse(iter_tokens(DEEP_RECURSION_PROGRAM.replace('DEPTH', str(depth))))
+        results = []
+        for engine in ('tree', 'stackless'):
+            try:
+                elapsed, output = best_of(lambda: run_captured(ast, engine), repeat=1)
+                results.append(f"{engine} {elapsed * 1000:.0f} ms")
+            except (RuntimeError, RecursionError) as e:
+                results.append(f"{engine} fails ({e})")
+        print(f"stackless: recursion depth {depth:,} ({DEFAULT_MEMORY_BUDGET // 2**20} MB budget): " + ", ".join(results))
+
+    ast = parse(iter_tokens(DISPATCH_PROGRAM))
+    reference = run_captured(ast, 'stackless')
+
+    def stepped():
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            machine = Machine(ast)
+            pauses = 0
+            while not machine.run(statements=1):
+                pauses += 1
+        return buffer.getvalue(), pauses
+
+    straight, _ = best_of(lambda: run_captured(ast, 'stackless'))
+    paused, (output, pauses) = best_of(stepped)
+    if output != reference:
+        raise AssertionError("pausing after every statement changed the output")
+    print(f"  factorial loop: {straight * 1000:.0f} ms straight,"
+          f" {paused * 1000:.0f} ms pausing {pauses:,} times")
+
+MEMO_PROGRAM = """
+cook fib(n){
+    rizz_check n < 2 {
+        yeet n
+    }
+    yeet fib(n - 1) + fib(n - 2)
+}
+cook dist(x, y){
+    sigma dx = x - 5
+    sigma dy = y - 5
+    yeet dx * dx + dy * dy
+}
+sigma total = 0
+yap k till 1 to 100 {
+    yap i till 1 to 10 {
+        yap j till 1 to 10 {
+            total = total + dist(i, j)
+        }
+    }
+}
+hawk_tuah(total)
+hawk_tuah(fib(20))
+"""
+
+def bench_memo():
+    """Pure helpers called with repeated arguments, with and without memoization"""
+    from interpreter import ENGINE_MODULES, Environment
+    from memo import build_memo_table
+    ast = parse(iter_tokens(MEMO_PROGRAM))
+    reference = run_captured(ast, 'tree')
+    print("memo: pure helper over 100 argument pairs, 10,000 calls, plus fib(20)")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        plain, _ = best_of(lambda: run_captured(ast, engine))
+        env = Environment()
+        memoized, output = best_of(lambda: run_captured(ast, engine, env), repeat=1)
+        if output != reference:
+            raise AssertionError(f"engine '{engine}' printed different output with memoization")
+        stats = ", ".join(f"{func[1]} {table.hits}/{table.misses}"
+                          for func, table in env.cache.nodes(build_memo_table).items() if table is not None)
+        print(f"  {engine:>9}: {plain * 1000:.0f} ms -> {memoized * 1000:.0f} ms (hits/misses: {stats})")
+
+CONDITIONS_PROGRAM = """
+sigma i = 0
+sigma hits = 0
+flex i < 100000 {
+    rizz_check i >= 50000 {
+        hits = hits + 1
+    }
+    rizz_check i == 7 maybe nah (i < 99990) {
+        hits = hits + 1
+    }
+    i = i + 1
+}
+hawk_tuah(hits)
+"""
+CONDITION_ITERATIONS = 100000
+
+def bench_conditions():
+    """Loop and branch conditions built from comparisons and logic operators"""
+    from interpreter import ENGINE_MODULES
+    ast = parse(iter_tokens(CONDITIONS_PROGRAM))
+    reference = run_captured(ast, 'tree')
+    print(f"conditions: flex and rizz_check on comparisons, maybe and nah, {CONDITION_ITERATIONS:,} iterations")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        elapsed, output = best_of(lambda: run_captured(ast, engine))
+        if output != reference:
+            raise AssertionError(f"engine '{engine}' printed different output")
+        print(f"  {engine:>9}: {elapsed * 1000:.0f} ms, {elapsed / CONDITION_ITERATIONS * 1e9:.0f} ns per iteration")
+
+SQUAD_PROGRAMS = {
+    'large': """
+squad base = [0]
+squad big = base * 100000
+sigma i = 0
+sigma total = 0
+flex i < 200 {
+    squad view = big
+    total = total + view[i]
+    i = i + 1
+}
+squad edited = big
+edited[0] = 1
+hawk_tuah(total + edited[0] + big[0])
+""",
+    'nested': """
+squad base = [0]
+squad row = base * 300
+squad wrap = [row]
+squad grid = wrap * 300
+yap k till 0 to 299 {
+    squad fresh = row
+    grid[k] = fresh
+}
+sigma i = 0
+sigma total = 0
+flex i < 100 {
+    squad snapshot = grid
+    snapshot[0] = i
+    squad inner = snapshot[1]
+    inner[0] = i
+    total = total + snapshot[0] + inner[0]
+    i = i + 1
+}
+hawk_tuah(total)
+""",
+}
+
+def bench_squads():
+    """Declaring squads from large and nested squads, which copies them"""
+    from interpreter import ENGINE_MODULES
+    for name, program in SQUAD_PROGRAMS.items():
+        ast = parse(iter_tokens(program))
+        reference = run_captured(ast, 'tree')
+        print(f"squads: {name}")
+        for engine in ['tree'] + list(ENGINE_MODULES):
+            elapsed, output = best_of(lambda: run_captured(ast, engine))
+            if output != reference:
+                raise AssertionError(f"engine '{engine}' printed different output")
+            print(f"  {engine:>9}: {elapsed * 1000:.0f} ms")
+
+VECTOR_SIZE_LOG2 = 20
+VECTOR_PROGRAM = """
+squad xs = [0.5]
+yap k till 1 to %d {
+    xs = xs + xs
+}
+squad ys = scale(xs, 2.5) + 1
+hawk_tuah(ys[0] + ys[-1])
+""" % VECTOR_SIZE_LOG2
+
+LOOP_SIZE_LOG2 = 16
+LOOP_PROGRAM = """
+squad xs = [0.5]
+yap k till 1 to %d {
+    xs = xs + xs
+}
+squad ys = xs
+yap i till 0 to %d {
+    ys[i] = xs[i] * 2.5 + 1
+}
+hawk_tuah(ys[0] + ys[-1])
+""" % (LOOP_SIZE_LOG2, 2 ** LOOP_SIZE_LOG2 - 1)
+
+def bench_vectors():
+    """Element-wise arithmetic on a numeric squad versus the same yap loop"""
+    from interpreter import ENGINE_MODULES
+    vector_ast = parse(iter_tokens(VECTOR_PROGRAM))
+    loop_ast = parse(iter_tokens(LOOP_PROGRAM))
+    reference = run_captured(vector_ast, 'tree')
+    if run_captured(loop_ast, 'tree') != reference:
+        raise AssertionError("the yap loop computed something else")
+    vector_size, loop_size = 2 ** VECTOR_SIZE_LOG2, 2 ** LOOP_SIZE_LOG2
+    print(f"vectors: scale(xs, 2.5) + 1 over {vector_size:,} elements vs a yap loop over {loop_size:,}")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        vector, output = best_of(lambda: run_captured(vector_ast, engine))
+        if output != reference:
+            raise AssertionError(f"engine '{engine}' printed different output")
+        loop, _ = best_of(lambda: run_captured(loop_ast, engine))
+        print(f"  {engine:>9}: element-wise {vector * 1000:.0f} ms ({vector / vector_size * 1e9:.0f} ns per element),"
+              f" loop {loop * 1000:.0f} ms ({loop / loop_size * 1e9:.0f} ns per element)")
+
+AGGREGATE_SIZE_LOG2 = 16
+AGGREGATE_SQUAD = """
+squad xs = [3]
+yap k till 1 to %d {
+    xs = xs + (xs * 7 - 5)
+}
+""" % AGGREGATE_SIZE_LOG2
+AGGREGATE_PROGRAMS = {
+    'yap loop': AGGREGATE_SQUAD + """
+sigma total = 0
+sigma low = xs[0]
+sigma high = xs[0]
+yap i till 0 to %d {
+    total = total + xs[i]
+    rizz_check xs[i] < low {
+        low = xs[i]
+    }
+    rizz_check xs[i] > high {
+        high = xs[i]
+    }
+}
+hawk_tuah(total)
+hawk_tuah(low)
+hawk_tuah(high)
+hawk_tuah(total / %d)
+""" % (2 ** AGGREGATE_SIZE_LOG2 - 1, 2 ** AGGREGATE_SIZE_LOG2),
+    'builtins': AGGREGATE_SQUAD + """
+hawk_tuah(sum(xs))
+hawk_tuah(min(xs))
+hawk_tuah(max(xs))
+hawk_tuah(mean(xs))
+""",
+}
+
+def bench_aggregates():
+    """sum/min/max/mean builtins versus computing them with a yap loop"""
+    from interpreter import ENGINE_MODULES
+    asts = {name: parse(iter_tokens(program)) for name, program in AGGREGATE_PROGRAMS.items()}
+    build_ast = parse(iter_tokens(AGGREGATE_SQUAD))
+    reference = run_captured(asts['yap loop'], 'tree')
+    print(f"aggregates: sum, min, max and mean of {2 ** AGGREGATE_SIZE_LOG2:,} ints"
+          f" (times include building the squad)")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        build, _ = best_of(lambda: run_captured(build_ast, engine))
+        timings = [f"building {build * 1000:.1f} ms"]
+        for name, ast in asts.items():
+            elapsed, output = best_of(lambda: run_captured(ast, engine))
+            if output != reference:
+                raise AssertionError(f"{name} on engine '{engine}' printed different output")
+            timings.append(f"{name} {elapsed * 1000:.1f} ms")
+        print(f"  {engine:>9}: {', '.join(timings)}")
+
+SLICE_SIZE_LOG2 = 16
+SLICE_SQUAD = """
+squad xs = [3]
+yap k till 1 to %d {
+    xs = xs + (xs * 7 - 5)
+}
+""" % SLICE_SIZE_LOG2
+SLICE_BOUNDS = (2 ** SLICE_SIZE_LOG2 // 4, 3 * 2 ** SLICE_SIZE_LOG2 // 4)
+SLICE_PROGRAMS = {
+    'scooch loop': SLICE_SQUAD + """
+squad part = []
+yap i till %d to %d {
+    scooch(part, xs[i])
+}
+hawk_tuah(sum(part))
+hawk_tuah(part[-1])
+""" % (SLICE_BOUNDS[0], SLICE_BOUNDS[1] - 1),
+    'slice': SLICE_SQUAD + """
+squad part = xs[%d:%d]
+hawk_tuah(sum(part))
+hawk_tuah(part[-1])
+""" % SLICE_BOUNDS,
+}
+
+def bench_slices():
+    """Taking the middle half of a squad with a slice versus copying it with scooch"""
+    from interpreter import ENGINE_MODULES
+    asts = {name: parse(iter_tokens(program)) for name, program in SLICE_PROGRAMS.items()}
+    build_ast = parse(iter_tokens(SLICE_SQUAD))
+    reference = run_captured(asts['scooch loop'], 'tree')
+    print(f"slices: sum of the middle {SLICE_BOUNDS[1] - SLICE_BOUNDS[0]:,} of {2 ** SLICE_SIZE_LOG2:,} ints"
+          f" (times include building the squad)")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        build, _ = best_of(lambda: run_captured(build_ast, engine))
+        timings = [f"building {build * 1000:.1f} ms"]
+        for name, ast in asts.items():
+            elapsed, output = best_of(lambda: run_captured(ast, engine))
+            if output != reference:
+                raise AssertionError(f"{name} on engine '{engine}' printed different output")
+            timings.append(f"{name} {elapsed * 1000:.1f} ms")
+        print(f"  {engine:>9}: {', '.join(timings)}")
+
+LOOKUP_ENTRIES = 500
+LOOKUP_PROGRAMS = {
+    'parallel squads': """
+squad ids = []
+squad values = []
+yap i till 0 to %(last)d {
+    scooch(ids, i * 7)
+    scooch(values, i * i)
+}
+sigma total = 0
+yap q till 0 to %(last)d {
+    sigma target = (%(last)d - q) * 7
+    sigma j = 0
+    flex ids[j] != target {
+        j = j + 1
+    }
+    total = total + values[j]
+}
+hawk_tuah(total)
+""" % {'last': LOOKUP_ENTRIES - 1},
+    'stash': """
+stash values = {}
+yap i till 0 to %(last)d {
+    values[i * 7] = i * i
+}
+sigma total = 0
+yap q till 0 to %(last)d {
+    total = total + values[(%(last)d - q) * 7]
+}
+hawk_tuah(total)
+""" % {'last': LOOKUP_ENTRIES - 1},
+}
+
+def bench_lookups():
+    """Looking every key up once: a linear scan over parallel squads versus a stash"""
+    from interpreter import ENGINE_MODULES
+    asts = {name: parse(iter_tokens(program)) for name, program in LOOKUP_PROGRAMS.items()}
+    reference = run_captured(asts['parallel squads'], 'tree')
+    print(f"lookups: {LOOKUP_ENTRIES:,} keys, each looked up once (times include building the table)")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        timings = []
+        for name, ast in asts.items():
+            elapsed, output = best_of(lambda: run_captured(ast, engine))
+            if output != reference:
+                raise AssertionError(f"{name} on engine '{engine}' printed different output")
+            timings.append(f"{name} {elapsed * 1000:.1f} ms")
+        print(f"  {engine:>9}: {', '.join(timings)}")
+
+SORT_SIZE = 300
+# A cubic with three roots inside the range, so the squad isn't one sorted run
+SORT_SQUAD = """
+squad xs = []
+yap i till 0 to %d {
+    scooch(xs, (i - 40) * (i - 150) * (i - 260))
+}
+""" % (SORT_SIZE - 1)
+SORT_PROGRAMS = {
+    'bubble sort': SORT_SQUAD + """
+sigma n = len(xs)
+sigma swapped = slay
+flex swapped {
+    swapped = cap
+    sigma j = 1
+    flex j < n {
+        rizz_check xs[j] < xs[j - 1] {
+            sigma held = xs[j]
+            xs[j] = xs[j - 1]
+            xs[j - 1] = held
+            swapped = slay
+        }
+        j = j + 1
+    }
+    n = n - 1
+}
+hawk_tuah(xs)
+""",
+    'sort': SORT_SQUAD + """
+sort(xs)
+hawk_tuah(xs)
+""",
+}
+
+def bench_sort():
+    """Sorting a squad with a bubble sort written in BS-Lang versus the sort builtin"""
+    from interpreter import ENGINE_MODULES
+    asts = {name: parse(iter_tokens(program)) for name, program in SORT_PROGRAMS.items()}
+    reference = run_captured(asts['bubble sort'], 'tree')
+    print(f"sort: {SORT_SIZE:,} ints (times include building the squad)")
+    for engine in ['tree'] + list(ENGINE_MODULES):
+        timings = []
+        for name, ast in asts.items():
+            elapsed, output = best_of(lambda: run_captured(ast, engine))
+            if output != reference:
+                raise AssertionError(f"{name} on engine '{engine}' printed different output")
+            timings.append(f"{name} {elapsed * 1000:.1f} ms")
+        print(f"  {engine:>9}: {', '.join(timings)}")
+
+BENCHMARKS = {
+    'lexer': bench_lexer,
+    'parse': bench_parse,
+    'parallel-parse': bench_parallel_parse,
+    'startup': bench_startup,
+    'dispatch': bench_dispatch,
+    'engines': bench_engines,
+    'calls': bench_calls,
+    'optimizer': bench_optimizer,
+    'stackless': bench_stackless,
+    'memo': bench_memo,
+    'conditions': bench_conditions,
+    'types': bench_types,
+    'squads': bench_squads,
+    'vectors': bench_vectors,
+    'aggregates': bench_aggregates,
+    'slices': bench_slices,
+    'lookups': bench_lookups,
+    'sort': bench_sort,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}', pick from: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
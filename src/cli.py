@@ -0,0 +1,107 @@
+# cli.py
+"""Command line shared by bs.py and lava.py, which differ only in their name,
+script extension and REPL banner."""
+
+import sys
+from lexer import tokenize, iter_tokens
+from parser import parse
+from interpreter import run, Environment
+from astcache import load_ast
+from optimizer import optimize
+import memo
+
+FLAGS = ("[-token] [-ast] [-dis] [-emit-py] [-O] [-shell] [-lexer=regex|scan] [--no-cache] [-cache-dir=DIR]"
+         " [-engine=tree|closure|vm|python|stackless] [-stack-budget=MB] [-no-memo] [-memo-size=N] [-memo-stats]")
+
+def option_value(args, name, default=None):
+    """The value of a name=value flag, or default when it isn't given"""
+    prefix = name + "="
+    return next((arg[len(prefix):] for arg in args if arg.startswith(prefix)), default)
+
+class Options:
+    """The flags of one command line; files are the arguments ending in extension"""
+    def __init__(self, args, extension):
+        self.shell = "-shell" in args
+        self.show_tokens = "-token" in args
+        self.show_ast = "-ast" in args
+        self.show_bytecode = "-dis" in args
+        self.show_python = "-emit-py" in args
+        self.optimize = "-O" in args
+        self.lexer = option_value(args, "-lexer", "regex")
+        self.use_cache = "--no-cache" not in args and "-no-cache" not in args
+        self.cache_dir = option_value(args, "-cache-dir")
+        self.engine = option_value(args, "-engine", "tree")
+        stack_budget = option_value(args, "-stack-budget")
+        self.stack_budget = None if stack_budget is None else int(stack_budget) * 1024 * 1024
+        self.memo = memo.MemoSettings(enabled="-no-memo" not in args,
+                                      cache_size=int(option_value(args, "-memo-size", memo.DEFAULT_CACHE_SIZE)))
+        self.memo_stats = "-memo-stats" in args
+        self.files = [arg for arg in args if arg.endswith(extension)]
+
+def run_lava_file(filename, options):
+    with open(filename, 'r') as f:
+        code = f.read()
+    if options.show_tokens:
+        print("-> TOKENS:", tokenize(code, options.lexer))
+    ast = load_ast(filename, code, options.use_cache, options.lexer, options.cache_dir)
+    if options.optimize:
+        ast, report = optimize(ast)
+        print(report, file=sys.stderr)
+    if options.show_ast:
+        print("-> AST:", ast)
+    if options.show_bytecode:
+        from vm import compile_program, disassemble
+        print("-> BYTECODE:")
+        print(disassemble(compile_program(ast)))
+    if options.show_python:
+        from pygen import generate
+        print("-> PYTHON:")
+        print(generate(ast))
+    env = Environment(memo=options.memo)
+    run(ast, env, options.engine)
+    return env
+
+def repl(options, banner):
+    print(banner)
+    print("Type 'skibidi' to exit.\n")
+
+    # Create environment with built-in functions
+    env = Environment(memo=options.memo)
+
+    while True:
+        try:
+            line = input("-> ")
+            if line.strip() == "skibidi":
+                print("👋 Exiting REPL.")
+                break
+
+            ast = parse(iter_tokens(line))
+            if options.optimize:
+                ast = optimize(ast, whole_program=False)[0]
+            run(ast, env, options.engine)
+
+        except SyntaxError as se:
+            print("-> Syntax Error:", se)
+        except Exception as e:
+            print("-> Error:", e)
+
+def main(args, usage, extension, banner):
+    if not args:
+        print(f"Usage: {usage} {FLAGS} <file{extension}>")
+        sys.exit(1)
+
+    options = Options(args, extension)
+    if options.stack_budget is not None:
+        import stackless
+        stackless.memory_budget = options.stack_budget
+
+    if options.shell:
+        repl(options, banner)
+    else:
+        if not options.files:
+            print(f"Error: No {extension} file provided.")
+            sys.exit(1)
+
+        env = run_lava_file(options.files[0], options)
+        if options.memo_stats:
+            print(memo.report(env.cache), file=sys.stderr)
@@ -0,0 +1,634 @@
+# closures.py
+"""Closure-compilation engine.
+
+The AST is compiled once into nested Python closures. Every closure has its
+operator, variable name and child closures bound when it is built, so running
+a loop body is plain closure calls: no node-type dispatch and no tuple
+unpacking per iteration. Values, coercions and function calls go through the
+same helpers as the tree-walking interpreter, so both engines behave alike.
+
+Inside a cook body, variables the function declares are read and written
+through the frame slots the resolver assigned; `layout` is that function's
+name -> slot map, or None for top-level code, which keeps using names.
+"""
+
+import operator
+import interpreter
+from interpreter import (
+    ReturnValue, Frame, UNBOUND, MAX_RECURSION_DEPTH, call_function, rebind_tail_call, binary_op, print_value, Squad, is_array, resolve_index, slice_squad, yields_bool, compares_order,
+    check_key, stash_get, coerce_squad, coerce_stash, coerce_sigma, coerce_tweet, coerce_assignment,
+)
+from resolver import function_layout, address, bind_locals, CallSite
+from tailcalls import TailCall, mark_block
+from memo import memo_table, MISSING
+
+NUMERIC_TYPES = (int, float)
+# Operator chains longer than this are run by one looping closure
+LONG_CHAIN = 64
+
+# Binary operators safe to apply directly when both operands are int/float.
+# Division is left out because the generic path owns the division-by-zero error.
+FAST_BINARY_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '>': operator.gt,
+    '<': operator.lt,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+def compile_function_body(func, cache):
+    """(node, compiled body, layout, parameter slots) of a FUNCTION node"""
+    layout = function_layout(func)
+    bind_locals(layout, cache)
+    param_slots = tuple(layout[param] for param in func[2])
+    return (func, compile_block(mark_block(func[3], func[1], True), layout), layout, param_slots)
+
+def compiled_function(func, cache):
+    return cache.nodes(compile_function_body).get(func)
+
+def make_frame(func, env):
+    return Frame(compiled_function(func, env.root.cache)[2], env)
+
+def run_body(func, func_env):
+    return compiled_function(func, func_env.root.cache)[1](func_env)
+
+def compile_expression(expr, layout):
+    return EXPRESSION_COMPILERS[expr[0]](expr, layout)
+
+def compile_block(body, layout):
+    """Like the tree-walker, a compiled statement returns None or the
+    ReturnValue/TailCall status of a yeet, which the block passes up"""
+    statements = tuple(compile_statement(s, layout) for s in body)
+    if len(statements) == 1:
+        return statements[0]
+    if not any(may_yeet(s) for s in body):
+        def plain_block(env):
+            for statement in statements:
+                statement(env)
+        return plain_block
+
+    def block(env):
+        for statement in statements:
+            status = statement(env)
+            if status is not None:
+                return status
+    return block
+
+def compile_statement(stmt, layout):
+    compiler = STATEMENT_COMPILERS.get(stmt[0])
+    if compiler is None:
+        return compile_unknown(stmt, layout, 'statement')
+    return compiler(stmt, layout)
+
+def compile_arguments(arg_exprs, layout):
+    args = tuple(compile_expression(arg, layout) for arg in arg_exprs)
+
+    def arguments(env):
+        return [arg(env) for arg in args]
+    return arguments
+
+# --- variables ---------------------------------------------------------------
+
+def compile_load(name, layout):
+    location = address(layout, name)
+    if location is None:
+        def load_name(env):
+            return env.get(name)
+        return load_name
+
+    slot = location[1]
+
+    def load_slot(env):
+        value = env.slots[slot]
+        if value is UNBOUND:
+            # Not declared yet in this call: dynamic scoping looks in the callers
+            return env.parent.get(name)
+        return value
+    return load_slot
+
+def compile_store(name, layout, coerce, value):
+    """Declaration: bind in the current environment"""
+    location = address(layout, name)
+    if location is None:
+        def store_name(env):
+            env.set(name, coerce(name, value(env)))
+        return store_name
+
+    slot = location[1]
+
+    def store_slot(env):
+        env.slots[slot] = coerce(name, value(env))
+    return store_slot
+
+# --- expressions -------------------------------------------------------------
+
+def compile_constant(value):
+    def constant(env):
+        return value
+    return constant
+
+def compile_number(expr, layout):
+    return compile_constant(expr[1])
+
+def compile_const(expr, layout):
+    return compile_constant(expr[1])
+
+def compile_string(expr, layout):
+    return compile_constant(expr[1][1:-1])
+
+def compile_boolean(expr, layout):
+    return compile_constant(expr[1])
+
+def compile_null(expr, layout):
+    return compile_constant('nvm')
+
+def compile_undecided(expr, layout):
+    return compile_constant(float('inf'))
+
+def compile_identifier(expr, layout):
+    return compile_load(expr[1], layout)
+
+def compile_array(expr, layout):
+    elements = tuple(compile_expression(e, layout) for e in expr[1])
+
+    def array(env):
+        return Squad([element(env) for element in elements])
+    return array
+
+def compile_stash(expr, layout):
+    pairs = tuple((compile_expression(key, layout), compile_expression(value, layout)) for key, value in expr[1])
+
+    def stash(env):
+        result = {}
+        for key, value in pairs:
+            result[check_key(key(env))] = value(env)
+        return result
+    return stash
+
+def compile_slice(expr, layout):
+    _, name, start, stop, step = expr
+    load = compile_load(name, layout)
+    bounds = tuple(None if bound is None else compile_expression(bound, layout) for bound in (start, stop, step))
+
+    def slice_(env):
+        array = load(env)
+        if not is_array(array):
+            raise RuntimeError(f"'{name}' is not an array")
+        return slice_squad(array, *[None if bound is None else bound(env) for bound in bounds])
+    return slice_
+
+def compile_index(expr, layout):
+    name = expr[1]
+    load = compile_load(name, layout)
+    index_expr = compile_expression(expr[2], layout)
+
+    def index(env):
+        array = load(env)
+        if not is_array(array):
+            if array.__class__ is dict:
+                return stash_get(array, index_expr(env))
+            raise RuntimeError(f"'{name}' is not an array")
+        return array.items[resolve_index(array, index_expr(env))]
+    return index
+
+def compile_unary_op(expr, layout):
+    op = expr[1]
+    right = compile_expression(expr[2], layout)
+    if op == 'nah':
+        def negate(env):
+            value = right(env)
+            return value is not True and value != 'slay'
+        return negate
+    if op == '-':
+        def minus(env):
+            value = right(env)
+            if isinstance(value, str) and value in ['slay', 'cap']:
+                value = 1 if value == 'slay' else 0
+            return -value
+        return minus
+    return compile_constant(None)
+
+def compile_logic_op(expr, layout):
+    left = compile_expression(expr[1], layout)
+    right = compile_expression(expr[3], layout)
+    op = expr[2]
+    if op == 'frfr':
+        def logic_and(env):
+            left_value = left(env)
+            right_value = right(env)
+            return (left_value is True or left_value == 'slay') and (right_value is True or right_value == 'slay')
+        return logic_and
+    if op == 'maybe':
+        def logic_or(env):
+            left_value = left(env)
+            right_value = right(env)
+            return (left_value is True or left_value == 'slay') or (right_value is True or right_value == 'slay')
+        return logic_or
+    return compile_constant(None)
+
+def compile_bin_op(expr, layout):
+    # Compile the left spine iteratively, like the tree-walker evaluates it
+    chain = []
+    while expr[0] == 'BIN_OP':
+        chain.append(expr)
+        expr = expr[1]
+    left = compile_expression(expr, layout)
+    if len(chain) > LONG_CHAIN:
+        steps = tuple((node[2], compile_expression(node[3], layout)) for node in reversed(chain))
+        return compile_long_chain(left, steps)
+    for node in reversed(chain):
+        left = compile_binary(left, node[2], compile_expression(node[3], layout))
+    return left
+
+def compile_long_chain(first, steps):
+    """One flat loop for very long chains instead of thousands of nested closures"""
+    def long_chain(env):
+        value = first(env)
+        for op, right in steps:
+            value = binary_op(value, op, right(env))
+        return value
+    return long_chain
+
+def compile_binary(left, op, right):
+    fast = FAST_BINARY_OPS.get(op)
+    if fast is None:
+        def slow_binary(env):
+            return binary_op(left(env), op, right(env))
+        return slow_binary
+
+    def binary(env):
+        left_value = left(env)
+        right_value = right(env)
+        if left_value.__class__ in NUMERIC_TYPES and right_value.__class__ in NUMERIC_TYPES:
+            try:
+                return fast(left_value, right_value)
+            except OverflowError:
+                return float('inf')
+        return binary_op(left_value, op, right_value)
+    return binary
+
+def compile_ordering(left, op, right):
+    """compile_binary for a condition: comparing a squad gives a squad, which isn't slay"""
+    fast = FAST_BINARY_OPS[op]
+
+    def ordering(env):
+        left_value = left(env)
+        right_value = right(env)
+        if left_value.__class__ in NUMERIC_TYPES and right_value.__class__ in NUMERIC_TYPES:
+            return fast(left_value, right_value)
+        return binary_op(left_value, op, right_value) is True
+    return ordering
+
+def invoke_compiled(entry, name, args, env):
+    """interpreter.invoke_function for a cached compiled function: parameters go
+    straight into their slots"""
+    func, body, layout, param_slots = entry
+    table = memo_table(func, env.root.cache)
+    key = None if table is None else table.key(args, env)
+    if key is not None:
+        value = table.get(key)
+        if value is not MISSING:
+            return value
+    interpreter.current_recursion_depth += 1
+    try:
+        if interpreter.current_recursion_depth > MAX_RECURSION_DEPTH:
+            raise RuntimeError("Stack overflow: too delulu")
+        if len(param_slots) != len(args):
+            raise RuntimeError(f"Function '{name}' expects {len(param_slots)} arguments, got {len(args)}")
+        frame = Frame(layout, env)
+        slots = frame.slots
+        for slot, arg in zip(param_slots, args):
+            slots[slot] = arg
+        discard_result = False
+        while True:
+            status = body(frame)
+            if status is None:
+                value = 'nvm'
+                break
+            if status.__class__ is ReturnValue:
+                value = status.value
+                break
+            discard_result = discard_result or not status.returns_value
+            if not rebind_tail_call(func, frame, status.call_args):
+                value = call_function(func[1], status.call_args, frame, run_body, make_frame)
+                break
+    finally:
+        interpreter.current_recursion_depth -= 1
+    if discard_result:
+        value = 'nvm'
+    if key is not None:
+        table.put(key, value)
+    return value
+
+def compile_site_call(name):
+    """call(args, env) through an inline cache of what name resolves to"""
+    site = CallSite(name)
+
+    def site_call(args, env):
+        func = env.root.vars.get(name)
+        if func is site.func:
+            target = site.target
+            if target.__class__ is tuple:
+                return invoke_compiled(target, name, args, env)
+            return target(args)
+        if isinstance(func, tuple) and func and func[0] == 'FUNCTION':
+            cache = env.root.cache
+            site.fill(func, cache, compiled_function(func, cache))
+        else:
+            site.fill(func, env.root.cache)
+        return call_function(name, args, env, run_body, make_frame)
+    return site_call
+
+def compile_call(expr, layout):
+    arguments = compile_arguments(expr[2], layout)
+    site_call = compile_site_call(expr[1])
+
+    def call(env):
+        return site_call(arguments(env), env)
+    return call
+
+def compile_method_call(expr, layout):
+    load = compile_load(expr[1], layout)
+    arguments = compile_arguments(expr[3], layout)
+    site_call = compile_site_call(expr[2])
+
+    def method_call(env):
+        obj = load(env)
+        return site_call([obj] + arguments(env), env)
+    return method_call
+
+def compile_unknown(node, layout, kind='expression'):
+    """Unknown nodes only fail when reached, exactly like the tree-walker"""
+    node_type = node[0]
+
+    def unknown(env):
+        raise RuntimeError(f"Unknown {kind} type: {node_type}")
+    return unknown
+
+class CompilerTable(dict):
+    def __missing__(self, node_type):
+        return compile_unknown
+
+EXPRESSION_COMPILERS = CompilerTable({
+    'NUMBER': compile_number,
+    'STRING': compile_string,
+    'BOOLEAN': compile_boolean,
+    'NULL': compile_null,
+    'UNDECIDED': compile_undecided,
+    'CONST': compile_const,
+    'IDENTIFIER': compile_identifier,
+    'ARRAY': compile_array,
+    'STASH': compile_stash,
+    'INDEX': compile_index,
+    'SLICE': compile_slice,
+    'UNARY_OP': compile_unary_op,
+    'LOGIC_OP': compile_logic_op,
+    'BIN_OP': compile_bin_op,
+    'CALL': compile_call,
+    'METHOD_CALL': compile_method_call,
+})
+
+# --- statements --------------------------------------------------------------
+
+def compile_print(stmt, layout):
+    value = compile_expression(stmt[1], layout)
+
+    def print_statement(env):
+        print_value(value(env))
+    return print_statement
+
+def compile_call_stmt(stmt, layout):
+    arguments = compile_arguments(stmt[2], layout)
+    site_call = compile_site_call(stmt[1])
+
+    def call_statement(env):
+        # The call's return value is ignored, so it can't be mistaken for a status
+        site_call(arguments(env), env)
+    return call_statement
+
+def compile_declaration(coerce):
+    def compile_decl(stmt, layout):
+        _, var_name, expr = stmt
+        return compile_store(var_name, layout, coerce, compile_expression(expr, layout))
+    return compile_decl
+
+def compile_var_assign(stmt, layout):
+    _, var_name, expr = stmt
+    value = compile_expression(expr, layout)
+    location = address(layout, var_name)
+
+    def assign(env):
+        new_value = value(env)
+        env.set(var_name, coerce_assignment(env.get(var_name), new_value), update_existing=True)
+    if location is None:
+        return assign
+
+    slot = location[1]
+
+    def assign_slot(env):
+        new_value = value(env)
+        slots = env.slots
+        existing = slots[slot]
+        if existing is UNBOUND:
+            # Not declared here yet, so the assignment updates a caller's variable
+            env.parent.set(var_name, coerce_assignment(env.parent.get(var_name), new_value),
+                           update_existing=True)
+        elif new_value.__class__ is existing.__class__:
+            slots[slot] = new_value
+        else:
+            slots[slot] = coerce_assignment(existing, new_value)
+    return assign_slot
+
+def compile_typed_decl(stmt, layout):
+    """Declaration type inference proved needs no coercion"""
+    _, var_name, expr, _ = stmt
+    value = compile_expression(expr, layout)
+    location = address(layout, var_name)
+    if location is None:
+        def typed_decl(env):
+            env.set(var_name, value(env))
+        return typed_decl
+
+    slot = location[1]
+
+    def typed_decl_slot(env):
+        env.slots[slot] = value(env)
+    return typed_decl_slot
+
+def compile_typed_assign(stmt, layout):
+    """Assignment type inference proved needs no coercion; the variable is
+    known to be declared, in this function's own slot when it has one"""
+    _, var_name, expr, _ = stmt
+    value = compile_expression(expr, layout)
+    location = address(layout, var_name)
+    if location is None:
+        def typed_assign(env):
+            env.set(var_name, value(env), update_existing=True)
+        return typed_assign
+
+    slot = location[1]
+
+    def typed_assign_slot(env):
+        env.slots[slot] = value(env)
+    return typed_assign_slot
+
+def compile_index_assign(stmt, layout):
+    _, array_name, index_expr, value_expr = stmt
+    load = compile_load(array_name, layout)
+    index = compile_expression(index_expr, layout)
+    value = compile_expression(value_expr, layout)
+
+    def index_assign(env):
+        array = load(env)
+        if not is_array(array):
+            if array.__class__ is dict:
+                key = check_key(index(env))
+                array[key] = value(env)
+                return
+            raise RuntimeError(f"'{array_name}' is not an array")
+        resolved_index = resolve_index(array, index(env))
+        array.set(resolved_index, value(env))
+    return index_assign
+
+def compile_try_catch(stmt, layout):
+    try_body = compile_block(stmt[1], layout)
+    catch_statements = tuple(compile_statement(s, layout) for s in stmt[2])
+
+    def try_catch(env):
+        try:
+            return try_body(env)
+        except Exception:
+            for statement in catch_statements:
+                try:
+                    status = statement(env)
+                except Exception as nested_e:
+                    print(f"Error in panik block: {nested_e}")
+                else:
+                    if status is not None:
+                        return status
+    return try_catch
+
+def compile_for(stmt, layout):
+    _, var_name, start, end, body = stmt
+    loop_body = compile_block(body, layout)
+    location = address(layout, var_name)
+
+    def for_loop(env):
+        for i in range(start, end + 1):
+            env.set(var_name, i)
+            status = loop_body(env)
+            if status is not None:
+                return status
+    if location is None:
+        return for_loop
+
+    slot = location[1]
+
+    def for_slot_loop(env):
+        slots = env.slots
+        for i in range(start, end + 1):
+            slots[slot] = i
+            status = loop_body(env)
+            if status is not None:
+                return status
+    return for_slot_loop
+
+def compile_condition(expr, layout):
+    """A closure returning a native bool: whether expr is slay"""
+    if compares_order(expr):
+        return compile_ordering(compile_expression(expr[1], layout), expr[2],
+                                compile_expression(expr[3], layout))
+    value = compile_expression(expr, layout)
+    if yields_bool(expr):
+        return value
+
+    def truth(env):
+        result = value(env)
+        return result is True or result == 'slay'
+    return truth
+
+def compile_while(stmt, layout):
+    condition = compile_condition(stmt[1], layout)
+    loop_body = compile_block(stmt[2], layout)
+
+    def while_loop(env):
+        while condition(env):
+            status = loop_body(env)
+            if status is not None:
+                return status
+    return while_loop
+
+def compile_if_else(stmt, layout):
+    condition = compile_condition(stmt[1], layout)
+    then_body = compile_block(stmt[2], layout)
+    else_body = compile_block(stmt[3], layout)
+
+    def if_else(env):
+        if condition(env):
+            return then_body(env)
+        return else_body(env)
+    return if_else
+
+def compile_return(stmt, layout):
+    value = compile_expression(stmt[1], layout)
+
+    def return_statement(env):
+        return ReturnValue(value(env))
+    return return_statement
+
+def compile_tail_call(stmt, layout):
+    arguments = compile_arguments(stmt[1], layout)
+    returns_value = stmt[2]
+
+    def tail_call(env):
+        return TailCall(arguments(env), returns_value)
+    return tail_call
+
+def compile_exit(stmt, layout):
+    def exit_statement(env):
+        exit(0)
+    return exit_statement
+
+def compile_function(stmt, layout):
+    # Defining a function binds its name like a declaration, with no coercion
+    return compile_store(stmt[1], layout, lambda name, func: func, compile_constant(stmt))
+
+STATEMENT_COMPILERS = {
+    'PRINT': compile_print,
+    'CALL_STMT': compile_call_stmt,
+    'SQUAD_DECL': compile_declaration(coerce_squad),
+    'STASH_DECL': compile_declaration(coerce_stash),
+    'SIGMA_DECL': compile_declaration(coerce_sigma),
+    'TWEET_DECL': compile_declaration(coerce_tweet),
+    'VAR_ASSIGN': compile_var_assign,
+    'TYPED_DECL': compile_typed_decl,
+    'TYPED_ASSIGN': compile_typed_assign,
+    'INDEX_ASSIGN': compile_index_assign,
+    'TRY_CATCH': compile_try_catch,
+    'FOR': compile_for,
+    'WHILE': compile_while,
+    'IF_ELSE': compile_if_else,
+    'RETURN': compile_return,
+    'TAIL_CALL': compile_tail_call,
+    'EXIT': compile_exit,
+    'FUNCTION': compile_function,
+}
+
+# Statement type -> positions of its nested statement lists
+NESTED_BLOCKS = {'IF_ELSE': (2, 3), 'TRY_CATCH': (1, 2), 'FOR': (4,), 'WHILE': (2,)}
+
+def may_yeet(stmt):
+    """Whether running stmt can hand back a status"""
+    if stmt[0] in ('RETURN', 'TAIL_CALL'):
+        return True
+    return any(may_yeet(s) for position in NESTED_BLOCKS.get(stmt[0], ()) for s in stmt[position])
+
+def compile_program(ast):
+    return compile_block(ast, None)
+
+def run(ast, env):
+    compile_program(ast)(env)
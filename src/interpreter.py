@@ -1,46 +1,307 @@
-import copy
+import importlib
 import os
 import csv
+import operator
+from array import array
+from bisect import bisect_left
+from itertools import repeat
+try:
+    import numpy
+except ImportError:
+    numpy = None
+from tailcalls import TailCall, tail_call_body
+from memo import memo_table, MISSING, MemoSettings
+from runcache import RunCache
 
+VERSION = "1.0.0"
 MAX_RECURSION_DEPTH = 1000
 current_recursion_depth = 0
 
+# Marks a frame slot whose variable has not been declared yet
+UNBOUND = object()
+
 class Environment:
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, memo=None):
         self.vars = {}
         self.parent = parent
-        # Add built-in functions to global environment
+        self.root = parent.root if parent else self
+        # Add built-in functions to global environment; the last field says
+        # whether a call's result depends on its arguments alone (see memo.py)
         if parent is None:
-            self.set('gimme', ('BUILTIN_FUNCTION', 'gimme', builtin_gimme))
-            self.set('scoop', ('BUILTIN_FUNCTION', 'scoop', builtin_scoop))
-            self.set('scooch', ('BUILTIN_FUNCTION', 'scooch', builtin_scooch))
+            self.memo = MemoSettings() if memo is None else memo
+            self.cache = RunCache()
+            self.set('gimme', ('BUILTIN_FUNCTION', 'gimme', builtin_gimme, False))
+            self.set('scoop', ('BUILTIN_FUNCTION', 'scoop', builtin_scoop, False))
+            self.set('scooch', ('BUILTIN_FUNCTION', 'scooch', builtin_scooch, False))
+            self.set('len', ('BUILTIN_FUNCTION', 'len', builtin_len, True))
+            self.set('sum', ('BUILTIN_FUNCTION', 'sum', builtin_sum, True))
+            self.set('min', ('BUILTIN_FUNCTION', 'min', builtin_min, True))
+            self.set('max', ('BUILTIN_FUNCTION', 'max', builtin_max, True))
+            self.set('mean', ('BUILTIN_FUNCTION', 'mean', builtin_mean, True))
+            self.set('scale', ('BUILTIN_FUNCTION', 'scale', builtin_scale, True))
+            self.set('has', ('BUILTIN_FUNCTION', 'has', builtin_has, True))
+            self.set('keys', ('BUILTIN_FUNCTION', 'keys', builtin_keys, True))
+            self.set('search', ('BUILTIN_FUNCTION', 'search', builtin_search, True))
+            # Sort keys may be cook functions, which run as if called from the top level
+            self.set('sort', ('BUILTIN_FUNCTION', 'sort', lambda args: builtin_sort(args, self), False))
+            self.set('sorted', ('BUILTIN_FUNCTION', 'sorted', lambda args: builtin_sorted(args, self), True))
 
     def get(self, name):
         if name in self.vars:
             return self.vars[name]
-        elif self.parent:
-            return self.parent.get(name)
-        else:
-            raise NameError(f"Variable '{name}' not defined")
+        # Walk the parent chain in a loop: under dynamic scoping it is as long
+        # as the call stack
+        env = self
+        while env is not None:
+            value = env.lookup(name)
+            if value is not UNBOUND:
+                return value
+            env = env.parent
+        raise NameError(f"Variable '{name}' not defined")
 
     def set(self, name, value, update_existing=False):
-        if update_existing:
-            if name in self.vars:
-                self.vars[name] = value
-            elif self.parent:
-                self.parent.set(name, value, update_existing=True)
-            else:
-                raise NameError(f"Variable '{name}' not defined")
-        else:
+        if not update_existing:
             self.vars[name] = value
+            return
+        env = self
+        while env is not None:
+            if env.rebind(name, value):
+                return
+            env = env.parent
+        raise NameError(f"Variable '{name}' not defined")
+
+    def lookup(self, name):
+        """This environment's own binding of name, or UNBOUND"""
+        return self.vars.get(name, UNBOUND)
+
+    def rebind(self, name, value):
+        """Update name if it is bound here; False otherwise"""
+        if name in self.vars:
+            self.vars[name] = value
+            return True
+        return False
+
+class Frame(Environment):
+    """Environment of a closure-engine function call whose own variables live
+    in a fixed-size slot list; layout maps each name the resolver found to its
+    slot. The compiled code indexes slots directly. These methods are the
+    by-name path, for callees that read or assign a caller's variable under
+    dynamic scoping, so they still go through layout.get(name)."""
+    def __init__(self, layout, parent):
+        self.vars = {}
+        self.parent = parent
+        self.root = parent.root
+        self.layout = layout
+        self.slots = [UNBOUND] * len(layout)
+
+    def lookup(self, name):
+        slot = self.layout.get(name)
+        if slot is not None:
+            return self.slots[slot]
+        return self.vars.get(name, UNBOUND)
+
+    def rebind(self, name, value):
+        slot = self.layout.get(name)
+        if slot is not None:
+            if self.slots[slot] is UNBOUND:
+                return False
+            self.slots[slot] = value
+            return True
+        return super().rebind(name, value)
+
+    def set(self, name, value, update_existing=False):
+        slot = self.layout.get(name)
+        if slot is not None and not update_existing:
+            self.slots[slot] = value
+        else:
+            super().set(name, value, update_existing)
+
+class ReturnValue:
+    """Status a statement hands back after `yeet`. Statement handlers return
+    None to keep going; blocks pass any status up to the function call."""
+    __slots__ = ('value',)
 
-class ReturnValue(Exception):
     def __init__(self, value):
         self.value = value
 
+# Typed storage of numeric squads: typecode -> the one element type it holds
+TYPED_ELEMENTS = {'q': int, 'd': float}
+
+def pack(items):
+    """(storage, nested) for a new squad's items list: an array('q') when they
+    are all ints, array('d') when they are all floats, else the list itself"""
+    if not items:
+        return items, False
+    kind = items[0].__class__
+    if kind is int or kind is float:
+        for item in items:
+            if item.__class__ is not kind:
+                break
+        else:
+            try:
+                return array('q' if kind is int else 'd', items), False
+            except OverflowError:
+                return items, False
+    return items, any(item.__class__ in CONTAINERS for item in items)
+
+class SquadView:
+    """Read-only window on another squad's list or array: the elements of base
+    at the positions in indices, a range. Slicing a squad gives a squad that
+    stores one of these, so nothing is copied until one side is written to."""
+    __slots__ = ('base', 'indices')
+
+    def __init__(self, base, indices):
+        self.base = base
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        return self.base[self.indices[index]]
+
+    def __iter__(self):
+        return map(self.base.__getitem__, self.indices)
+
+    def tolist(self):
+        return list(self)
+
+    def materialize(self):
+        """The viewed elements in storage of their own, of the base's kind"""
+        indices = self.indices
+        base = self.base
+        if indices.step > 0:
+            return base[indices.start:indices.stop:indices.step]
+        return array(base.typecode, self) if base.__class__ is array else list(self)
+
+class Squad:
+    """A squad value. Declaring a squad from another one copies it, but only
+    lazily: both share the items list until either side is written to
+    (INDEX_ASSIGN or scooch), which copies it first. Variables, arguments and
+    elements that merely refer to a squad share the Squad itself, so writes
+    through them are seen by every holder, as before.
+
+    nested says an element may be a squad or stash; copying such a squad gives
+    each inner one its own copy, so nothing is shared between the two copies
+    at any depth.
+
+    A squad built only from ints or only from floats keeps them in a typed
+    array (see pack) until a value of another type is written into it.
+    """
+    __slots__ = ('items', 'shared', 'nested')
+
+    def __init__(self, items, nested=None):
+        if nested is None:
+            items, nested = pack(items)
+        self.items = items
+        self.shared = False
+        self.nested = nested
+
+    def copy(self, memo=None):
+        # memo maps the inner squads copied so far to their copies, so a squad
+        # reachable twice (or from itself) is copied once, like deepcopy did
+        if memo is not None:
+            twin = memo.get(id(self))
+            if twin is not None:
+                return twin
+        if self.nested:
+            if memo is None:
+                memo = {}
+            twin = memo[id(self)] = Squad([], True)
+            twin.items = [item if item.__class__ not in CONTAINERS else copy_value(item, memo)
+                          for item in self.items]
+            return twin
+        self.shared = True
+        twin = Squad(self.items, False)
+        twin.shared = True
+        if memo is not None:
+            memo[id(self)] = twin
+        return twin
+
+    def own(self):
+        """Make items this squad's alone before writing to it"""
+        if self.shared:
+            items = self.items
+            self.items = items.materialize() if items.__class__ is SquadView else items[:]
+            self.shared = False
+
+    def untype(self):
+        """Switch typed storage to a list this squad owns"""
+        self.items = self.items.tolist()
+        self.shared = False
+
+    def writable(self, value):
+        """The items to store value in, owned and able to hold it"""
+        if self.shared:
+            self.own()
+        items = self.items
+        if items.__class__ is array and value.__class__ is not TYPED_ELEMENTS[items.typecode]:
+            self.untype()
+        if value.__class__ in CONTAINERS:
+            self.nested = True
+        return self.items
+
+    def set(self, index, value):
+        try:
+            self.writable(value)[index] = value
+        except OverflowError:
+            # An int too big for array('q')
+            self.untype()
+            self.items[index] = value
+
+    def append(self, value):
+        try:
+            self.writable(value).append(value)
+        except OverflowError:
+            self.untype()
+            self.items.append(value)
+
+    def is_numeric(self):
+        """Whether every element is a number (booleans aren't)"""
+        items = self.items
+        if items.__class__ is array or (items.__class__ is SquadView and items.base.__class__ is array):
+            return True
+        return all(item.__class__ is int or item.__class__ is float for item in items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __repr__(self):
+        return repr(self.items)
+
+# Values holding other values; a stash is a plain dict
+CONTAINERS = (Squad, dict)
+# Values that can be stash keys
+KEY_TYPES = (int, float, str, bool)
+
+def copy_value(value, memo):
+    """A copy of a squad or stash sharing nothing with it; memo as in Squad.copy"""
+    if value.__class__ is Squad:
+        return value.copy(memo)
+    twin = memo.get(id(value))
+    if twin is None:
+        twin = memo[id(value)] = {}
+        twin.update({key: item if item.__class__ not in CONTAINERS else copy_value(item, memo)
+                     for key, item in value.items()})
+    return twin
+
+def check_key(key):
+    if key.__class__ not in KEY_TYPES:
+        raise RuntimeError(f"Stash keys must be numbers, strings or booleans, got {type(key).__name__}")
+    return key
+
+def stash_get(stash, key):
+    try:
+        return stash[check_key(key)]
+    except KeyError:
+        raise RuntimeError(f"Key {external(key)!r} not found in stash") from None
+
 def builtin_gimme(args):
     """Built-in input function"""
-    prompt = args[0] if len(args) > 0 else ""
+    prompt = external(args[0]) if len(args) > 0 else ""
     try:
         return input(prompt)
     except EOFError:
@@ -51,7 +312,7 @@ def builtin_scoop(args):
     if len(args) != 1:
         raise RuntimeError("scoop() takes exactly 1 argument (filename)")
     
-    filename = args[0]
+    filename = external(args[0])
     if not isinstance(filename, str):
         raise RuntimeError("Filename must be a string")
     
@@ -62,7 +323,7 @@ def builtin_scoop(args):
         if filename.endswith('.csv'):
             with open(filename, 'r') as f:
                 reader = csv.reader(f)
-                return [row for row in reader]
+                return Squad([Squad(row, False) for row in reader], True)
         else:
             with open(filename, 'r') as f:
                 return f.read()
@@ -77,27 +338,145 @@ def builtin_scooch(args):
         raise RuntimeError("scooch() takes at most 2 arguments (squad, [value])")
     
     squad = args[0]
-    if not isinstance(squad, list):
+    if not is_array(squad):
         raise RuntimeError("First argument must be a squad")
     
     value = args[1] if len(args) > 1 else "nvm"
     squad.append(value)
     return len(squad)
 
+def squad_items(name, args):
+    """The elements of the one squad an aggregate builtin takes"""
+    if len(args) != 1 or not is_array(args[0]):
+        raise RuntimeError(f"{name}() takes one squad")
+    return args[0].items
+
+def builtin_len(args):
+    """Number of elements of a squad, keys of a stash or characters of a string"""
+    if len(args) == 1 and args[0].__class__ in (str, dict):
+        return len(args[0])
+    return len(squad_items('len', args))
+
+def builtin_sum(args):
+    """Total of a squad of numbers"""
+    items = squad_items('sum', args)
+    try:
+        return sum(items)
+    except TypeError:
+        raise RuntimeError("sum() needs a squad of numbers")
+
+def builtin_mean(args):
+    """Average of a squad of numbers"""
+    items = squad_items('mean', args)
+    if not items:
+        raise RuntimeError("mean() of an empty squad")
+    try:
+        return sum(items) / len(items)
+    except TypeError:
+        raise RuntimeError("mean() needs a squad of numbers")
+
+def builtin_scale(args):
+    """A new squad of every element of a squad of numbers times a number"""
+    if (len(args) != 2 or not is_array(args[0]) or args[1].__class__ not in NUMBER_TYPES
+            or not args[0].is_numeric()):
+        raise RuntimeError("scale() takes a squad of numbers and a number")
+    return elementwise(args[0], '*', args[1], True)
+
+def extreme(name, pick, args):
+    items = squad_items(name, args)
+    if not items:
+        raise RuntimeError(f"{name}() of an empty squad")
+    try:
+        return pick(items)
+    except TypeError:
+        raise RuntimeError(f"{name}() can't compare the elements of this squad")
+
+def builtin_has(args):
+    """Whether a stash has a key, or a squad an element"""
+    if len(args) != 2:
+        raise RuntimeError("has() takes a stash or squad and a value")
+    container, value = args
+    if container.__class__ is dict:
+        return value.__class__ in KEY_TYPES and value in container
+    if is_array(container):
+        return value in container.items
+    raise RuntimeError("has() takes a stash or squad and a value")
+
+def builtin_keys(args):
+    """The keys of a stash as a squad, in the order they were added"""
+    if len(args) != 1 or args[0].__class__ is not dict:
+        raise RuntimeError("keys() takes one stash")
+    return Squad(list(args[0]))
+
+def builtin_min(args):
+    """Smallest element of a squad"""
+    return extreme('min', min, args)
+
+def builtin_max(args):
+    """Largest element of a squad"""
+    return extreme('max', max, args)
+
+def sorted_items(name, args, env):
+    """The elements of the squad a sort builtin takes, sorted by Timsort.
+    Numbers compare like `<` does, ints and floats exactly; the optional key
+    is a cook function or builtin called with each element."""
+    if len(args) not in (1, 2) or not is_array(args[0]):
+        raise RuntimeError(f"{name}() takes a squad and an optional key function")
+    key = None
+    if len(args) == 2:
+        func = args[1]
+        if func.__class__ is not tuple or not func or func[0] not in ('FUNCTION', 'BUILTIN_FUNCTION'):
+            raise RuntimeError(f"{name}() key must be a function")
+        if func[0] == 'FUNCTION':
+            key = lambda item: invoke_function(func, func[1], [item], env)
+        else:
+            key = lambda item: func[2]([item])
+    try:
+        return sorted(args[0].items, key=key)
+    except TypeError:
+        raise RuntimeError(f"{name}() can't compare the elements of this squad") from None
+
+def builtin_sort(args, env):
+    """Sort a squad in place"""
+    values = sorted_items('sort', args, env)
+    squad = args[0]
+    # Fresh storage, so copies sharing the old one keep their order
+    squad.items, squad.nested = pack(values)
+    squad.shared = False
+    return 'nvm'
+
+def builtin_sorted(args, env):
+    """A sorted copy of a squad"""
+    return Squad(sorted_items('sorted', args, env))
+
+def builtin_search(args):
+    """Position of a value in a sorted squad by binary search, or -1"""
+    if len(args) != 2 or not is_array(args[0]):
+        raise RuntimeError("search() takes a sorted squad and a value")
+    items, value = args[0].items, args[1]
+    try:
+        position = bisect_left(items, value)
+        if position < len(items) and items[position] == value:
+            return position
+    except TypeError:
+        raise RuntimeError("search() can't compare the value with this squad") from None
+    return -1
+
 def is_array(value):
-    return isinstance(value, list)
+    return value.__class__ is Squad
 
 def resolve_index(array, index):
-    if not isinstance(index, int):
+    if not isinstance(index, int) or index.__class__ is bool:
         raise RuntimeError(f"Array index must be integer, got {type(index).__name__}")
     
+    length = len(array.items)
     # Handle negative indexing
     if index < 0:
-        index = len(array) + index
+        index = length + index
         
     # Bounds checking
-    if index < 0 or index >= len(array):
-        raise RuntimeError(f"Index {index} out of bounds for array of length {len(array)}")
+    if index < 0 or index >= length:
+        raise RuntimeError(f"Index {index} out of bounds for array of length {length}")
     
     return index
 
@@ -116,126 +495,405 @@ def to_number(value):
         except ValueError:
             return value
 
-def eval_expression(expr, env):
-    etype = expr[0]
-
-    if etype == 'NUMBER':
-        return expr[1]
-    elif etype == 'STRING':
-        return expr[1][1:-1]  # Strip quotes
-    elif etype == 'BOOLEAN':
-        return 'slay' if expr[1] else 'cap'
-    elif etype == 'NULL':
-        return 'nvm'
-    elif etype == 'UNDECIDED':
-        return float('inf')  # Represent delulu as infinity
-    elif etype == 'IDENTIFIER':
-        val = env.get(expr[1])
+def is_slay(value):
+    """Truth test of conditions; a 'slay' string (from input or a squad) counts too"""
+    return value is True or value == 'slay'
+
+def slice_squad(squad, start, stop, step):
+    """A squad viewing squad[start:stop:step], bounds as in Python (None if left out)"""
+    for bound in (start, stop, step):
+        if bound is not None and (bound.__class__ is not int):
+            raise RuntimeError(f"Slice bounds must be integers, got {type(bound).__name__}")
+    if step == 0:
+        raise RuntimeError("Slice step cannot be zero")
+    items = squad.items
+    if items.__class__ is SquadView:
+        view = SquadView(items.base, items.indices[start:stop:step])
+    else:
+        view = SquadView(items, range(len(items))[start:stop:step])
+        # The source has to copy its storage before writing to it from now on
+        squad.shared = True
+    result = Squad(view, squad.nested)
+    result.shared = True
+    return result
+
+def yields_bool(expr):
+    """Whether expr always evaluates to a native bool, so conditions can use it
+    directly. Ordering comparisons don't: see compares_order"""
+    kind = expr[0]
+    if kind == 'BIN_OP':
+        return expr[2] in ('==', '!=')
+    if kind == 'LOGIC_OP':
+        return expr[2] in ('frfr', 'maybe')
+    if kind == 'UNARY_OP':
+        return expr[1] == 'nah'
+    if kind == 'BOOLEAN' or kind == 'CONST':
+        return expr[1].__class__ is bool
+    return False
+
+def compares_order(expr):
+    """Whether expr is a < > <= >= comparison. It gives a native bool, or a
+    squad of them when a numeric squad is compared; a squad is never slay, so
+    as a condition it only has to be checked for True"""
+    return expr[0] == 'BIN_OP' and expr[2] in ORDERING_OPS
+
+def to_text(value):
+    """Booleans are plain Python bools inside; they read as slay/cap"""
+    if value is True:
+        return 'slay'
+    if value is False:
+        return 'cap'
+    return str(value)
+
+def external(value):
+    """value with every boolean, also inside squads, turned into slay/cap"""
+    if value.__class__ is bool:
+        return 'slay' if value else 'cap'
+    if is_array(value):
+        return [external(element) for element in value.items]
+    if value.__class__ is dict:
+        return {external(key): external(item) for key, item in value.items()}
+    return value
+
+def print_value(val):
+    if isinstance(val, float) and val == float('inf'):
+        print("delulu")
+    elif isinstance(val, float) and val == -float('inf'):
+        print("-delulu")
+    else:
+        print(external(val))
+
+def coerce_squad(var_name, val):
+    # Assigning one squad to another copies it (on first write)
+    if is_array(val):
+        return val.copy()
+    # For strings, we don't need to copy as they're immutable
+    if not isinstance(val, str):
+        raise RuntimeError(f"Cannot assign non-array to squad variable '{var_name}'")
+    return val
+
+def coerce_stash(var_name, val):
+    # Declaring a stash from another one copies it
+    if val.__class__ is not dict:
+        raise RuntimeError(f"Cannot assign non-stash to stash variable '{var_name}'")
+    return copy_value(val, {})
+
+def coerce_sigma(var_name, val):
+    # Convert input to number for sigma variables
+    if isinstance(val, str):
+        val = to_number(val)
+    
+    # Enforce sigma cannot be assigned to arrays
+    if is_array(val):
+        raise RuntimeError(f"Cannot assign array to sigma variable '{var_name}'")
+    if val.__class__ is dict:
+        raise RuntimeError(f"Cannot assign stash to sigma variable '{var_name}'")
+    return val
+
+def coerce_tweet(var_name, val):
+    # Convert to string for tweet variables
+    if isinstance(val, (int, float)):
+        val = to_text(val)
+    
+    # Enforce tweet cannot be assigned to arrays
+    if is_array(val):
+        raise RuntimeError(f"Cannot assign array to tweet variable '{var_name}'")
+    if val.__class__ is dict:
+        raise RuntimeError(f"Cannot assign stash to tweet variable '{var_name}'")
+    return val
+
+def coerce_assignment(existing_val, val):
+    # Same-type assignments never need a coercion
+    if val.__class__ is existing_val.__class__:
         return val
-    elif etype == 'ARRAY':
-        return [eval_expression(e, env) for e in expr[1]]
-    elif etype == 'INDEX':
-        array = env.get(expr[1])
-        if not is_array(array):
-            raise RuntimeError(f"'{expr[1]}' is not an array")
-        
-        index = eval_expression(expr[2], env)
-        resolved_index = resolve_index(array, index)
-        return array[resolved_index]
-    elif etype == 'UNARY_OP':
-        op, right_expr = expr[1], expr[2]
-        right = eval_expression(right_expr, env)
-        if op == 'nah':  # NOT operator
-            return 'cap' if right == 'slay' else 'slay'
-    elif etype == 'LOGIC_OP':
-        left = eval_expression(expr[1], env)
-        op = expr[2]
-        right = eval_expression(expr[3], env)
-        
-        if op == 'frfr':  # AND
-            return 'slay' if left == 'slay' and right == 'slay' else 'cap'
-        elif op == 'maybe':  # OR
-            return 'slay' if left == 'slay' or right == 'slay' else 'cap'
-    elif etype == 'BIN_OP':
-        left = eval_expression(expr[1], env)
-        op = expr[2]
-        right = eval_expression(expr[3], env)
-        
-        # Convert booleans to numbers for arithmetic operations
-        if isinstance(left, str) and left in ['slay', 'cap']:
+
+    # A variable holding a boolean behaves like a tweet holding slay/cap
+    holds_bool = existing_val.__class__ is bool
+
+    # For sigma variables, convert strings to numbers
+    if isinstance(existing_val, (int, float)) and not holds_bool and isinstance(val, str):
+        return to_number(val)
+    
+    # For tweet variables, convert numbers to strings
+    if (isinstance(existing_val, str) or holds_bool) and isinstance(val, (int, float)):
+        return to_text(val)
+    return val
+
+# Operands binary_op uses as they are; booleans already are the numbers 1 and 0
+PLAIN_OPERANDS = (int, float, bool)
+
+def convert_operands(left, right):
+    """slay/cap strings count as 1 and 0, string concatenation spells booleans
+    out and squads and stashes are compared with their booleans as slay/cap"""
+    if left.__class__ is str:
+        if left == 'slay' or left == 'cap':
             left = 1 if left == 'slay' else 0
+    elif left.__class__ in CONTAINERS:
+        left = external(left)
+    if right.__class__ is str:
+        if right == 'slay' or right == 'cap':
+            right = 1 if right == 'slay' else 0
+    elif right.__class__ in CONTAINERS:
+        right = external(right)
+    if left.__class__ is str and right.__class__ is bool:
+        right = to_text(right)
+    elif right.__class__ is str and left.__class__ is bool:
+        left = to_text(left)
+    return left, right
+
+# What elementwise applies to each element of a numeric squad
+ELEMENTWISE_OPS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+                   '>': operator.gt, '<': operator.lt, '>=': operator.ge, '<=': operator.le}
+# Operators a numeric squad applies element-wise when combined with a number;
+# `*` still repeats a squad, so multiplying each element is scale()'s job, and
+# `==`/`!=` still compare whole values
+SQUAD_NUMBER_OPS = ('+', '-', '/', '>', '<', '>=', '<=')
+NUMBER_TYPES = (int, float)
+COMPARISON_OPS = ('>', '<', '==', '!=', '<=', '>=')
+# Comparisons that give a squad of bools when one side is a numeric squad
+ORDERING_OPS = ('>', '<', '>=', '<=')
+
+# NumPy's per-call overhead only pays off on longer squads
+NUMPY_MIN_SIZE = 256
+
+def numpy_elementwise(items, function, op, number, squad_first):
+    """elementwise over float storage in one NumPy call, or None when NumPy
+    could answer differently: ints it can't turn into floats exactly, and
+    division by zero, which has to raise"""
+    if number.__class__ is int and not -2 ** 53 <= number <= 2 ** 53:
+        return None
+    values = numpy.frombuffer(items, dtype=numpy.float64)
+    if op == '/' and (number == 0 if squad_first else not values.all()):
+        return None
+    # Python's floats overflow to inf and give nan without a word, so NumPy shouldn't warn
+    with numpy.errstate(all='ignore'):
+        result = function(values, number) if squad_first else function(number, values)
+    floats = array('d')
+    floats.frombytes(result.tobytes())
+    return Squad(floats, False)
+
+def elementwise(squad, op, number, squad_first):
+    """A new squad holding op applied to each element of a numeric squad and a number"""
+    items = squad.items
+    if items.__class__ is SquadView and items.base.__class__ is array:
+        # A typed copy of the viewed elements takes the typed paths below
+        items = items.materialize()
+    function = ELEMENTWISE_OPS[op]
+    operands = (items, repeat(number)) if squad_first else (repeat(number), items)
+    if op in ORDERING_OPS:
+        # Compared exactly, like binary_op does, so big ints stay exact
+        return Squad(list(map(function, *operands)), False)
+    if numpy is not None and items.__class__ is array and items.typecode == 'd' and len(items) >= NUMPY_MIN_SIZE:
+        result = numpy_elementwise(items, function, op, number, squad_first)
+        if result is not None:
+            return result
+    try:
+        if items.__class__ is array:
+            # Floats in give floats out, and so does dividing ints
+            typecode = 'd' if items.typecode == 'd' or number.__class__ is float or op == '/' else 'q'
+            return Squad(array(typecode, map(function, *operands)), False)
+        return Squad(list(map(function, *operands)), False)
+    except (ZeroDivisionError, OverflowError):
+        # Redo it one element at a time for binary_op's errors and big numbers
+        if squad_first:
+            return Squad([binary_op(item, op, number) for item in items])
+        return Squad([binary_op(number, op, item) for item in items])
+
+def squad_op(left, op, right):
+    """op with a squad operand when it gives a squad, else None: numeric squads
+    meet numbers through + - / < > <= >= element-wise; otherwise `+` joins
+    squads and `*` repeats one"""
+    if left.__class__ is Squad:
+        if right.__class__ in NUMBER_TYPES and op in SQUAD_NUMBER_OPS and left.is_numeric():
+            return elementwise(left, op, right, True)
+    elif left.__class__ in NUMBER_TYPES and op in SQUAD_NUMBER_OPS and right.is_numeric():
+        return elementwise(right, op, left, False)
+    if op != '+' and op != '*':
+        return None
+    left = left.items if left.__class__ is Squad else left
+    right = right.items if right.__class__ is Squad else right
+    if op == '+' and left.__class__ is array and right.__class__ is array and left.typecode == right.typecode:
+        return Squad(left + right, False)
+    left = left.tolist() if left.__class__ in (array, SquadView) else left
+    right = right.tolist() if right.__class__ in (array, SquadView) else right
+    return Squad(left + right if op == '+' else left * right)
+
+def binary_op(left, op, right):
+    if left.__class__ not in PLAIN_OPERANDS or right.__class__ not in PLAIN_OPERANDS:
+        if is_array(left) or is_array(right):
+            result = squad_op(left, op, right)
+            if result is not None:
+                return result
+        left, right = convert_operands(left, right)
+    
+    try:
+        if op == '+': 
+            return left + right
+        if op == '-': 
+            return left - right
+        if op == '*': 
+            return left * right
+        if op == '/': 
+            if right == 0:
+                raise RuntimeError("Division by zero")
+            return left / right
+        if op == '>': 
+            return left > right
+        if op == '<': 
+            return left < right
+        if op == '==': 
+            return left == right
+        if op == '!=': 
+            return left != right
+        if op == '<=': 
+            return left <= right
+        if op == '>=': 
+            return left >= right
+    except OverflowError:
+        return float('inf')
+    raise RuntimeError(f"Unknown operator {op}")
+
+class HandlerTable(dict):
+    """Node type -> handler mapping that reports unknown node types as runtime errors"""
+    def __init__(self, kind, handlers):
+        super().__init__(handlers)
+        self.kind = kind
+
+    def __missing__(self, node_type):
+        raise RuntimeError(f"Unknown {self.kind} type: {node_type}")
+
+def eval_number(expr, env):
+    return expr[1]
+
+def eval_const(expr, env):
+    return expr[1]  # Literal already decoded by the optimizer
+
+def eval_string(expr, env):
+    return expr[1][1:-1]  # Strip quotes
+
+def eval_boolean(expr, env):
+    return expr[1]
+
+def eval_null(expr, env):
+    return 'nvm'
+
+def eval_undecided(expr, env):
+    return float('inf')  # Represent delulu as infinity
+
+def eval_identifier(expr, env):
+    return env.get(expr[1])
+
+def eval_array(expr, env):
+    return Squad([eval_expression(e, env) for e in expr[1]])
+
+def eval_stash(expr, env):
+    stash = {}
+    for key_expr, value_expr in expr[1]:
+        key = check_key(eval_expression(key_expr, env))
+        stash[key] = eval_expression(value_expr, env)
+    return stash
+
+def eval_index(expr, env):
+    array = env.get(expr[1])
+    if not is_array(array):
+        if array.__class__ is dict:
+            return stash_get(array, eval_expression(expr[2], env))
+        raise RuntimeError(f"'{expr[1]}' is not an array")
+    
+    index = eval_expression(expr[2], env)
+    resolved_index = resolve_index(array, index)
+    return array.items[resolved_index]
+
+def eval_slice(expr, env):
+    _, name, start, stop, step = expr
+    array = env.get(name)
+    if not is_array(array):
+        raise RuntimeError(f"'{name}' is not an array")
+    return slice_squad(array,
+                       None if start is None else eval_expression(start, env),
+                       None if stop is None else eval_expression(stop, env),
+                       None if step is None else eval_expression(step, env))
+
+def eval_unary_op(expr, env):
+    op, right_expr = expr[1], expr[2]
+    right = eval_expression(right_expr, env)
+    if op == 'nah':  # NOT operator
+        return right is not True and right != 'slay'
+    if op == '-':
         if isinstance(right, str) and right in ['slay', 'cap']:
             right = 1 if right == 'slay' else 0
-        
-        try:
-            if op == '+': 
-                return left + right
-            if op == '-': 
-                return left - right
-            if op == '*': 
-                return left * right
-            if op == '/': 
-                if right == 0:
-                    raise RuntimeError("Division by zero")
-                return left / right
-            if op == '>': 
-                return 'slay' if left > right else 'cap'
-            if op == '<': 
-                return 'slay' if left < right else 'cap'
-            if op == '==': 
-                return 'slay' if left == right else 'cap'
-            if op == '!=': 
-                return 'slay' if left != right else 'cap'
-            if op == '<=': 
-                return 'slay' if left <= right else 'cap'
-            if op == '>=': 
-                return 'slay' if left >= right else 'cap'
-        except OverflowError:
-            return float('inf')
-        raise RuntimeError(f"Unknown operator {op}")
-    elif etype == 'CALL':
-        func_name = expr[1]
-        args = [eval_expression(arg, env) for arg in expr[2]]
-        return call_function(func_name, args, env)
-    elif etype == 'METHOD_CALL':
-        obj_name = expr[1]
-        method_name = expr[2]
-        obj = env.get(obj_name)
-        args = [obj] + [eval_expression(arg, env) for arg in expr[3]]
-        return call_function(method_name, args, env)
-    else:
-        raise RuntimeError(f"Unknown expression type: {etype}")
+        return -right
+
+def eval_logic_op(expr, env):
+    left = eval_expression(expr[1], env)
+    op = expr[2]
+    right = eval_expression(expr[3], env)
     
-def call_function(name, args, env):
-    global current_recursion_depth
+    if op == 'frfr':  # AND
+        return (left is True or left == 'slay') and (right is True or right == 'slay')
+    elif op == 'maybe':  # OR
+        return (left is True or left == 'slay') or (right is True or right == 'slay')
+
+def eval_bin_op(expr, env):
+    # Walk down the left spine first so long left-associative chains
+    # like a + b + c + ... are evaluated in a loop, not one frame per term
+    chain = []
+    while expr[0] == 'BIN_OP':
+        chain.append(expr)
+        expr = expr[1]
+    handlers = EXPRESSION_HANDLERS
+    left = handlers[expr[0]](expr, env)
+    for node in reversed(chain):
+        right = node[3]
+        left = binary_op(left, node[2], handlers[right[0]](right, env))
+    return left
+
+def eval_call(expr, env):
+    func_name = expr[1]
+    args = [eval_expression(arg, env) for arg in expr[2]]
+    return call_function(func_name, args, env)
+
+def eval_method_call(expr, env):
+    obj_name = expr[1]
+    method_name = expr[2]
+    obj = env.get(obj_name)
+    args = [obj] + [eval_expression(arg, env) for arg in expr[3]]
+    return call_function(method_name, args, env)
+
+# Expression node type -> handler(expr, env)
+EXPRESSION_HANDLERS = HandlerTable('expression', {
+    'NUMBER': eval_number,
+    'STRING': eval_string,
+    'BOOLEAN': eval_boolean,
+    'NULL': eval_null,
+    'UNDECIDED': eval_undecided,
+    'CONST': eval_const,
+    'IDENTIFIER': eval_identifier,
+    'ARRAY': eval_array,
+    'STASH': eval_stash,
+    'INDEX': eval_index,
+    'SLICE': eval_slice,
+    'UNARY_OP': eval_unary_op,
+    'LOGIC_OP': eval_logic_op,
+    'BIN_OP': eval_bin_op,
+    'CALL': eval_call,
+    'METHOD_CALL': eval_method_call,
+})
+
+def eval_expression(expr, env):
+    return EXPRESSION_HANDLERS[expr[0]](expr, env)
     
+def call_function(name, args, env, run_body=None, make_env=None):
+    """Call a BS-Lang or builtin function; run_body(func, func_env) lets other
+    engines execute the body in their own representation and make_env(func, env)
+    build the callee's environment"""
     func = env.get(name)
-    if not func:
-        raise RuntimeError(f"Function '{name}' not found")
+    if func.__class__ is not tuple:
+        # Squads, stashes and other values may be empty, so test the type
+        raise RuntimeError(f"'{name}' is not a function")
     
     if func[0] == 'FUNCTION':
-        current_recursion_depth += 1
-        if current_recursion_depth > MAX_RECURSION_DEPTH:
-            current_recursion_depth -= 1
-            raise RuntimeError("Stack overflow: too delulu")
-        
-        try:
-            _, func_name, params, body = func
-            func_env = Environment(parent=env)
-            
-            # Bind parameters
-            if len(params) != len(args):
-                raise RuntimeError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
-            for param, arg in zip(params, args):
-                func_env.set(param, arg)
-
-            for stmt in body:
-                exec_statement(stmt, func_env)
-            return 'nvm'  # Default return value
-        except ReturnValue as ret:
-            return ret.value
-        finally:
-            current_recursion_depth -= 1
+        return invoke_function(func, name, args, env, run_body, make_env)
             
     elif func[0] == 'BUILTIN_FUNCTION':
         # Call built-in function
@@ -244,150 +902,242 @@ def call_function(name, args, env):
     else:
         raise RuntimeError(f"'{name}' is not a function")
 
-def exec_statement(stmt, env):
-    stype = stmt[0]
-
-    if stype == 'PRINT':
-        val = eval_expression(stmt[1], env)
-        if isinstance(val, float) and val == float('inf'):
-            print("delulu")
-        elif isinstance(val, float) and val == -float('inf'):
-            print("-delulu")
-        else:
-            print(val)
-        
-    elif stype == 'CALL_STMT':
-        func_name = stmt[1]
-        args = [eval_expression(arg, env) for arg in stmt[2]]
-        call_function(func_name, args, env)
-
-    elif stype == 'SQUAD_DECL':
-        _, var_name, expr = stmt
-        val = eval_expression(expr, env)
-        
-        # Create deep copy when assigning one squad to another
-        if is_array(val):
-            val = copy.deepcopy(val)
-        # For strings, we don't need to copy as they're immutable
-        elif not isinstance(val, str):
-            raise RuntimeError(f"Cannot assign non-array to squad variable '{var_name}'")
-        
-        env.set(var_name, val)
+def invoke_function(func, name, args, env, run_body=None, make_env=None):
+    """Run an already resolved FUNCTION node; call sites that cached it come here directly"""
+    global current_recursion_depth
 
-    elif stype == 'SIGMA_DECL':  # Numeric variable declaration
-        _, var_name, expr = stmt
-        val = eval_expression(expr, env)
-        
-        # Convert input to number for sigma variables
-        if isinstance(val, str):
-            val = to_number(val)
-        
-        # Enforce sigma cannot be assigned to arrays
-        if is_array(val):
-            raise RuntimeError(f"Cannot assign array to sigma variable '{var_name}'")
-        
-        env.set(var_name, val)
-        
-    elif stype == 'TRY_CATCH':
-        try_body = stmt[1]
-        catch_body = stmt[2]
-        
-        try:
-            # Execute try block
-            for s in try_body:
-                exec_statement(s, env)
-                
-        except Exception as e:
-            # Execute catch block on any error
-            for s in catch_body:
-                try:
-                    exec_statement(s, env)
-                except Exception as nested_e:
-                    print(f"Error in panik block: {nested_e}")
-        
-    elif stype == 'TWEET_DECL':  # String variable declaration
-        _, var_name, expr = stmt
-        val = eval_expression(expr, env)
-        
-        # Convert to string for tweet variables
-        if isinstance(val, (int, float, bool)):
-            val = str(val)
-        
-        # Enforce tweet cannot be assigned to arrays
-        if is_array(val):
-            raise RuntimeError(f"Cannot assign array to tweet variable '{var_name}'")
-        
-        env.set(var_name, val)
-        
-    elif stype == 'VAR_ASSIGN':
-        _, var_name, expr = stmt
-        val = eval_expression(expr, env)
-        
-        # Handle type-specific assignments
-        existing_val = env.get(var_name)
-        
-        # For sigma variables, convert strings to numbers
-        if isinstance(existing_val, (int, float)) and isinstance(val, str):
-            val = to_number(val)
-        
-        # For tweet variables, convert numbers to strings
-        elif isinstance(existing_val, str) and isinstance(val, (int, float, bool)):
-            val = str(val)
-            
-        env.set(var_name, val, update_existing=True)
-        
-    elif stype == 'INDEX_ASSIGN':
-        _, array_name, index_expr, value_expr = stmt
-        array = env.get(array_name)
+    # Pure functions answer repeated arguments from their memo cache
+    table = memo_table(func, env.root.cache)
+    key = None if table is None else table.key(args, env)
+    if key is not None:
+        value = table.get(key)
+        if value is not MISSING:
+            return value
+
+    current_recursion_depth += 1
+    if current_recursion_depth > MAX_RECURSION_DEPTH:
+        current_recursion_depth -= 1
+        raise RuntimeError("Stack overflow: too delulu")
+    
+    try:
+        _, func_name, params, body = func
+        func_env = Environment(parent=env) if make_env is None else make_env(func, env)
         
-        if not is_array(array):
-            raise RuntimeError(f"'{array_name}' is not an array")
+        # Bind parameters
+        if len(params) != len(args):
+            raise RuntimeError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
+        for param, arg in zip(params, args):
+            func_env.set(param, arg)
+
+        if run_body is None:
+            body = tail_call_body(func, env.root.cache)
+        discard_result = False
+        while True:
+            if run_body is None:
+                status = exec_block(body, func_env)
+            else:
+                status = run_body(func, func_env)
+            if status is None:
+                value = 'nvm'  # Default return value
+                break
+            if status.__class__ is ReturnValue:
+                value = status.value
+                break
+            # A call statement's result is dropped, so the whole chain then returns nvm
+            discard_result = discard_result or not status.returns_value
+            if not rebind_tail_call(func, func_env, status.call_args):
+                value = call_function(func_name, status.call_args, func_env, run_body, make_env)
+                break
+    finally:
+        current_recursion_depth -= 1
+    if discard_result:
+        value = 'nvm'
+    if key is not None:
+        table.put(key, value)
+    return value
+
+def rebind_tail_call(func, func_env, args):
+    """Reuse func_env for a self tail call; False when the name now means something else"""
+    _, func_name, params, _ = func
+    if func_env.get(func_name) is not func:
+        return False
+    if len(params) != len(args):
+        raise RuntimeError(f"Function '{func_name}' expects {len(params)} arguments, got {len(args)}")
+    for param, arg in zip(params, args):
+        func_env.set(param, arg)
+    return True
+
+def exec_print(stmt, env):
+    print_value(eval_expression(stmt[1], env))
+
+def exec_call_stmt(stmt, env):
+    func_name = stmt[1]
+    args = [eval_expression(arg, env) for arg in stmt[2]]
+    call_function(func_name, args, env)
+
+def exec_squad_decl(stmt, env):
+    _, var_name, expr = stmt
+    val = EXPRESSION_HANDLERS[expr[0]](expr, env)
+    env.set(var_name, coerce_squad(var_name, val))
+
+def exec_stash_decl(stmt, env):
+    _, var_name, expr = stmt
+    val = EXPRESSION_HANDLERS[expr[0]](expr, env)
+    env.set(var_name, coerce_stash(var_name, val))
+
+def exec_sigma_decl(stmt, env):  # Numeric variable declaration
+    _, var_name, expr = stmt
+    val = EXPRESSION_HANDLERS[expr[0]](expr, env)
+    env.set(var_name, coerce_sigma(var_name, val))
+
+def exec_try_catch(stmt, env):
+    try_body = stmt[1]
+    catch_body = stmt[2]
+    
+    try:
+        # Execute try block; a yeet in it returns from the function as usual
+        status = exec_block(try_body, env)
             
-        index = eval_expression(index_expr, env)
-        resolved_index = resolve_index(array, index)
-        value = eval_expression(value_expr, env)
+    except Exception as e:
+        # Execute catch block on any error
+        for s in catch_body:
+            try:
+                status = exec_statement(s, env)
+            except Exception as nested_e:
+                print(f"Error in panik block: {nested_e}")
+            else:
+                if status is not None:
+                    return status
+        return None
+    return status
+
+def exec_tweet_decl(stmt, env):  # String variable declaration
+    _, var_name, expr = stmt
+    val = EXPRESSION_HANDLERS[expr[0]](expr, env)
+    env.set(var_name, coerce_tweet(var_name, val))
+
+def exec_var_assign(stmt, env):
+    _, var_name, expr = stmt
+    val = EXPRESSION_HANDLERS[expr[0]](expr, env)
+    
+    # Handle type-specific assignments
+    val = coerce_assignment(env.get(var_name), val)
+    env.set(var_name, val, update_existing=True)
+
+def exec_typed_decl(stmt, env):  # Declaration whose coercion type inference proved unneeded
+    _, var_name, expr, _ = stmt
+    env.set(var_name, EXPRESSION_HANDLERS[expr[0]](expr, env))
+
+def exec_typed_assign(stmt, env):
+    _, var_name, expr, _ = stmt
+    env.set(var_name, EXPRESSION_HANDLERS[expr[0]](expr, env), update_existing=True)
+
+def exec_index_assign(stmt, env):
+    _, array_name, index_expr, value_expr = stmt
+    array = env.get(array_name)
+    
+    if not is_array(array):
+        if array.__class__ is dict:
+            key = check_key(eval_expression(index_expr, env))
+            array[key] = eval_expression(value_expr, env)
+            return
+        raise RuntimeError(f"'{array_name}' is not an array")
         
-        array[resolved_index] = value
-
-    elif stype == 'FOR':
-        _, var_name, start, end, body = stmt
-        for i in range(start, end + 1):
-            env.set(var_name, i)
-            for s in body:
-                exec_statement(s, env)
-
-    elif stype == 'WHILE':
-        _, condition, body = stmt
-        while eval_expression(condition, env) == 'slay':
-            for s in body:
-                exec_statement(s, env)
-
-    elif stype == 'IF_ELSE':
-        _, condition, then_body, else_body = stmt
-        result = eval_expression(condition, env)
-        if result == 'slay':
-            for s in then_body:
-                exec_statement(s, env)
-        else:
-            for s in else_body:
-                exec_statement(s, env)
+    index = eval_expression(index_expr, env)
+    resolved_index = resolve_index(array, index)
+    value = eval_expression(value_expr, env)
+    
+    array.set(resolved_index, value)
 
-    elif stype == 'RETURN':
-        val = env.get(stmt[1])
-        raise ReturnValue(val)
+def exec_for(stmt, env):
+    _, var_name, start, end, body = stmt
+    for i in range(start, end + 1):
+        env.set(var_name, i)
+        status = exec_block(body, env)
+        if status is not None:
+            return status
 
-    elif stype == 'EXIT':
-        exit(0)
+def exec_while(stmt, env):
+    _, condition, body = stmt
+    evaluate = EXPRESSION_HANDLERS[condition[0]]
+    while True:
+        result = evaluate(condition, env)
+        if result is not True and result != 'slay':
+            return None
+        status = exec_block(body, env)
+        if status is not None:
+            return status
 
-    elif stype == 'FUNCTION':
-        env.set(stmt[1], stmt)
+def exec_if_else(stmt, env):
+    _, condition, then_body, else_body = stmt
+    result = EXPRESSION_HANDLERS[condition[0]](condition, env)
+    if result is True or result == 'slay':
+        return exec_block(then_body, env)
+    return exec_block(else_body, env)
 
-    else:
-        raise RuntimeError(f"Unknown statement type: {stype}")
+def exec_return(stmt, env):
+    val = eval_expression(stmt[1], env)
+    return ReturnValue(val)
+
+def exec_tail_call(stmt, env):
+    return TailCall([eval_expression(arg, env) for arg in stmt[1]], stmt[2])
+
+def exec_exit(stmt, env):
+    exit(0)
+
+def exec_function(stmt, env):
+    env.set(stmt[1], stmt)
 
-def run(ast, env=None):
+# Statement node type -> handler(stmt, env)
+STATEMENT_HANDLERS = HandlerTable('statement', {
+    'PRINT': exec_print,
+    'CALL_STMT': exec_call_stmt,
+    'SQUAD_DECL': exec_squad_decl,
+    'STASH_DECL': exec_stash_decl,
+    'SIGMA_DECL': exec_sigma_decl,
+    'TRY_CATCH': exec_try_catch,
+    'TWEET_DECL': exec_tweet_decl,
+    'VAR_ASSIGN': exec_var_assign,
+    'TYPED_DECL': exec_typed_decl,
+    'TYPED_ASSIGN': exec_typed_assign,
+    'INDEX_ASSIGN': exec_index_assign,
+    'FOR': exec_for,
+    'WHILE': exec_while,
+    'IF_ELSE': exec_if_else,
+    'RETURN': exec_return,
+    'TAIL_CALL': exec_tail_call,
+    'EXIT': exec_exit,
+    'FUNCTION': exec_function,
+})
+
+def exec_statement(stmt, env):
+    return STATEMENT_HANDLERS[stmt[0]](stmt, env)
+
+def exec_block(body, env):
+    """Run statements until one hands back a ReturnValue or TailCall status"""
+    handlers = STATEMENT_HANDLERS
+    for s in body:
+        status = handlers[s[0]](s, env)
+        if status is not None:
+            return status
+    return None
+
+# Alternative execution engines: name -> module exposing run(ast, env)
+ENGINE_MODULES = {
+    'closure': 'closures',
+    'vm': 'vm',
+    'python': 'pygen',
+    'stackless': 'stackless',
+}
+
+def run(ast, env=None, engine='tree'):
     if env is None:
         env = Environment()
 
-    for node in ast:
-        exec_statement(node, env)
\ No newline at end of file
+    if engine == 'tree':
+        # A top-level yeet ends the program
+        exec_block(ast, env)
+    elif engine in ENGINE_MODULES:
+        importlib.import_module(ENGINE_MODULES[engine]).run(ast, env)
+    else:
+        raise ValueError(f"Unknown engine '{engine}', pick one of: tree, {', '.join(ENGINE_MODULES)}")
\ No newline at end of file
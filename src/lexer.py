@@ -1,4 +1,10 @@
 import re
+import sys
+from array import array
+
+class LexError(SyntaxError):
+    """Source text no token matches. The parser can't recover from it the way
+    it does from its own errors: the token stream ends where the lexer failed."""
 
 token_specification = [
     ('COMMENT_START', r'on_read\{'),
@@ -14,6 +20,7 @@ token_specification = [
     ('LBRACKET',   r'\['),
     ('RBRACKET',   r'\]'),
     ('COMMA',      r','),
+    ('COLON',      r':'),
     ('DOT',        r'\.'),  # Added for method calls
     ('IDENTIFIER', r'[a-zA-Z_][a-zA-Z0-9_]*'),
     ('NEWLINE',    r'\n'),
@@ -26,6 +33,7 @@ keywords = {
     'sigma': 'SIGMA',
     'tweet': 'TWEET',
     'squad': 'SQUAD',
+    'stash': 'STASH',
     'hawk_tuah': 'HAWK_TUAH',
     'yap': 'YAP',
     'flex': 'FLEX',
@@ -44,41 +52,280 @@ keywords = {
     'panik': 'PANIK',
     'till': 'TILL',
     'to': 'TO',
-    'scooch': 'SCOOCH',  # Added for list method
 }
 
-def tokenize(code):
-    tok_regex = '|'.join(f'(?P<{pair[0]}>{pair[1]})' for pair in token_specification)
-    get_token = re.compile(tok_regex).match
+_master_pattern = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification))
+
+def iter_regex_tokens(code):
+    """Lazily yield (type, value, line, column) tuples; lines and columns are 1-based"""
+    get_token = _master_pattern.match
     pos = 0
-    tokens = []
-    line = code
+    end = len(code)
+    line = 1
+    line_start = 0
 
-    while pos < len(line):
-        match = get_token(line, pos)
-        if not match:
-            raise SyntaxError(f"Unexpected character: {line[pos]}")
+    while pos < end:
+        match = get_token(code, pos)
         typ = match.lastgroup
-        val = match.group()
 
-        if typ == 'NEWLINE' or typ == 'SKIP':
+        if typ == 'NEWLINE':
+            line += 1
+            line_start = pos + 1
+        elif typ == 'SKIP':
             pass
         elif typ == 'COMMENT_START':
-            comment_end = line.find('}', pos)
+            comment_end = code.find('}', pos)
             if comment_end == -1:
-                raise SyntaxError("Unclosed comment")
+                raise LexError(f"Unclosed comment at line {line}, column {pos - line_start + 1}")
+            newlines = code.count('\n', pos, comment_end)
+            if newlines:
+                line += newlines
+                line_start = code.rfind('\n', pos, comment_end) + 1
             pos = comment_end + 1
             continue
         elif typ == 'MISMATCH':
-            raise SyntaxError(f"Unexpected token: {val}")
+            raise LexError(f"Unexpected token: {match.group()} at line {line}, column {pos - line_start + 1}")
         elif typ == 'IDENTIFIER':
-            if val in keywords:
-                tokens.append((keywords[val], val))
-            else:
-                tokens.append((typ, val))
+            val = match.group()
+            yield (keywords.get(val, typ), val, line, pos - line_start + 1)
         else:
-            tokens.append((typ, val))
+            yield (typ, match.group(), line, pos - line_start + 1)
 
         pos = match.end()
 
-    return tokens
\ No newline at end of file
+# Character classes for the table-driven scanner. Everything not listed here
+# is either a decimal digit (checked with str.isdecimal like the regex \d) or a mismatch.
+IDENT_START = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+IDENT_CHARS = IDENT_START | frozenset('0123456789')
+SINGLE_CHAR_TOKENS = {
+    '+': 'OPERATOR', '-': 'OPERATOR', '*': 'OPERATOR', '/': 'OPERATOR',
+    '<': 'OPERATOR', '>': 'OPERATOR', '!': 'OPERATOR', '=': 'ASSIGN',
+    '(': 'LPAREN', ')': 'RPAREN', '{': 'LBRACE', '}': 'RBRACE',
+    '[': 'LBRACKET', ']': 'RBRACKET', ',': 'COMMA', ':': 'COLON', '.': 'DOT',
+}
+COMPARE_STARTS = frozenset('=!<>')
+
+def iter_scan_tokens(code):
+    """Hand-written scanner producing exactly the same stream as iter_regex_tokens"""
+    pos = 0
+    end = len(code)
+    line = 1
+    line_start = 0
+    ident_start = IDENT_START
+    ident_chars = IDENT_CHARS
+    single = SINGLE_CHAR_TOKENS
+
+    while pos < end:
+        char = code[pos]
+        start = pos
+
+        if char == ' ' or char == '\t':
+            pos += 1
+            while pos < end and (code[pos] == ' ' or code[pos] == '\t'):
+                pos += 1
+            continue
+
+        if char == '\n':
+            pos += 1
+            line += 1
+            line_start = pos
+            continue
+
+        if char in ident_start:
+            if char == 'o' and code.startswith('on_read{', pos):
+                comment_end = code.find('}', pos)
+                if comment_end == -1:
+                    raise LexError(f"Unclosed comment at line {line}, column {pos - line_start + 1}")
+                newlines = code.count('\n', pos, comment_end)
+                if newlines:
+                    line += newlines
+                    line_start = code.rfind('\n', pos, comment_end) + 1
+                pos = comment_end + 1
+                continue
+            pos += 1
+            while pos < end and code[pos] in ident_chars:
+                pos += 1
+            val = code[start:pos]
+            yield (keywords.get(val, 'IDENTIFIER'), val, line, start - line_start + 1)
+            continue
+
+        if char.isdecimal() or (char == '-' and pos + 1 < end and code[pos + 1].isdecimal()):
+            pos += 1
+            while pos < end and code[pos].isdecimal():
+                pos += 1
+            if pos + 1 < end and code[pos] == '.' and code[pos + 1].isdecimal():
+                pos += 2
+                while pos < end and code[pos].isdecimal():
+                    pos += 1
+            yield ('NUMBER', code[start:pos], line, start - line_start + 1)
+            continue
+
+        if char == '"':
+            close = code.find('"', pos + 1)
+            newline = code.find('\n', pos + 1, close)
+            if close != -1 and newline == -1:
+                pos = close + 1
+                yield ('STRING', code[start:pos], line, start - line_start + 1)
+                continue
+            raise LexError(f"Unexpected token: {char} at line {line}, column {pos - line_start + 1}")
+
+        if char in COMPARE_STARTS and pos + 1 < end and code[pos + 1] == '=':
+            pos += 2
+            yield ('COMPARE', code[start:pos], line, start - line_start + 1)
+            continue
+
+        typ = single.get(char)
+        if typ is None:
+            raise LexError(f"Unexpected token: {char} at line {line}, column {pos - line_start + 1}")
+        pos += 1
+        yield (typ, char, line, start - line_start + 1)
+
+LEXER_ENGINES = {
+    'regex': iter_regex_tokens,
+    'scan': iter_scan_tokens,
+}
+
+def iter_tokens(code, engine='regex'):
+    if engine not in LEXER_ENGINES:
+        raise ValueError(f"Unknown lexer engine '{engine}', pick one of: {', '.join(LEXER_ENGINES)}")
+    return LEXER_ENGINES[engine](code)
+
+def tokenize(code, engine='regex'):
+    return [(typ, val) for typ, val, _, _ in iter_tokens(code, engine)]
+
+# Integer codes for every token kind, used by the compact TokenBuffer
+TOKEN_KINDS = tuple(['EOF'] + [name for name, _ in token_specification
+                               if name not in ('COMMENT_START', 'NEWLINE', 'SKIP', 'MISMATCH')]
+                    + sorted(set(keywords.values())))
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_KINDS)}
+
+class TokenBuffer:
+    """Compact token storage: kind codes in array('B'), [start, end) source offsets
+    in array('I'); values are sliced from the source on demand"""
+    def __init__(self, code):
+        self.code = code
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        return (TOKEN_KINDS[self.kinds[index]], self.value(index))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self.kinds)))
+
+    def value(self, index):
+        val = self.code[self.starts[index]:self.ends[index]]
+        if TOKEN_KINDS[self.kinds[index]] == 'IDENTIFIER':
+            return sys.intern(val)
+        return val
+
+    def cursor(self):
+        return BufferCursor(self)
+
+class BufferCursor:
+    """Parser-facing read position over a TokenBuffer. Lookahead only reads
+    kind codes; a value is sliced from the source when a token is consumed or
+    its value is asked for."""
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.code = buffer.code
+        self.kinds = buffer.kinds
+        self.starts = buffer.starts
+        self.ends = buffer.ends
+        self.pos = 0
+
+    def peek_type(self, offset=0):
+        try:
+            return TOKEN_KINDS[self.kinds[self.pos + offset]]
+        except IndexError:
+            return 'EOF'
+
+    def peek_value(self, offset=0):
+        index = self.pos + offset
+        try:
+            return self.code[self.starts[index]:self.ends[index]]
+        except IndexError:
+            return ''
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.buffer[index] if index < len(self.kinds) else ('EOF', '')
+
+    def advance(self):
+        index = self.pos
+        try:
+            kind = TOKEN_KINDS[self.kinds[index]]
+        except IndexError:
+            return ('EOF', '')
+        self.pos = index + 1
+        value = self.code[self.starts[index]:self.ends[index]]
+        if kind == 'IDENTIFIER':
+            value = sys.intern(value)
+        return (kind, value)
+
+def describe_offset(code, pos):
+    line = code.count('\n', 0, pos) + 1
+    column = pos - code.rfind('\n', 0, pos)
+    return f"line {line}, column {column}"
+
+def pack_regex_tokens(buffer, code):
+    """The regex engine's loop, appending kind codes and offsets to buffer
+    instead of building a tuple with a line and column for each token"""
+    append_kind = buffer.kinds.append
+    append_start = buffer.starts.append
+    append_end = buffer.ends.append
+    codes = KIND_CODES
+    identifier = codes['IDENTIFIER']
+    keyword_codes = {word: codes[kind] for word, kind in keywords.items()}
+    get_token = _master_pattern.match
+    pos = 0
+    end = len(code)
+    while pos < end:
+        match = get_token(code, pos)
+        typ = match.lastgroup
+        stop = match.end()
+        if typ == 'SKIP' or typ == 'NEWLINE':
+            pass
+        elif typ == 'IDENTIFIER':
+            append_kind(keyword_codes.get(match.group(), identifier))
+            append_start(pos)
+            append_end(stop)
+        elif typ == 'COMMENT_START':
+            comment_end = code.find('}', pos)
+            if comment_end == -1:
+                raise LexError(f"Unclosed comment at {describe_offset(code, pos)}")
+            stop = comment_end + 1
+        elif typ == 'MISMATCH':
+            raise LexError(f"Unexpected token: {match.group()} at {describe_offset(code, pos)}")
+        else:
+            append_kind(codes[typ])
+            append_start(pos)
+            append_end(stop)
+        pos = stop
+    return buffer
+
+def pack_tokens(code, engine='regex'):
+    """Lex code straight into a TokenBuffer without keeping per-token tuples"""
+    buffer = TokenBuffer(code)
+    if engine == 'regex':
+        return pack_regex_tokens(buffer, code)
+    line_starts = [0]
+    newline = code.find('\n')
+    while newline != -1:
+        line_starts.append(newline + 1)
+        newline = code.find('\n', newline + 1)
+
+    append_kind = buffer.kinds.append
+    append_start = buffer.starts.append
+    append_end = buffer.ends.append
+    codes = KIND_CODES
+    for typ, val, line, column in iter_tokens(code, engine):
+        start = line_starts[line - 1] + column - 1
+        append_kind(codes[typ])
+        append_start(start)
+        append_end(start + len(val))
+    return buffer
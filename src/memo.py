@@ -0,0 +1,270 @@
+# memo.py
+"""Automatic memoization of pure cook functions.
+
+A function is pure when its result only depends on its arguments. That means
+it doesn't print, `skibidi`, define functions or use sus/panik with a panik
+body (which prints errors). It also must not read
+or assign a variable it hasn't declared itself (under dynamic scoping that
+would be a caller's or global variable), and may only index-assign squads it
+declared itself.
+
+Calls a pure function makes are checked when it is called: every name it
+(transitively) calls must still resolve to a pure function or to a builtin
+marked pure (the last field of its BUILTIN_FUNCTION tuple; gimme, scoop,
+scooch and sort aren't). Only number, string and boolean arguments and
+results are cached, so a cached squad can never be mutated behind the
+cache's back.
+
+Each pure function has its own LRU cache, kept in the run's RunCache. How
+large it may grow, and whether memoization is on at all, is up to the
+MemoSettings of the run's root Environment.
+"""
+
+from collections import OrderedDict
+from resolver import bind_locals, function_layout
+
+DEFAULT_CACHE_SIZE = 1024
+# Arguments and results of these types are cached; squads are mutable
+KEY_TYPES = (int, float, str, bool)
+# Returned by MemoTable.get for a key that isn't cached
+MISSING = object()
+
+class MemoSettings:
+    """Memoization options of one run, kept on its root Environment"""
+
+    def __init__(self, enabled=True, cache_size=DEFAULT_CACHE_SIZE):
+        self.enabled = enabled
+        self.cache_size = cache_size
+
+class Impure(Exception):
+    pass
+
+class PurityCheck:
+    """Walks a FUNCTION body; names holds the variables certainly declared at
+    each point, squads the ones holding a squad or stash the function created itself"""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = set()
+
+    def block(self, body, names, squads):
+        for stmt in body:
+            self.statement(stmt, names, squads)
+
+    def statement(self, stmt, names, squads):
+        kind = stmt[0]
+        if kind in ('PRINT', 'EXIT', 'FUNCTION'):
+            raise Impure(kind)
+        if kind == 'CALL_STMT':
+            self.call(stmt[1], stmt[2], names)
+        elif kind in ('SIGMA_DECL', 'TWEET_DECL', 'SQUAD_DECL', 'STASH_DECL', 'TYPED_DECL'):
+            self.expression(stmt[2], names)
+            names.add(stmt[1])
+            # squad and stash declarations copy the value, so it is the function's own
+            if kind == 'SQUAD_DECL' or kind == 'STASH_DECL':
+                squads.add(stmt[1])
+            else:
+                squads.discard(stmt[1])
+        elif kind in ('VAR_ASSIGN', 'TYPED_ASSIGN'):
+            self.expression(stmt[2], names)
+            if stmt[1] not in names:
+                raise Impure(f"assigns {stmt[1]}")
+            # Plain assignment doesn't copy, so the variable may now alias a caller's squad
+            squads.discard(stmt[1])
+        elif kind == 'INDEX_ASSIGN':
+            if stmt[1] not in squads:
+                raise Impure(f"mutates {stmt[1]}")
+            self.expression(stmt[2], names)
+            self.expression(stmt[3], names)
+        elif kind == 'FOR':
+            _, var_name, start, end, body = stmt
+            inner_names, inner_squads = names | {var_name}, squads - {var_name}
+            self.block(body, inner_names, inner_squads)
+            if start <= end:
+                # The body runs at least once
+                names |= inner_names
+                squads &= inner_squads
+        elif kind == 'WHILE':
+            self.expression(stmt[1], names)
+            self.block(stmt[2], set(names), set(squads))
+        elif kind == 'IF_ELSE':
+            self.expression(stmt[1], names)
+            then_names, then_squads = set(names), set(squads)
+            self.block(stmt[2], then_names, then_squads)
+            else_names, else_squads = set(names), set(squads)
+            self.block(stmt[3], else_names, else_squads)
+            names |= then_names & else_names
+            squads &= then_squads & else_squads
+        elif kind == 'TRY_CATCH':
+            if stmt[2]:
+                raise Impure("panik prints errors")
+            self.block(stmt[1], set(names), set(squads))
+        elif kind == 'RETURN':
+            self.expression(stmt[1], names)
+        else:
+            raise Impure(kind)
+
+    def expression(self, expr, names):
+        kind = expr[0]
+        if kind in ('IDENTIFIER', 'INDEX', 'SLICE'):
+            if expr[1] not in names:
+                raise Impure(f"reads {expr[1]}")
+            for bound in expr[2:]:
+                if bound is not None:
+                    self.expression(bound, names)
+        elif kind == 'ARRAY':
+            for element in expr[1]:
+                self.expression(element, names)
+        elif kind == 'STASH':
+            for key, value in expr[1]:
+                self.expression(key, names)
+                self.expression(value, names)
+        elif kind == 'UNARY_OP':
+            self.expression(expr[2], names)
+        elif kind in ('LOGIC_OP', 'BIN_OP'):
+            # Walk the left spine iteratively so long chains don't recurse
+            while expr[0] in ('LOGIC_OP', 'BIN_OP'):
+                self.expression(expr[3], names)
+                expr = expr[1]
+            self.expression(expr, names)
+        elif kind == 'CALL':
+            self.call(expr[1], expr[2], names)
+        elif kind == 'METHOD_CALL':
+            if expr[1] not in names:
+                raise Impure(f"reads {expr[1]}")
+            self.call(expr[2], expr[3], names)
+
+    def call(self, name, args, names):
+        # Whether name is pure is only known once the call resolves it
+        for arg in args:
+            self.expression(arg, names)
+        self.calls.add(name)
+
+def called_names(func):
+    """Names a pure FUNCTION node calls, or None when it isn't pure"""
+    params = set(func[2])
+    check = PurityCheck(func)
+    try:
+        check.block(func[3], params, set())
+    except Impure:
+        return None
+    # A called name the function binds itself would resolve to its own variable
+    if check.calls & set(function_layout(func)):
+        return None
+    return frozenset(check.calls)
+
+def resolve(name, env):
+    """What a call of name made in env finds, or None"""
+    if name not in env.root.cache.locally_bound:
+        return env.root.vars.get(name)
+    try:
+        return env.get(name)
+    except NameError:
+        return None
+
+class MemoTable:
+    """LRU result cache of one pure function"""
+
+    def __init__(self, func, calls):
+        self.func = func
+        self.calls = calls
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Names the function calls directly or through other functions, what
+        # they resolved to when last checked (None: not checked yet), and
+        # whether that was all pure
+        self.scope = ()
+        self.resolved = None
+        self.pure = False
+        self.cache_size = DEFAULT_CACHE_SIZE
+
+    def key(self, args, env):
+        """Cache key for a call, or None when this call can't use the cache"""
+        settings = env.root.memo
+        if not settings.enabled:
+            return None
+        for arg in args:
+            if arg.__class__ not in KEY_TYPES:
+                return None
+        resolved = self.resolved
+        if resolved is None:
+            self.check_calls(env)
+        else:
+            scope = self.scope
+            for index in range(len(scope)):
+                if resolve(scope[index], env) is not resolved[index]:
+                    self.check_calls(env)
+                    break
+        if not self.pure:
+            return None
+        # put() runs where the environment isn't at hand, so keep the run's limit
+        self.cache_size = settings.cache_size
+        # 1 and 1.0 print differently, so the types are part of the key
+        return tuple((arg.__class__, arg) for arg in args)
+
+    def check_calls(self, env):
+        """Resolve everything the function calls and decide whether it is pure here"""
+        scope = []
+        pending = list(self.calls)
+        seen = set()
+        pure = True
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            scope.append(name)
+            value = resolve(name, env)
+            if not isinstance(value, tuple) or not value:
+                pure = False
+            elif value[0] == 'FUNCTION':
+                table = memo_table(value, env.root.cache)
+                if table is None:
+                    pure = False
+                else:
+                    pending.extend(table.calls)
+            elif value[0] != 'BUILTIN_FUNCTION' or not value[3]:
+                pure = False
+        if self.resolved is not None:
+            # A called name now means something else, so cached results are stale
+            self.cache.clear()
+        self.scope = tuple(scope)
+        self.resolved = tuple(resolve(name, env) for name in scope)
+        self.pure = pure
+
+    def get(self, key):
+        value = self.cache.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if value.__class__ not in KEY_TYPES:
+            return
+        cache = self.cache
+        cache[key] = value
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+def build_memo_table(func, cache):
+    # Entered functions register their locals, so resolve() can trust the root
+    bind_locals(function_layout(func), cache)
+    calls = called_names(func)
+    return None if calls is None else MemoTable(func, calls)
+
+def memo_table(func, cache):
+    """The MemoTable of a FUNCTION node in cache's run, or None when it isn't pure"""
+    return cache.nodes(build_memo_table).get(func)
+
+def report(cache):
+    """One line per memoized function called in the run that owns cache"""
+    lines = []
+    for func, table in cache.nodes(build_memo_table).items():
+        if table is not None and table.hits + table.misses:
+            lines.append(f"memo: {func[1]}: {table.hits} hits, {table.misses} misses,"
+                         f" {len(table.cache)} cached")
+    return "\n".join(lines) if lines else "memo: no memoized calls"
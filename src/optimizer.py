@@ -0,0 +1,223 @@
+# optimizer.py
+"""AST optimizer run between parsing and execution (`-O`).
+
+- literals are pre-decoded into ('CONST', value) nodes
+- operators over constants are folded, unless evaluating them would fail
+- `rizz_check` on a constant keeps only the branch that can run
+- statements after `yeet`/`skibidi` in the same block are dropped
+- `flex` on a constant false condition, empty `yap` ranges and empty `sus`
+  blocks are dropped; an empty `yap` loop only leaves its final counter value
+
+BS-Lang blocks share their function's environment, so a pruned branch can be
+spliced into the surrounding block without changing scoping.
+
+Afterwards typeinfer drops the run-time coercions of declarations and
+assignments whose types it can prove.
+"""
+
+from interpreter import binary_op, is_slay
+from typeinfer import infer_types
+
+def count_nodes(node):
+    """Number of AST nodes (tagged tuples) in a node, statement list or program.
+    Uses an explicit stack, since long operator chains nest very deep"""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, tuple) and node and isinstance(node[0], str):
+            count += 1
+            stack.extend(node[1:])
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+    return count
+
+# Folded strings and integers bigger than this stay as run-time operations
+MAX_FOLDED_SIZE = 4096
+
+def is_small(value):
+    if isinstance(value, str):
+        return len(value) <= MAX_FOLDED_SIZE
+    if isinstance(value, int):
+        return value.bit_length() <= MAX_FOLDED_SIZE
+    return True
+
+def is_const(expr):
+    return expr[0] == 'CONST'
+
+# Literals evaluate without raising; any other expression might
+LITERALS = ('CONST', 'NUMBER', 'STRING', 'BOOLEAN', 'NULL', 'UNDECIDED')
+
+def ends_block(stmt, in_panik):
+    """Whether nothing after stmt can run. panik runs each statement on its
+    own and moves on when one raises, so there a yeet only ends the block
+    once its value is known not to raise"""
+    if stmt[0] == 'EXIT':
+        return True
+    if stmt[0] == 'RETURN':
+        return not in_panik or stmt[1][0] in LITERALS
+    return False
+
+class Optimizer:
+    def __init__(self):
+        self.folded = 0
+        self.pruned_branches = 0
+        self.unreachable = 0
+        self.empty = 0
+
+    # --- expressions ---------------------------------------------------------
+
+    def expression(self, expr):
+        kind = expr[0]
+        if kind == 'NUMBER':
+            return ('CONST', expr[1])
+        if kind == 'STRING':
+            return ('CONST', expr[1][1:-1])
+        if kind == 'BOOLEAN':
+            return ('CONST', expr[1])
+        if kind == 'NULL':
+            return ('CONST', 'nvm')
+        if kind == 'UNDECIDED':
+            return ('CONST', float('inf'))
+        if kind == 'ARRAY':
+            return ('ARRAY', [self.expression(e) for e in expr[1]])
+        if kind == 'STASH':
+            return ('STASH', [(self.expression(key), self.expression(value)) for key, value in expr[1]])
+        if kind == 'INDEX':
+            return ('INDEX', expr[1], self.expression(expr[2]))
+        if kind == 'SLICE':
+            return ('SLICE', expr[1]) + tuple(None if bound is None else self.expression(bound) for bound in expr[2:])
+        if kind == 'CALL':
+            return ('CALL', expr[1], [self.expression(arg) for arg in expr[2]])
+        if kind == 'METHOD_CALL':
+            return ('METHOD_CALL', expr[1], expr[2], [self.expression(arg) for arg in expr[3]])
+        if kind == 'UNARY_OP':
+            return self.unary_op(expr[1], self.expression(expr[2]))
+        if kind == 'LOGIC_OP':
+            return self.logic_op(self.expression(expr[1]), expr[2], self.expression(expr[3]))
+        if kind == 'BIN_OP':
+            return self.bin_op(expr)
+        return expr
+
+    def fold(self, operands, value):
+        self.folded += operands
+        return ('CONST', value)
+
+    def unary_op(self, op, right):
+        if is_const(right):
+            value = right[1]
+            if op == 'nah':
+                return self.fold(1, not is_slay(value))
+            if op == '-':
+                if isinstance(value, str) and value in ['slay', 'cap']:
+                    value = 1 if value == 'slay' else 0
+                try:
+                    return self.fold(1, -value)
+                except TypeError:
+                    pass
+        return ('UNARY_OP', op, right)
+
+    def logic_op(self, left, op, right):
+        if is_const(left) and is_const(right):
+            if op == 'frfr':
+                return self.fold(2, is_slay(left[1]) and is_slay(right[1]))
+            if op == 'maybe':
+                return self.fold(2, is_slay(left[1]) or is_slay(right[1]))
+        return ('LOGIC_OP', left, op, right)
+
+    def bin_op(self, expr):
+        # Walk the left spine iteratively so very long chains don't recurse
+        chain = []
+        while expr[0] == 'BIN_OP':
+            chain.append(expr)
+            expr = expr[1]
+        left = self.expression(expr)
+        for node in reversed(chain):
+            right = self.expression(node[3])
+            if is_const(left) and is_const(right):
+                try:
+                    value = binary_op(left[1], node[2], right[1])
+                except Exception:
+                    # Errors such as division by zero must still happen at run time
+                    value = None
+                if value is not None and is_small(value):
+                    left = self.fold(2, value)
+                    continue
+            left = ('BIN_OP', left, node[2], right)
+        return left
+
+    # --- statements ----------------------------------------------------------
+
+    def block(self, body, in_panik=False):
+        optimized = []
+        for index, stmt in enumerate(body):
+            replacement = self.statement(stmt, in_panik)
+            optimized.extend(replacement)
+            if replacement and ends_block(replacement[-1], in_panik):
+                self.unreachable += len(body) - index - 1
+                break
+        return optimized
+
+    def statement(self, stmt, in_panik=False):
+        """Return the statements replacing stmt (possibly none)"""
+        kind = stmt[0]
+        if kind == 'PRINT':
+            return [('PRINT', self.expression(stmt[1]))]
+        if kind == 'CALL_STMT':
+            return [('CALL_STMT', stmt[1], [self.expression(arg) for arg in stmt[2]])]
+        if kind in ('SQUAD_DECL', 'STASH_DECL', 'SIGMA_DECL', 'TWEET_DECL', 'VAR_ASSIGN'):
+            return [(kind, stmt[1], self.expression(stmt[2]))]
+        if kind == 'INDEX_ASSIGN':
+            return [('INDEX_ASSIGN', stmt[1], self.expression(stmt[2]), self.expression(stmt[3]))]
+        if kind == 'TRY_CATCH':
+            try_body = self.block(stmt[1])
+            if not try_body:
+                self.empty += 1
+                return []
+            return [('TRY_CATCH', try_body, self.block(stmt[2], in_panik=True))]
+        if kind == 'FOR':
+            _, var_name, start, end, body = stmt
+            if start > end:
+                self.empty += 1
+                return []
+            body = self.block(body)
+            if not body:
+                # The loop only leaves its counter behind
+                self.empty += 1
+                return [('SIGMA_DECL', var_name, ('CONST', end))]
+            return [('FOR', var_name, start, end, body)]
+        if kind == 'WHILE':
+            condition = self.expression(stmt[1])
+            if is_const(condition) and not is_slay(condition[1]):
+                self.empty += 1
+                return []
+            return [('WHILE', condition, self.block(stmt[2]))]
+        if kind == 'IF_ELSE':
+            condition = self.expression(stmt[1])
+            if is_const(condition):
+                self.pruned_branches += 1
+                branch = self.block(stmt[2] if is_slay(condition[1]) else stmt[3])
+                # panik runs each statement on its own, so a longer branch stays one statement there
+                if in_panik and len(branch) > 1:
+                    return [('IF_ELSE', ('CONST', True), branch, [])]
+                return branch
+            return [('IF_ELSE', condition, self.block(stmt[2]), self.block(stmt[3]))]
+        if kind == 'RETURN':
+            return [('RETURN', self.expression(stmt[1]))]
+        if kind == 'FUNCTION':
+            return [('FUNCTION', stmt[1], stmt[2], self.block(stmt[3]))]
+        return [stmt]
+
+    def report(self, before, after, typed):
+        return (f"optimizer: removed {before - after} of {before} nodes"
+                f" ({self.folded} operands folded, {self.pruned_branches} branches pruned,"
+                f" {self.unreachable} unreachable statements, {self.empty} empty loops/blocks),"
+                f" {typed} coercions removed by type inference")
+
+def optimize(ast, whole_program=True):
+    """Return (optimized AST, report line); whole_program is False when
+    functions defined outside ast may run, as in the shell"""
+    optimizer = Optimizer()
+    optimized = optimizer.block(ast)
+    optimized, typed = infer_types(optimized, whole_program)
+    return optimized, optimizer.report(count_nodes(ast), count_nodes(optimized), typed)
@@ -1,287 +1,430 @@
-from lexer import tokenize
-
-tokens = []
-current = 0
-
-def peek(offset=0):
-    return tokens[current + offset] if current + offset < len(tokens) else ('EOF', '')
-
-def advance():
-    global current
-    current += 1
-    return tokens[current - 1]
-
-def match(*expected):
-    if peek()[0] in expected:
-        return advance()
-    return None
-
-def consume(expected_type):
-    token = peek()
-    if token[0] == expected_type:
-        return advance()
-    raise SyntaxError(f"Expected {expected_type}, got {token[0]}")
-
-def parse_primary():
-    token = advance()
-    if token[0] == 'NUMBER':
-        # Handle both integers and floats
-        num_str = token[1]
-        if '.' in num_str:
-            return ('NUMBER', float(num_str))
-        return ('NUMBER', int(num_str))
-    elif token[0] == 'STRING':
-        return ('STRING', token[1])
-    elif token[0] == 'IDENTIFIER':
-        if peek()[0] == 'DOT':
-            consume('DOT')
-            method = consume('IDENTIFIER')[1]
-            if method != 'scooch':
-                raise SyntaxError(f"Unknown method '{method}'")
-            consume('LPAREN')
-            method_args = []
-            while peek()[0] != 'RPAREN':
-                method_args.append(parse_expression())
-                if peek()[0] == 'COMMA':
-                    consume('COMMA')
-                else:
+from collections import deque
+from lexer import tokenize, TokenBuffer, LexError
+
+# Bump whenever the shape of AST nodes changes so cached ASTs are invalidated
+AST_VERSION = 7
+
+# Binary operators: value -> (precedence, associativity, node type); higher binds tighter
+BINARY_OPERATORS = {
+    'maybe': (1, 'left', 'LOGIC_OP'),
+    'frfr': (2, 'left', 'LOGIC_OP'),
+    '==': (4, 'left', 'BIN_OP'),
+    '!=': (4, 'left', 'BIN_OP'),
+    '<': (4, 'left', 'BIN_OP'),
+    '>': (4, 'left', 'BIN_OP'),
+    '<=': (4, 'left', 'BIN_OP'),
+    '>=': (4, 'left', 'BIN_OP'),
+    '+': (5, 'left', 'BIN_OP'),
+    '-': (5, 'left', 'BIN_OP'),
+    '*': (6, 'left', 'BIN_OP'),
+    '/': (6, 'left', 'BIN_OP'),
+}
+BINARY_TOKEN_TYPES = frozenset(['OPERATOR', 'COMPARE', 'AND', 'OR'])
+
+# Prefix operators: value -> (precedence, associativity)
+PREFIX_OPERATORS = {
+    'nah': (3, 'right'),
+    '-': (7, 'right'),
+}
+
+# Builtins that can be called as methods: xs.name(args) is name(xs, args)
+METHODS = frozenset(['scooch', 'len', 'sum', 'min', 'max', 'mean', 'scale', 'has', 'keys', 'sort', 'sorted', 'search'])
+
+EOF_TOKEN = ('EOF', '')
+
+class TokenStream:
+    """Lookahead buffer over any token iterable; consumed tokens are dropped"""
+    def __init__(self, source):
+        self.source = iter(source)
+        self.buffer = deque()
+
+    def peek(self, offset=0):
+        buffer = self.buffer
+        while len(buffer) <= offset:
+            token = next(self.source, None)
+            if token is None:
+                return EOF_TOKEN
+            buffer.append(token)
+        return buffer[offset]
+
+    def peek_type(self, offset=0):
+        return self.peek(offset)[0]
+
+    def peek_value(self, offset=0):
+        return self.peek(offset)[1]
+
+    def advance(self):
+        if self.buffer or self.peek() is not EOF_TOKEN:
+            return self.buffer.popleft()
+        return EOF_TOKEN
+
+def describe(token):
+    if len(token) > 3:
+        return f"{token[0]} at line {token[2]}, column {token[3]}"
+    return token[0]
+
+class Parser:
+    """Recursive-descent parser; each instance owns its token cursor, so
+    separate instances can parse concurrently"""
+    def __init__(self, tokens_input):
+        if isinstance(tokens_input, TokenBuffer):
+            self.tokens = tokens_input.cursor()
+        else:
+            self.tokens = TokenStream(tokens_input)
+        # The cursor's own methods, bound once: they run several times per token
+        self.peek = self.tokens.peek
+        self.peek_type = self.tokens.peek_type
+        self.peek_value = self.tokens.peek_value
+        self.advance = self.tokens.advance
+        self.errors = []
+
+    def match(self, *expected):
+        if self.peek_type() in expected:
+            return self.advance()
+        return None
+
+    def consume(self, expected_type):
+        if self.peek_type() == expected_type:
+            return self.advance()
+        raise SyntaxError(f"Expected {expected_type}, got {describe(self.peek())}")
+
+    def parse_primary(self):
+        token = self.advance()
+        if token[0] == 'NUMBER':
+            # Handle both integers and floats
+            num_str = token[1]
+            if '.' in num_str:
+                return ('NUMBER', float(num_str))
+            return ('NUMBER', int(num_str))
+        elif token[0] == 'STRING':
+            return ('STRING', token[1])
+        elif token[0] == 'IDENTIFIER':
+            following = self.peek_type()
+            if following == 'DOT':
+                self.consume('DOT')
+                method = self.consume('IDENTIFIER')[1]
+                if method not in METHODS:
+                    raise SyntaxError(f"Unknown method '{method}'")
+                self.consume('LPAREN')
+                method_args = []
+                while self.peek_type() != 'RPAREN':
+                    method_args.append(self.parse_expression())
+                    if self.peek_type() == 'COMMA':
+                        self.consume('COMMA')
+                    else:
+                        break
+                self.consume('RPAREN')
+                return ('METHOD_CALL', token[1], method, method_args)
+            elif following == 'LPAREN':
+                func_name = token[1]
+                self.consume('LPAREN')
+                args = []
+                while self.peek_type() != 'RPAREN':
+                    args.append(self.parse_expression())
+                    if self.peek_type() == 'COMMA':
+                        self.consume('COMMA')
+                    else:
+                        break
+                self.consume('RPAREN')
+                return ('CALL', func_name, args)
+            elif following == 'LBRACKET':
+                self.consume('LBRACKET')
+                index_expr = None if self.peek_type() == 'COLON' else self.parse_expression()
+                if not self.match('COLON'):
+                    self.consume('RBRACKET')
+                    return ('INDEX', token[1], index_expr)
+                # Slice: name[start:stop] or name[start:stop:step], any part left out
+                stop_expr = step_expr = None
+                if self.peek_type() not in ('COLON', 'RBRACKET'):
+                    stop_expr = self.parse_expression()
+                if self.match('COLON') and self.peek_type() != 'RBRACKET':
+                    step_expr = self.parse_expression()
+                self.consume('RBRACKET')
+                return ('SLICE', token[1], index_expr, stop_expr, step_expr)
+            else:
+                return ('IDENTIFIER', token[1])
+        elif token[0] == 'TRUE':
+            return ('BOOLEAN', True)
+        elif token[0] == 'FALSE':
+            return ('BOOLEAN', False)
+        elif token[0] == 'NULL':
+            return ('NULL',)
+        elif token[0] == 'UNDECIDED':
+            return ('UNDECIDED',)
+        elif token[0] == 'LBRACKET':  # Array literal
+            elements = []
+            while self.peek_type() != 'RBRACKET' and self.peek_type() != 'EOF':
+                elements.append(self.parse_expression())
+                if not self.match('COMMA'):
                     break
-            consume('RPAREN')
-            return ('METHOD_CALL', token[1], 'scooch', method_args)
-        elif peek()[0] == 'LPAREN':
-            func_name = token[1]
-            consume('LPAREN')
-            args = []
-            while peek()[0] != 'RPAREN':
-                args.append(parse_expression())
-                if peek()[0] == 'COMMA':
-                    consume('COMMA')
+            self.consume('RBRACKET')
+            return ('ARRAY', elements)
+        elif token[0] == 'LBRACE':  # Stash literal: {key: value, ...}
+            pairs = []
+            while self.peek_type() != 'RBRACE' and self.peek_type() != 'EOF':
+                key = self.parse_expression()
+                self.consume('COLON')
+                pairs.append((key, self.parse_expression()))
+                if not self.match('COMMA'):
+                    break
+            self.consume('RBRACE')
+            return ('STASH', pairs)
+        elif token[0] == 'LPAREN':
+            expr = self.parse_expression()
+            self.consume('RPAREN')
+            return expr
+        raise SyntaxError(f"Unexpected token: {token}")
+
+    def parse_binary_operator(self):
+        """Return (precedence, associativity, node, op) for the binary operator at the cursor"""
+        if self.peek_type() in BINARY_TOKEN_TYPES:
+            op = self.peek_value()
+            info = BINARY_OPERATORS.get(op)
+            if info is not None:
+                return info + (op,)
+        return None
+
+    def parse_expression(self):
+        """Precedence climbing with explicit operand/operator stacks, so long
+        operator chains are parsed in a loop instead of one call per term"""
+        operands = []
+        operators = []
+
+        while True:
+            # Prefix operators bind to whatever operand follows them
+            while True:
+                token_type = self.peek_type()
+                if token_type == 'NOT':
+                    self.advance()
+                    operators.append(PREFIX_OPERATORS['nah'] + ('UNARY_OP', 'nah'))
+                elif token_type == 'OPERATOR' and self.peek_value() == '-':
+                    if self.peek_type(1) == 'NUMBER':
+                        break
+                    self.advance()
+                    operators.append(PREFIX_OPERATORS['-'] + ('UNARY_OP', '-'))
                 else:
                     break
-            consume('RPAREN')
-            return ('CALL', func_name, args)
-        elif peek()[0] == 'LBRACKET':
-            consume('LBRACKET')
-            index_expr = parse_expression()
-            consume('RBRACKET')
-            return ('INDEX', token[1], index_expr)
-        else:
-            return ('IDENTIFIER', token[1])
-    elif token[0] == 'TRUE':
-        return ('BOOLEAN', True)
-    elif token[0] == 'FALSE':
-        return ('BOOLEAN', False)
-    elif token[0] == 'NULL':
-        return ('NULL',)
-    elif token[0] == 'UNDECIDED':
-        return ('UNDECIDED',)
-    elif token[0] == 'LBRACKET':  # Array literal
-        elements = []
-        while peek()[0] != 'RBRACKET' and peek()[0] != 'EOF':
-            elements.append(parse_expression())
-            if not match('COMMA'):
+
+            if token_type == 'OPERATOR' and self.peek_value() == '-':
+                self.advance()
+                number = self.advance()[1]
+                operands.append(('NUMBER', -(float(number) if '.' in number else int(number))))
+            else:
+                operands.append(self.parse_primary())
+
+            operator = self.parse_binary_operator()
+            if operator is None:
                 break
-        consume('RBRACKET')
-        return ('ARRAY', elements)
-    elif token[0] == 'LPAREN':
-        expr = parse_expression()
-        consume('RPAREN')
-        return expr
-    raise SyntaxError(f"Unexpected token: {token}")
-
-def parse_comparison():
-    left = parse_primary()
-    
-    while peek()[0] in ['OPERATOR', 'COMPARE']:
-        op = advance()[1]
-        right = parse_primary()
-        left = ('BIN_OP', left, op, right)
-    
-    return left
+            precedence, associativity = operator[0], operator[1]
+            while operators and (operators[-1][0] > precedence or
+                                 (operators[-1][0] == precedence and associativity == 'left')):
+                self.reduce(operands, operators)
+            self.advance()
+            operators.append(operator)
 
-def parse_expression():
-    if match('NOT'):
-        expr = parse_expression()
-        return ('UNARY_OP', 'nah', expr)
-    
-    if match('OPERATOR') and peek()[0] == 'NUMBER' and tokens[current-1][1] == '-':
-        number = advance()
-        num_val = float(number[1]) if '.' in number[1] else int(number[1])
-        return ('NUMBER', -num_val)
-    
-    left = parse_comparison()
-    
-    while peek()[0] in ['AND', 'OR']:
-        op = advance()[1]
-        right = parse_comparison()
-        left = ('LOGIC_OP', left, op, right)
-    
-    return left
-
-def parse_control_condition():
-    if peek()[0] == 'LPAREN':
-        consume('LPAREN')
-        expr = parse_expression()
-        consume('RPAREN')
-        return expr
-    return parse_expression()
-
-def parse_statement():
-    if match('HAWK_TUAH'):
-        consume('LPAREN')
-        expr = parse_expression()
-        consume('RPAREN')
-        return ('PRINT', expr)
-
-    if match('SQUAD'):  # Array declaration
-        var_name = consume('IDENTIFIER')[1]
-        consume('ASSIGN')
-        if peek()[0] == 'LBRACKET':  # Array literal
-            expr = parse_primary()
+        while operators:
+            self.reduce(operands, operators)
+        return operands[0]
+
+    def reduce(self, operands, operators):
+        _, _, node, op = operators.pop()
+        right = operands.pop()
+        if node == 'UNARY_OP':
+            operands.append((node, op, right))
         else:
-            expr = parse_expression()
-        return ('SQUAD_DECL', var_name, expr)
+            operands.append((node, operands.pop(), op, right))
+
+    def parse_control_condition(self, keyword):
+        # A { here would otherwise parse as a stash literal and fail inside it
+        if self.peek_type() == 'LBRACE':
+            raise SyntaxError(f"Expected a condition after '{keyword}', got {describe(self.peek())}")
+        return self.parse_expression()
+
+    def parse_statement(self):
+        # Peek once and dispatch on the kind instead of trying match() per keyword
+        kind = self.peek_type()
+        if kind == 'HAWK_TUAH':
+            self.advance()
+            self.consume('LPAREN')
+            expr = self.parse_expression()
+            self.consume('RPAREN')
+            return ('PRINT', expr)
+
+        if kind == 'SQUAD':  # Array declaration
+            self.advance()
+            var_name = self.consume('IDENTIFIER')[1]
+            self.consume('ASSIGN')
+            if self.peek_type() == 'LBRACKET':  # Array literal
+                expr = self.parse_primary()
+            else:
+                expr = self.parse_expression()
+            return ('SQUAD_DECL', var_name, expr)
+
+        if kind == 'STASH':  # Hash map declaration
+            self.advance()
+            var_name = self.consume('IDENTIFIER')[1]
+            self.consume('ASSIGN')
+            expr = self.parse_expression()
+            return ('STASH_DECL', var_name, expr)
     
-    if match('SIGMA'):  # Numeric variable declaration
-        var_name = consume('IDENTIFIER')[1]
-        consume('ASSIGN')
-        expr = parse_expression()
-        return ('SIGMA_DECL', var_name, expr)
+        if kind == 'SIGMA':  # Numeric variable declaration
+            self.advance()
+            var_name = self.consume('IDENTIFIER')[1]
+            self.consume('ASSIGN')
+            expr = self.parse_expression()
+            return ('SIGMA_DECL', var_name, expr)
     
-    if match('TWEET'):  # String variable declaration
-        var_name = consume('IDENTIFIER')[1]
-        consume('ASSIGN')
-        expr = parse_expression()
-        return ('TWEET_DECL', var_name, expr)
+        if kind == 'TWEET':  # String variable declaration
+            self.advance()
+            var_name = self.consume('IDENTIFIER')[1]
+            self.consume('ASSIGN')
+            expr = self.parse_expression()
+            return ('TWEET_DECL', var_name, expr)
     
-    if (peek()[0] == 'IDENTIFIER' and 
-        peek(1)[0] == 'LBRACKET' and 
-        peek(2)[0] != 'ASSIGN'):
-        # Array index assignment: arr[index] = value
-        array_name = consume('IDENTIFIER')[1]
-        consume('LBRACKET')
-        index_expr = parse_expression()
-        consume('RBRACKET')
-        consume('ASSIGN')
-        value_expr = parse_expression()
-        return ('INDEX_ASSIGN', array_name, index_expr, value_expr)
+        next_kind = self.peek_type(1) if kind == 'IDENTIFIER' else None
+        if next_kind == 'LBRACKET' and self.peek_type(2) != 'ASSIGN':
+            # Array index assignment: arr[index] = value
+            array_name = self.consume('IDENTIFIER')[1]
+            self.consume('LBRACKET')
+            index_expr = self.parse_expression()
+            self.consume('RBRACKET')
+            self.consume('ASSIGN')
+            value_expr = self.parse_expression()
+            return ('INDEX_ASSIGN', array_name, index_expr, value_expr)
     
-    if peek()[0] == 'IDENTIFIER' and peek(1)[0] == 'ASSIGN':
-        var_name = consume('IDENTIFIER')[1]
-        consume('ASSIGN')
-        expr = parse_expression()
-        return ('VAR_ASSIGN', var_name, expr)
+        if next_kind == 'ASSIGN':
+            var_name = self.consume('IDENTIFIER')[1]
+            self.consume('ASSIGN')
+            expr = self.parse_expression()
+            return ('VAR_ASSIGN', var_name, expr)
     
-    if peek()[0] == 'IDENTIFIER' and peek(1)[0] == 'LPAREN':
-        func_name = advance()[1]
-        consume('LPAREN')
-        args = []
-        while peek()[0] != 'RPAREN':
-            args.append(parse_expression())
-            if peek()[0] == 'COMMA':
-                consume('COMMA')
-        consume('RPAREN')
-        return ('CALL_STMT', func_name, args)
-
-    if match('YAP'):
-        var_name = consume('IDENTIFIER')[1]
-        consume('TILL')
-        start = consume('NUMBER')[1]
-        consume('TO')
-        end = consume('NUMBER')[1]
-        consume('LBRACE')
-        body = []
-        while peek()[0] != 'RBRACE':
-            body.append(parse_statement())
-        consume('RBRACE')
-        return ('FOR', var_name, int(start), int(end), body)
-
-    if match('FLEX'):
-        condition = parse_control_condition()
-        consume('LBRACE')
-        body = []
-        while peek()[0] != 'RBRACE':
-            body.append(parse_statement())
-        consume('RBRACE')
-        return ('WHILE', condition, body)
-
-    if match('RIZZ_CHECK'):
-        condition = parse_control_condition()
-        consume('LBRACE')
-        then_body = []
-        while peek()[0] != 'RBRACE':
-            then_body.append(parse_statement())
-        consume('RBRACE')
-
-        else_body = []
-        if match('NAH_FAM'):
-            consume('LBRACE')
-            while peek()[0] != 'RBRACE':
-                else_body.append(parse_statement())
-            consume('RBRACE')
-        return ('IF_ELSE', condition, then_body, else_body)
-
-    if match('YEET'):
-        value = consume('IDENTIFIER')[1]
-        return ('RETURN', value)
-
-    if match('SKIBIDI'):
-        return ('EXIT',)
+        if next_kind == 'DOT':
+            # xs.method(args) on its own calls method(xs, args) like CALL_STMT
+            _, obj_name, method, method_args = self.parse_primary()
+            return ('CALL_STMT', method, [('IDENTIFIER', obj_name)] + method_args)
+
+        if next_kind == 'LPAREN':
+            func_name = self.advance()[1]
+            self.consume('LPAREN')
+            args = []
+            while self.peek_type() != 'RPAREN':
+                args.append(self.parse_expression())
+                if self.peek_type() == 'COMMA':
+                    self.consume('COMMA')
+            self.consume('RPAREN')
+            return ('CALL_STMT', func_name, args)
+
+        if kind == 'YAP':
+            self.advance()
+            var_name = self.consume('IDENTIFIER')[1]
+            self.consume('TILL')
+            start = self.consume('NUMBER')[1]
+            self.consume('TO')
+            end = self.consume('NUMBER')[1]
+            self.consume('LBRACE')
+            body = []
+            while self.peek_type() != 'RBRACE':
+                body.append(self.parse_statement())
+            self.consume('RBRACE')
+            return ('FOR', var_name, int(start), int(end), body)
+
+        if kind == 'FLEX':
+            self.advance()
+            condition = self.parse_control_condition('flex')
+            self.consume('LBRACE')
+            body = []
+            while self.peek_type() != 'RBRACE':
+                body.append(self.parse_statement())
+            self.consume('RBRACE')
+            return ('WHILE', condition, body)
+
+        if kind == 'RIZZ_CHECK':
+            self.advance()
+            condition = self.parse_control_condition('rizz_check')
+            self.consume('LBRACE')
+            then_body = []
+            while self.peek_type() != 'RBRACE':
+                then_body.append(self.parse_statement())
+            self.consume('RBRACE')
+
+            else_body = []
+            if self.match('NAH_FAM'):
+                self.consume('LBRACE')
+                while self.peek_type() != 'RBRACE':
+                    else_body.append(self.parse_statement())
+                self.consume('RBRACE')
+            return ('IF_ELSE', condition, then_body, else_body)
+
+        if kind == 'YEET':
+            self.advance()
+            return ('RETURN', self.parse_expression())
+
+        if kind == 'SKIBIDI':
+            self.advance()
+            return ('EXIT',)
     
-    if match('SUS'):
-        consume('LBRACE')
-        try_body = []
-        while peek()[0] != 'RBRACE' and peek()[0] != 'EOF':
-            try_body.append(parse_statement())
-        consume('RBRACE')
+        if kind == 'SUS':
+            self.advance()
+            self.consume('LBRACE')
+            try_body = []
+            while self.peek_type() != 'RBRACE' and self.peek_type() != 'EOF':
+                try_body.append(self.parse_statement())
+            self.consume('RBRACE')
         
-        # Parse panik block
-        if not match('PANIK'):
-            raise SyntaxError("Expected 'panik' after 'sus' block")
-        consume('LBRACE')
-        catch_body = []
-        while peek()[0] != 'RBRACE' and peek()[0] != 'EOF':
-            catch_body.append(parse_statement())
-        consume('RBRACE')
+            # Parse panik block
+            if not self.match('PANIK'):
+                raise SyntaxError("Expected 'panik' after 'sus' block")
+            self.consume('LBRACE')
+            catch_body = []
+            while self.peek_type() != 'RBRACE' and self.peek_type() != 'EOF':
+                catch_body.append(self.parse_statement())
+            self.consume('RBRACE')
         
-        return ('TRY_CATCH', try_body, catch_body)
+            return ('TRY_CATCH', try_body, catch_body)
     
-    raise SyntaxError(f"Unknown statement at token {peek()}")
-
-def parse_function():
-    consume('COOK')
-    name = consume('IDENTIFIER')[1]
-    consume('LPAREN')
-    params = []
-    while peek()[0] != 'RPAREN':
-        param = consume('IDENTIFIER')[1]
-        params.append(param)
-        if not match('COMMA'):
-            break
-    consume('RPAREN')
-    consume('LBRACE')
-    body = []
-    while peek()[0] != 'RBRACE':
-        body.append(parse_statement())
-    consume('RBRACE')
-    return ('FUNCTION', name, params, body)
+        raise SyntaxError(f"Unknown statement at token {self.peek()}")
+
+    def parse_function(self):
+        self.consume('COOK')
+        name = self.consume('IDENTIFIER')[1]
+        self.consume('LPAREN')
+        params = []
+        while self.peek_type() != 'RPAREN':
+            param = self.consume('IDENTIFIER')[1]
+            params.append(param)
+            if not self.match('COMMA'):
+                break
+        self.consume('RPAREN')
+        self.consume('LBRACE')
+        body = []
+        while self.peek_type() != 'RBRACE':
+            body.append(self.parse_statement())
+        self.consume('RBRACE')
+        return ('FUNCTION', name, params, body)
+
+    def parse(self):
+        ast = []
+        while self.peek_type() != 'EOF':
+            try:
+                if self.peek_type() == 'COOK':
+                    ast.append(self.parse_function())
+                else:
+                    stmt = self.parse_statement()
+                    ast.append(stmt)
+            except LexError:
+                raise
+            except SyntaxError as e:
+                while (self.peek_type() not in ['EOF', 'HAWK_TUAH', 'SIGMA', 'TWEET', 'SQUAD', 'STASH', 'YAP', 'FLEX', 
+                                        'RIZZ_CHECK', 'YEET', 'SKIBIDI', 'COOK', 'RBRACE']):
+                    self.advance()
+                # No statement starts with }, so step over a stray one
+                if self.peek_type() == 'RBRACE':
+                    self.advance()
+                self.errors.append(e)
+                print(f"Syntax Error: {e}")
+        return ast
 
 def parse(tokens_input):
-    global tokens, current
-    tokens = tokens_input
-    current = 0
-
-    ast = []
-    while peek()[0] != 'EOF':
-        try:
-            if peek()[0] == 'COOK':
-                ast.append(parse_function())
-            else:
-                stmt = parse_statement()
-                ast.append(stmt)
-        except SyntaxError as e:
-            while (peek()[0] not in ['EOF', 'HAWK_TUAH', 'SIGMA', 'TWEET', 'SQUAD', 'YAP', 'FLEX', 
-                                    'RIZZ_CHECK', 'YEET', 'SKIBIDI', 'COOK', 'RBRACE']):
-                advance()
-            print(f"Syntax Error: {e}")
-    return ast
\ No newline at end of file
+    """Parse a token list, a lazy token iterator such as lexer.iter_tokens(),
+    or a compact lexer.TokenBuffer"""
+    return Parser(tokens_input).parse()
@@ -0,0 +1,452 @@
+# pygen.py
+"""Python code generation engine.
+
+The AST is turned into Python source: the program and every `cook` body
+become plain Python functions taking the BS-Lang environment. Loops, branches
+and `sus`/`panik` map onto Python's own statements, int/float arithmetic is
+inlined, and everything else goes through the interpreter helpers, so the
+result behaves like the tree-walker. The source is compiled with compile()
+and the code objects are cached by a hash of the generated source.
+
+Names known to be declared in the current environment are read straight from
+its dict; any other name goes through env.get() so dynamic scoping still works.
+"""
+
+import hashlib
+from collections import OrderedDict
+import interpreter
+from interpreter import (
+    Environment, ReturnValue, MAX_RECURSION_DEPTH, call_function, rebind_tail_call, binary_op, print_value, Squad, is_array, resolve_index, slice_squad, yields_bool, compares_order,
+    CONTAINERS, check_key, stash_get, coerce_squad, coerce_stash, coerce_sigma, coerce_tweet,
+    coerce_assignment, exec_block,
+)
+from resolver import function_layout, bind_locals, CallSite
+from tailcalls import TailCall, mark_block
+from memo import memo_table, MISSING
+
+NUMERIC_TYPES = (int, float)
+# Operator chains longer than this are folded at run time instead of nested
+LONG_CHAIN = 64
+ARITHMETIC_OPS = ('+', '-', '*')
+COMPARISON_OPS = ('>', '<', '==', '!=', '<=', '>=')
+DECLARATION_COERCIONS = {
+    'SIGMA_DECL': 'coerce_sigma',
+    'TWEET_DECL': 'coerce_tweet',
+    'SQUAD_DECL': 'coerce_squad',
+    'STASH_DECL': 'coerce_stash',
+}
+
+# sha256 of generated source -> code object, least recently used first. Code
+# objects hold no AST nodes, so unlike generated functions they can outlive a run.
+code_cache = OrderedDict()
+CODE_CACHE_SIZE = 256
+
+def not_an_array(name):
+    raise RuntimeError(f"'{name}' is not an array")
+
+def unknown_node(kind, node_type):
+    raise RuntimeError(f"Unknown {kind} type: {node_type}")
+
+def negate(value):
+    if isinstance(value, str) and value in ['slay', 'cap']:
+        value = 1 if value == 'slay' else 0
+    return -value
+
+def fold_chain(value, steps):
+    """Left-fold a long operator chain; each step is (op, thunk for the right operand)"""
+    for op, right in steps:
+        value = binary_op(value, op, right())
+    return value
+
+def invoke_generated(target, name, args, env):
+    """interpreter.invoke_function for a call site that cached a generated function"""
+    func, body = target
+    table = memo_table(func, env.root.cache)
+    key = None if table is None else table.key(args, env)
+    if key is not None:
+        value = table.get(key)
+        if value is not MISSING:
+            return value
+    params = func[2]
+    interpreter.current_recursion_depth += 1
+    try:
+        if interpreter.current_recursion_depth > MAX_RECURSION_DEPTH:
+            raise RuntimeError("Stack overflow: too delulu")
+        if len(params) != len(args):
+            raise RuntimeError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
+        func_env = Environment(env)
+        variables = func_env.vars
+        for param, arg in zip(params, args):
+            variables[param] = arg
+        discard_result = False
+        while True:
+            status = body(func_env)
+            if status is None:
+                value = 'nvm'
+                break
+            if status.__class__ is ReturnValue:
+                value = status.value
+                break
+            discard_result = discard_result or not status.returns_value
+            if not rebind_tail_call(func, func_env, status.call_args):
+                value = call_function(func[1], status.call_args, func_env, run_body)
+                break
+    finally:
+        interpreter.current_recursion_depth -= 1
+    if discard_result:
+        value = 'nvm'
+    if key is not None:
+        table.put(key, value)
+    return value
+
+def make_site_call(name):
+    """site_call(args, env) through an inline cache of what name resolves to"""
+    site = CallSite(name)
+
+    def site_call(args, env):
+        func = env.root.vars.get(name)
+        if func is site.func:
+            target = site.target
+            if target.__class__ is tuple:
+                return invoke_generated(target, name, args, env)
+            return target(args)
+        if isinstance(func, tuple) and func and func[0] == 'FUNCTION':
+            cache = env.root.cache
+            site.fill(func, cache, (func, generated_function(func, cache)))
+        else:
+            site.fill(func, env.root.cache)
+        return call_function(name, args, env, run_body)
+    return site_call
+
+class Generator:
+    def __init__(self):
+        self.lines = []
+        self.functions = []   # FUNCTION nodes; bs_fn_<k> is generated from functions[k]
+        self.pending = []
+        self.call_sites = []  # called names; SITES[k] is the cached call for call_sites[k]
+        self.temp_count = 0
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def temp(self):
+        self.temp_count += 1
+        return f"_t{self.temp_count}"
+
+    def function_index(self, node):
+        self.functions.append(node)
+        self.pending.append(len(self.functions) - 1)
+        return len(self.functions) - 1
+
+    def module(self, ast):
+        self.define('bs_program', ast, (), '<program>')
+        while self.pending:
+            index = self.pending.pop(0)
+            func = self.functions[index]
+            self.define(f'bs_fn_{index}', mark_block(func[3], func[1], True), func[2], f"cook {func[1]}({', '.join(func[2])})")
+        return '\n'.join(self.lines) + '\n'
+
+    def define(self, py_name, body, params, comment):
+        self.emit(0, f"def {py_name}(env):  # {comment}")
+        self.emit(1, "v = env.vars")
+        self.block(body, 1, set(params))
+        self.emit(0, "")
+
+    def block(self, body, indent, declared):
+        """Emit statements; declared holds the names certainly present in env.vars"""
+        if not body:
+            self.emit(indent, "pass")
+        for stmt in body:
+            self.statement(stmt, indent, declared)
+        return declared
+
+    # --- statements ----------------------------------------------------------
+
+    def statement(self, stmt, indent, declared):
+        kind = stmt[0]
+        emit = self.emit
+        if kind == 'PRINT':
+            emit(indent, f"print_value({self.expression(stmt[1], declared)})")
+        elif kind == 'CALL_STMT':
+            emit(indent, self.call(stmt[1], stmt[2], declared))
+        elif kind in DECLARATION_COERCIONS:
+            _, name, expr = stmt
+            value = self.expression(expr, declared)
+            emit(indent, f"v[{name!r}] = {DECLARATION_COERCIONS[kind]}({name!r}, {value})")
+            declared.add(name)
+        elif kind == 'VAR_ASSIGN':
+            self.assignment(stmt, indent, declared)
+        elif kind == 'TYPED_DECL':
+            emit(indent, f"v[{stmt[1]!r}] = {self.expression(stmt[2], declared)}")
+            declared.add(stmt[1])
+        elif kind == 'TYPED_ASSIGN':
+            _, name, expr, _ = stmt
+            if name in declared:
+                emit(indent, f"v[{name!r}] = {self.expression(expr, declared)}")
+            else:
+                emit(indent, f"env.set({name!r}, {self.expression(expr, declared)}, True)")
+        elif kind == 'INDEX_ASSIGN':
+            _, name, index_expr, value_expr = stmt
+            array, index = self.temp(), self.temp()
+            index_code = self.expression(index_expr, declared)
+            value_code = self.expression(value_expr, declared)
+            emit(indent, f"{array} = {self.load(name, declared)}")
+            emit(indent, f"if {array}.__class__ is dict:")
+            emit(indent + 1, f"{index} = check_key({index_code})")
+            emit(indent + 1, f"{array}[{index}] = {value_code}")
+            emit(indent, "else:")
+            emit(indent + 1, f"if not is_array({array}):")
+            emit(indent + 2, f"not_an_array({name!r})")
+            emit(indent + 1, f"{index} = resolve_index({array}, {index_code})")
+            emit(indent + 1, f"{array}.set({index}, {value_code})")
+        elif kind == 'TRY_CATCH':
+            emit(indent, "try:")
+            self.block(stmt[1], indent + 1, set(declared))
+            emit(indent, "except Exception:")
+            if not stmt[2]:
+                emit(indent + 1, "pass")
+            # Every panik statement reports its own error and the next one still runs
+            for catch_stmt in stmt[2]:
+                emit(indent + 1, "try:")
+                self.statement(catch_stmt, indent + 2, set(declared))
+                emit(indent + 1, "except Exception as nested_e:")
+                emit(indent + 2, "print(f'Error in panik block: {nested_e}')")
+        elif kind == 'FOR':
+            _, name, start, end, body = stmt
+            emit(indent, f"for v[{name!r}] in range({start!r}, {end!r} + 1):")
+            inner = self.block(body, indent + 1, declared | {name})
+            if start <= end:
+                declared |= inner
+        elif kind == 'WHILE':
+            emit(indent, f"while {self.condition(stmt[1], declared)}:")
+            self.block(stmt[2], indent + 1, set(declared))
+        elif kind == 'IF_ELSE':
+            emit(indent, f"if {self.condition(stmt[1], declared)}:")
+            then_declared = self.block(stmt[2], indent + 1, set(declared))
+            emit(indent, "else:")
+            else_declared = self.block(stmt[3], indent + 1, set(declared))
+            declared |= then_declared & else_declared
+        elif kind == 'RETURN':
+            # A plain Python return, so it also leaves sus/panik without being caught
+            emit(indent, f"return ReturnValue({self.expression(stmt[1], declared)})")
+        elif kind == 'TAIL_CALL':
+            args = ', '.join(self.expression(arg, declared) for arg in stmt[1])
+            emit(indent, f"return TailCall([{args}], {stmt[2]!r})")
+        elif kind == 'EXIT':
+            emit(indent, "exit(0)")
+        elif kind == 'FUNCTION':
+            emit(indent, f"v[{stmt[1]!r}] = FUNCS[{self.function_index(stmt)}]")
+            declared.add(stmt[1])
+        else:
+            emit(indent, f"unknown_node('statement', {kind!r})")
+
+    def assignment(self, stmt, indent, declared):
+        _, name, expr = stmt
+        value = self.temp()
+        self.emit(indent, f"{value} = {self.expression(expr, declared)}")
+        if name in declared:
+            existing = self.temp()
+            self.emit(indent, f"{existing} = v[{name!r}]")
+            # Same-type assignments never need a coercion
+            self.emit(indent, f"v[{name!r}] = {value} if {value}.__class__ is {existing}.__class__"
+                              f" else coerce_assignment({existing}, {value})")
+        else:
+            self.emit(indent, f"env.set({name!r}, coerce_assignment(env.get({name!r}), {value}), True)")
+
+    # --- expressions ---------------------------------------------------------
+
+    def load(self, name, declared):
+        if name in declared:
+            return f"v[{name!r}]"
+        return f"env.get({name!r})"
+
+    def call(self, name, arg_exprs, declared, first_arg=None):
+        args = [self.expression(arg, declared) for arg in arg_exprs]
+        if first_arg is not None:
+            args.insert(0, first_arg)
+        self.call_sites.append(name)
+        return f"SITES[{len(self.call_sites) - 1}]([{', '.join(args)}], env)"
+
+    def condition(self, expr, declared):
+        """A native bool telling whether expr is slay; equality tests and logic already are one"""
+        if yields_bool(expr):
+            return self.expression(expr, declared)
+        if compares_order(expr):
+            # Comparing a squad gives a squad, which isn't slay
+            return f"({self.expression(expr, declared)} is True)"
+        return self.truth(self.expression(expr, declared))
+
+    def truth(self, code):
+        value = self.temp()
+        return f"(({value} := {code}) is True or {value} == 'slay')"
+
+    def binary(self, left, op, right):
+        a, b = self.temp(), self.temp()
+        if op in ARITHMETIC_OPS:
+            # Mixed int/float can overflow converting to float, so only same-type operands go direct
+            return (f"({a} {op} {b} if ({a} := {left}).__class__ is ({b} := {right}).__class__"
+                    f" and {a}.__class__ in NUMERIC_TYPES else binary_op({a}, {op!r}, {b}))")
+        if op in COMPARISON_OPS:
+            return (f"({a} {op} {b} if (({a} := {left}).__class__ in NUMERIC_TYPES)"
+                    f" & (({b} := {right}).__class__ in NUMERIC_TYPES) else binary_op({a}, {op!r}, {b}))")
+        return f"binary_op({left}, {op!r}, {right})"
+
+    def constant(self, value):
+        if isinstance(value, float) and value != value * 0:
+            # inf and nan have no literal syntax
+            return f"float({str(value)!r})"
+        return f"({value!r})"
+
+    def expression(self, expr, declared):
+        kind = expr[0]
+        if kind == 'NUMBER':
+            return f"({expr[1]!r})"
+        if kind == 'CONST':
+            return self.constant(expr[1])
+        if kind == 'STRING':
+            return repr(expr[1][1:-1])
+        if kind == 'BOOLEAN':
+            return repr(expr[1])
+        if kind == 'NULL':
+            return "'nvm'"
+        if kind == 'UNDECIDED':
+            return "INF"
+        if kind == 'IDENTIFIER':
+            return self.load(expr[1], declared)
+        if kind == 'ARRAY':
+            return f"Squad([{', '.join(self.expression(e, declared) for e in expr[1])}])"
+        if kind == 'STASH':
+            pairs = ', '.join(f"check_key({self.expression(key, declared)}): {self.expression(value, declared)}"
+                              for key, value in expr[1])
+            return f"{{{pairs}}}"
+        if kind == 'INDEX':
+            array, index = self.temp(), self.temp()
+            code = self.expression(expr[2], declared)
+            # The index is evaluated once the container checks out, by one copy of its code
+            return (f"(({array}.items[resolve_index({array}, {index})] if {array}.__class__ is Squad"
+                    f" else stash_get({array}, {index}))"
+                    f" if ({array} := {self.load(expr[1], declared)}).__class__ in CONTAINERS"
+                    f" and ({index} := {code}) is {index}"
+                    f" else not_an_array({expr[1]!r}))")
+        if kind == 'SLICE':
+            array = self.temp()
+            bounds = ', '.join('None' if bound is None else self.expression(bound, declared) for bound in expr[2:])
+            return (f"(slice_squad({array}, {bounds}) if is_array({array} := {self.load(expr[1], declared)})"
+                    f" else not_an_array({expr[1]!r}))")
+        if kind == 'UNARY_OP':
+            right = self.expression(expr[2], declared)
+            if expr[1] == 'nah':
+                return f"(not {self.truth(right)})"
+            if expr[1] == '-':
+                return f"negate({right})"
+            return f"({right}, None)[1]"
+        if kind == 'LOGIC_OP':
+            # Both operands are always evaluated, so no short-circuiting `and`/`or`
+            left = self.expression(expr[1], declared)
+            right = self.expression(expr[3], declared)
+            if expr[2] == 'frfr':
+                return f"({self.truth(left)} & {self.truth(right)})"
+            if expr[2] == 'maybe':
+                return f"({self.truth(left)} | {self.truth(right)})"
+            return f"({left}, {right}, None)[2]"
+        if kind == 'BIN_OP':
+            chain = []
+            while expr[0] == 'BIN_OP':
+                chain.append(expr)
+                expr = expr[1]
+            code = self.expression(expr, declared)
+            if len(chain) > LONG_CHAIN:
+                steps = ', '.join(f"({node[2]!r}, lambda: {self.expression(node[3], declared)})"
+                                  for node in reversed(chain))
+                return f"fold_chain({code}, ({steps},))"
+            for node in reversed(chain):
+                code = self.binary(code, node[2], self.expression(node[3], declared))
+            return code
+        if kind == 'CALL':
+            return self.call(expr[1], expr[2], declared)
+        if kind == 'METHOD_CALL':
+            return self.call(expr[2], expr[3], declared, self.load(expr[1], declared))
+        return f"unknown_node('expression', {kind!r})"
+
+RUNTIME = {
+    'ReturnValue': ReturnValue,
+    'TailCall': TailCall,
+    'binary_op': binary_op,
+    'print_value': print_value,
+    'Squad': Squad,
+    'is_array': is_array,
+    'resolve_index': resolve_index,
+    'slice_squad': slice_squad,
+    'coerce_squad': coerce_squad,
+    'coerce_stash': coerce_stash,
+    'check_key': check_key,
+    'stash_get': stash_get,
+    'CONTAINERS': CONTAINERS,
+    'coerce_sigma': coerce_sigma,
+    'coerce_tweet': coerce_tweet,
+    'coerce_assignment': coerce_assignment,
+    'not_an_array': not_an_array,
+    'unknown_node': unknown_node,
+    'negate': negate,
+    'fold_chain': fold_chain,
+    'NUMERIC_TYPES': NUMERIC_TYPES,
+    'INF': float('inf'),
+}
+
+def generate(ast):
+    """Return the Python source generated for a program"""
+    return Generator().module(ast)
+
+def compile_source(source):
+    key = hashlib.sha256(source.encode('utf-8')).digest()
+    code = code_cache.get(key)
+    if code is None:
+        code = compile(source, '<bs-python>', 'exec')
+        code_cache[key] = code
+        if len(code_cache) > CODE_CACHE_SIZE:
+            code_cache.popitem(last=False)
+    else:
+        code_cache.move_to_end(key)
+    return code
+
+def load(ast, functions=(), cache=None):
+    """Generate, compile and execute a module; returns its bs_program function,
+    or None when Python cannot compile it (e.g. blocks nested too deeply).
+    The functions the module defines are registered with cache, a RunCache."""
+    generator = Generator()
+    for func in functions:
+        generator.function_index(func)
+    try:
+        code = compile_source(generator.module(ast))
+    except (SyntaxError, RecursionError, MemoryError):
+        return None
+    namespace = dict(RUNTIME, FUNCS=tuple(generator.functions),
+                     SITES=tuple(make_site_call(name) for name in generator.call_sites))
+    exec(code, namespace)
+    if cache is not None:
+        generated = cache.nodes(generate_function)
+        for index, func in enumerate(generator.functions):
+            bind_locals(function_layout(func), cache)
+            generated.add(func, namespace[f'bs_fn_{index}'])
+    return namespace['bs_program']
+
+def generate_function(func, cache):
+    program = load((), (func,), cache)
+    if program is None:
+        # Fall back to the tree-walker for bodies Python cannot compile
+        bind_locals(function_layout(func), cache)
+        return lambda env: exec_block(func[3], env)
+    return program.__globals__['bs_fn_0']
+
+def generated_function(func, cache):
+    return cache.nodes(generate_function).get(func)
+
+def run_body(func, func_env):
+    return generated_function(func, func_env.root.cache)(func_env)
+
+def run(ast, env):
+    program = load(ast, cache=env.root.cache)
+    if program is None:
+        exec_block(ast, env)
+    else:
+        program(env)
@@ -0,0 +1,93 @@
+# resolver.py
+"""Resolver pass: gives every variable a cook function declares a frame slot.
+
+Parameters, `sigma`/`tweet`/`squad`/`stash` declarations, `yap` counters and nested
+`cook` definitions all bind into the function's own environment, so each gets
+a fixed slot. Only the closure engine compiles accesses to (0, slot)
+addresses; the tree, vm, python and stackless engines keep their variables
+in name-keyed environments and use the layouts here just to know which names
+a function binds locally (see bind_locals).
+
+BS-Lang scoping is dynamic: a name a function reads but never declares
+belongs to whichever caller declared it, so those names (and slots read
+before their declaration has run) are still looked up by name through the
+caller chain, even in the closure engine.
+"""
+
+import weakref
+
+DECLARATIONS = ('SIGMA_DECL', 'TWEET_DECL', 'SQUAD_DECL', 'STASH_DECL', 'TYPED_DECL', 'FUNCTION')
+
+# Never the value of a root binding, so an empty call site always misses
+UNCACHED = object()
+
+def declared_names(body, names):
+    """Collect names a statement list binds in its own environment"""
+    for stmt in body:
+        kind = stmt[0]
+        if kind in DECLARATIONS:
+            names.setdefault(stmt[1], len(names))
+        elif kind == 'FOR':
+            names.setdefault(stmt[1], len(names))
+            declared_names(stmt[4], names)
+        elif kind == 'WHILE':
+            declared_names(stmt[2], names)
+        elif kind == 'IF_ELSE':
+            declared_names(stmt[2], names)
+            declared_names(stmt[3], names)
+        elif kind == 'TRY_CATCH':
+            declared_names(stmt[1], names)
+            declared_names(stmt[2], names)
+    return names
+
+def function_layout(func):
+    """name -> slot for a FUNCTION node; parameters come first, in order"""
+    names = {}
+    for param in func[2]:
+        names.setdefault(param, len(names))
+    return declared_names(func[3], names)
+
+def address(layout, name):
+    """(depth, slot) for a name declared in the function, None for dynamic lookup"""
+    if layout is not None and name in layout:
+        return (0, layout[name])
+    return None
+
+def bind_locals(names, cache):
+    """Record in a run's RunCache the names a function entered in that run
+    binds. A call by such a name may resolve in any caller's environment, so
+    call sites caching it are reset."""
+    locally_bound = cache.locally_bound
+    for name in names:
+        if name not in locally_bound:
+            locally_bound.add(name)
+            for site in cache.call_sites.pop(name, ()):
+                site.func = UNCACHED
+                site.target = None
+
+class CallSite:
+    """Inline cache for one call site.
+
+    A name no cook function entered so far in the run binds locally can only
+    resolve in the root environment, so a hit is one dict lookup plus an identity check against
+    the cached function: rebinding the name in the root makes the check fail.
+    target is the builtin's Python function, or engine data for a cook function.
+    """
+    __slots__ = ('name', 'func', 'target', '__weakref__')
+
+    def __init__(self, name):
+        self.name = name
+        self.func = UNCACHED
+        self.target = None
+
+    def fill(self, func, cache, target=None):
+        """Cache func, what the name resolved to in the run that owns cache"""
+        if self.name in cache.locally_bound or not isinstance(func, tuple) or not func:
+            return
+        if func[0] == 'BUILTIN_FUNCTION':
+            target = func[2]
+        elif func[0] != 'FUNCTION':
+            return
+        self.func = func
+        self.target = target
+        cache.call_sites.setdefault(self.name, weakref.WeakSet()).add(self)
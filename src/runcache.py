@@ -0,0 +1,56 @@
+# runcache.py
+"""Caches that belong to one run.
+
+Engines derive things from FUNCTION nodes as the program runs: memo tables,
+bodies with their tail calls marked, compiled closures, bytecode, generated
+Python. A RunCache lives on the run's root Environment, so all of that is
+dropped with the run, and a second run of the same AST starts from scratch
+instead of seeing the first one's entries and statistics.
+
+The names functions bind locally (see resolver.bind_locals) are per run
+too: one program declaring a local `helper` must not stop another from
+finding its top-level `helper` in the root.
+"""
+
+class NodeCache:
+    """id(node) -> what build(node, cache) derived from the node.
+
+    The node is stored with its value, so its id can't be reused by another
+    node while the entry exists.
+    """
+
+    def __init__(self, cache, build):
+        self.cache = cache
+        self.build = build
+        self.entries = {}
+
+    def get(self, node):
+        entry = self.entries.get(id(node))
+        if entry is None:
+            entry = (node, self.build(node, self.cache))
+            self.entries[id(node)] = entry
+        return entry[1]
+
+    def add(self, node, value):
+        """Store a value built some other way, e.g. several at once"""
+        self.entries[id(node)] = (node, value)
+
+    def items(self):
+        """(node, value) pairs, in the order they were built"""
+        return list(self.entries.values())
+
+class RunCache:
+    """Everything one run has cached, one NodeCache per build function"""
+
+    def __init__(self):
+        self.node_caches = {}
+        # Names some function entered in this run binds in its own environment
+        self.locally_bound = set()
+        # name -> call sites currently allowed to cache that name
+        self.call_sites = {}
+
+    def nodes(self, build):
+        cache = self.node_caches.get(build)
+        if cache is None:
+            cache = self.node_caches[build] = NodeCache(self, build)
+        return cache
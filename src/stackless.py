@@ -0,0 +1,532 @@
+# stackless.py
+"""Stackless tree-walking engine (`-engine=stackless`).
+
+Instead of recursing through exec_statement/eval_expression, the machine keeps
+its own continuation stack of (handler, node, env) tasks and a value stack for
+intermediate results, so neither nested expressions nor BS-Lang recursion use
+Python stack. Call depth is bounded by memory_budget instead of
+MAX_RECURSION_DEPTH, and a Machine can be paused before any statement and
+resumed later with all of its state intact.
+"""
+
+from interpreter import (
+    Environment, HandlerTable, rebind_tail_call, binary_op, print_value, Squad, is_array, resolve_index, slice_squad,
+    check_key, stash_get, coerce_squad, coerce_stash, coerce_sigma, coerce_tweet, coerce_assignment,
+    EXPRESSION_HANDLERS,
+)
+from tailcalls import tail_call_body
+from memo import memo_table, MISSING
+
+# Bytes of continuation stack a script may use before it overflows
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+memory_budget = DEFAULT_MEMORY_BUDGET
+
+# Approximate CPython cost of one call frame (CallFrame, Environment and its
+# vars dict) and of one stack entry, measured with tracemalloc
+FRAME_BYTES = 500
+ENTRY_BYTES = 64
+
+class CallFrame:
+    __slots__ = ('func', 'env', 'task_base', 'value_base', 'discard', 'memo')
+
+    def __init__(self, func, env, task_base, value_base):
+        self.func = func
+        self.env = env
+        self.task_base = task_base  # tasks below this belong to the caller
+        self.value_base = value_base
+        self.discard = False  # a tail call statement ran, so the function returns nvm
+        self.memo = None  # (MemoTable, key) to store the result under
+
+class Handler:
+    """An active sus (catch_body set) or a single guarded panik statement"""
+    __slots__ = ('depth', 'task_base', 'value_base', 'catch_body', 'env')
+
+    def __init__(self, depth, task_base, value_base, catch_body, env):
+        self.depth = depth  # number of call frames when the block was entered
+        self.task_base = task_base
+        self.value_base = value_base
+        self.catch_body = catch_body
+        self.env = env
+
+class Machine:
+    """Runs a program one task at a time on explicit stacks"""
+
+    def __init__(self, ast, env=None, budget=None):
+        self.env = Environment() if env is None else env
+        self.budget = memory_budget if budget is None else budget
+        self.tasks = []
+        self.values = []
+        self.frames = []
+        self.handlers = []
+        self.pause_requested = False
+        push_block(self, ast, self.env)
+
+    @property
+    def finished(self):
+        return not self.tasks
+
+    def pause(self):
+        """Ask a running machine to stop before its next statement"""
+        self.pause_requested = True
+
+    def run(self, statements=None):
+        """Run until the program ends (True) or until it pauses (False), which
+        happens after the given number of statements or when pause() is called.
+        Calling run again resumes where it stopped."""
+        self.pause_requested = False
+        tasks = self.tasks
+        pop = tasks.pop
+        executed = 0
+        while tasks:
+            task = pop()
+            handler = task[0]
+            if handler is run_statement:
+                if self.pause_requested or executed == statements:
+                    tasks.append(task)
+                    self.pause_requested = False
+                    return False
+                executed += 1
+            try:
+                handler(self, task[1], task[2])
+            except Exception as error:
+                self.unwind(error)
+        return True
+
+    def unwind(self, error):
+        """Route an error to the innermost sus/panik block, dropping frames as needed"""
+        if not self.handlers:
+            raise error
+        handler = self.handlers.pop()
+        del self.frames[handler.depth:]
+        del self.tasks[handler.task_base:]
+        del self.values[handler.value_base:]
+        if handler.catch_body is None:
+            print(f"Error in panik block: {error}")
+            return
+        # Each panik statement reports its own error and the next one still runs
+        for stmt in reversed(handler.catch_body):
+            self.tasks.append((run_panik_statement, stmt, handler.env))
+
+    def in_handler(self):
+        """Whether the running function has a sus/panik block open"""
+        return bool(self.handlers) and self.handlers[-1].depth == len(self.frames)
+
+    def check_budget(self):
+        used = len(self.frames) * FRAME_BYTES + (len(self.tasks) + len(self.values)) * ENTRY_BYTES
+        if used > self.budget:
+            raise RuntimeError("Stack overflow: too delulu")
+
+# --- tasks: handler(machine, node, env) ------------------------------------
+
+def push_block(m, body, env):
+    if body:
+        m.tasks.append((run_block, (body, 0), env))
+
+def run_block(m, position, env):
+    body, index = position
+    if index + 1 < len(body):
+        m.tasks.append((run_block, (body, index + 1), env))
+    m.tasks.append((run_statement, body[index], env))
+
+def run_statement(m, stmt, env):
+    STATEMENTS[stmt[0]](m, stmt, env)
+
+def run_expression(m, expr, env):
+    EXPRESSIONS[expr[0]](m, expr, env)
+
+def push_expression(m, expr, env):
+    """Evaluate expr next; its value ends up on the value stack. Leaves and
+    operators over two leaves are evaluated right away, anything deeper runs as
+    a task so nesting never grows the Python stack."""
+    kind = expr[0]
+    leaf = LEAVES.get(kind)
+    if leaf is not None:
+        m.values.append(leaf(expr, env))
+    elif kind == 'BIN_OP' and expr[1][0] in LEAVES and expr[3][0] in LEAVES:
+        left, right = expr[1], expr[3]
+        m.values.append(binary_op(LEAVES[left[0]](left, env), expr[2], LEAVES[right[0]](right, env)))
+    else:
+        m.tasks.append((run_expression, expr, env))
+
+def schedule_expression(m, expr, env):
+    """Evaluate expr after the tasks pushed after it"""
+    m.tasks.append((run_expression, expr, env))
+
+def push_arguments(m, args, env):
+    if args:
+        for arg in args[:0:-1]:
+            schedule_expression(m, arg, env)
+        push_expression(m, args[0], env)
+
+def pop_arguments(m, argc):
+    values = m.values
+    if not argc:
+        return []
+    args = values[-argc:]
+    del values[-argc:]
+    return args
+
+def discard_value(m, _, env):
+    m.values.pop()
+
+# --- expressions -------------------------------------------------------------
+
+# Expressions without subexpressions, evaluated in a single step
+LEAVES = {kind: EXPRESSION_HANDLERS[kind] for kind in
+          ('NUMBER', 'CONST', 'STRING', 'BOOLEAN', 'NULL', 'UNDECIDED', 'IDENTIFIER')}
+
+def eval_leaf(m, expr, env):
+    m.values.append(LEAVES[expr[0]](expr, env))
+
+def eval_array(m, expr, env):
+    m.tasks.append((finish_array, len(expr[1]), env))
+    push_arguments(m, expr[1], env)
+
+def finish_array(m, count, env):
+    m.values.append(Squad(pop_arguments(m, count)))
+
+def eval_stash(m, expr, env):
+    m.tasks.append((finish_stash, len(expr[1]), env))
+    push_arguments(m, [part for pair in expr[1] for part in pair], env)
+
+def finish_stash(m, count, env):
+    parts = pop_arguments(m, 2 * count)
+    stash = {}
+    for position in range(0, 2 * count, 2):
+        stash[check_key(parts[position])] = parts[position + 1]
+    m.values.append(stash)
+
+def eval_index(m, expr, env):
+    array = env.get(expr[1])
+    if not is_array(array) and array.__class__ is not dict:
+        raise RuntimeError(f"'{expr[1]}' is not an array")
+    m.values.append(array)
+    m.tasks.append((finish_index, None, env))
+    push_expression(m, expr[2], env)
+
+def finish_index(m, _, env):
+    index = m.values.pop()
+    array = m.values.pop()
+    if array.__class__ is dict:
+        m.values.append(stash_get(array, index))
+    else:
+        m.values.append(array.items[resolve_index(array, index)])
+
+def eval_slice(m, expr, env):
+    array = env.get(expr[1])
+    if not is_array(array):
+        raise RuntimeError(f"'{expr[1]}' is not an array")
+    m.values.append(array)
+    bounds = expr[2:]
+    present = [bound for bound in bounds if bound is not None]
+    m.tasks.append((finish_slice, bounds, env))
+    push_arguments(m, present, env)
+
+def finish_slice(m, bounds, env):
+    values = iter(pop_arguments(m, sum(1 for bound in bounds if bound is not None)))
+    array = m.values.pop()
+    m.values.append(slice_squad(array, *[None if bound is None else next(values) for bound in bounds]))
+
+def eval_unary_op(m, expr, env):
+    m.tasks.append((finish_unary_op, expr[1], env))
+    push_expression(m, expr[2], env)
+
+def finish_unary_op(m, op, env):
+    right = m.values.pop()
+    if op == 'nah':
+        m.values.append(right is not True and right != 'slay')
+    elif op == '-':
+        if isinstance(right, str) and right in ['slay', 'cap']:
+            right = 1 if right == 'slay' else 0
+        m.values.append(-right)
+    else:
+        m.values.append(None)
+
+def eval_logic_op(m, expr, env):
+    m.tasks.append((finish_logic_op, expr[2], env))
+    schedule_expression(m, expr[3], env)
+    push_expression(m, expr[1], env)
+
+def finish_logic_op(m, op, env):
+    right = m.values.pop()
+    left = m.values.pop()
+    if op == 'frfr':
+        m.values.append((left is True or left == 'slay') and (right is True or right == 'slay'))
+    elif op == 'maybe':
+        m.values.append((left is True or left == 'slay') or (right is True or right == 'slay'))
+    else:
+        m.values.append(None)
+
+def eval_bin_op(m, expr, env):
+    m.tasks.append((finish_bin_op, expr[2], env))
+    schedule_expression(m, expr[3], env)
+    push_expression(m, expr[1], env)
+
+def finish_bin_op(m, op, env):
+    right = m.values.pop()
+    m.values.append(binary_op(m.values.pop(), op, right))
+
+def eval_call(m, expr, env):
+    m.tasks.append((call, (expr[1], len(expr[2])), env))
+    push_arguments(m, expr[2], env)
+
+def eval_method_call(m, expr, env):
+    m.values.append(env.get(expr[1]))
+    m.tasks.append((call, (expr[2], len(expr[3]) + 1), env))
+    push_arguments(m, expr[3], env)
+
+def call(m, target, env):
+    name, argc = target
+    args = pop_arguments(m, argc)
+    # A name no entered function binds locally can only live in the root, so
+    # deep recursion doesn't walk the whole caller chain to find the function
+    func = None if name in env.root.cache.locally_bound else env.root.vars.get(name)
+    if func is None:
+        func = env.get(name)
+    if func.__class__ is not tuple:
+        raise RuntimeError(f"'{name}' is not a function")
+    if func[0] == 'BUILTIN_FUNCTION':
+        m.values.append(func[2](args))
+    elif func[0] == 'FUNCTION':
+        # memo_table also registers the function's locals before its body runs
+        table = memo_table(func, env.root.cache)
+        key = None if table is None else table.key(args, env)
+        if key is not None:
+            value = table.get(key)
+            if value is not MISSING:
+                m.values.append(value)
+                return
+        enter_function(m, func, name, args, env)
+        if key is not None:
+            m.frames[-1].memo = (table, key)
+    else:
+        raise RuntimeError(f"'{name}' is not a function")
+
+def enter_function(m, func, name, args, env):
+    m.check_budget()
+    params = func[2]
+    func_env = Environment(parent=env)
+    if len(params) != len(args):
+        raise RuntimeError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
+    for param, arg in zip(params, args):
+        func_env.vars[param] = arg
+    m.frames.append(CallFrame(func, func_env, len(m.tasks), len(m.values)))
+    m.tasks.append((leave_function, None, func_env))
+    push_block(m, tail_call_body(func, env.root.cache), func_env)
+
+def leave_function(m, _, env):
+    # Running off the end of the body returns nvm
+    leave_frame(m, m.frames.pop(), 'nvm')
+
+def leave_frame(m, frame, value):
+    if frame.memo is not None:
+        frame.memo[0].put(frame.memo[1], value)
+    m.values.append(value)
+
+EXPRESSIONS = HandlerTable('expression', {
+    'NUMBER': eval_leaf,
+    'CONST': eval_leaf,
+    'STRING': eval_leaf,
+    'BOOLEAN': eval_leaf,
+    'NULL': eval_leaf,
+    'UNDECIDED': eval_leaf,
+    'IDENTIFIER': eval_leaf,
+    'ARRAY': eval_array,
+    'STASH': eval_stash,
+    'INDEX': eval_index,
+    'SLICE': eval_slice,
+    'UNARY_OP': eval_unary_op,
+    'LOGIC_OP': eval_logic_op,
+    'BIN_OP': eval_bin_op,
+    'CALL': eval_call,
+    'METHOD_CALL': eval_method_call,
+})
+
+# --- statements --------------------------------------------------------------
+
+def exec_print(m, stmt, env):
+    m.tasks.append((finish_print, None, env))
+    push_expression(m, stmt[1], env)
+
+def finish_print(m, _, env):
+    print_value(m.values.pop())
+
+def exec_call_stmt(m, stmt, env):
+    m.tasks.append((discard_value, None, env))
+    m.tasks.append((call, (stmt[1], len(stmt[2])), env))
+    push_arguments(m, stmt[2], env)
+
+def exec_declaration(m, stmt, env):
+    m.tasks.append((finish_declaration, stmt, env))
+    push_expression(m, stmt[2], env)
+
+DECLARATION_COERCIONS = {
+    'SQUAD_DECL': coerce_squad,
+    'STASH_DECL': coerce_stash,
+    'SIGMA_DECL': coerce_sigma,
+    'TWEET_DECL': coerce_tweet,
+}
+
+def finish_declaration(m, stmt, env):
+    var_name = stmt[1]
+    env.set(var_name, DECLARATION_COERCIONS[stmt[0]](var_name, m.values.pop()))
+
+def exec_var_assign(m, stmt, env):
+    m.tasks.append((finish_var_assign, stmt[1], env))
+    push_expression(m, stmt[2], env)
+
+def finish_var_assign(m, var_name, env):
+    val = coerce_assignment(env.get(var_name), m.values.pop())
+    env.set(var_name, val, update_existing=True)
+
+def exec_typed_decl(m, stmt, env):
+    m.tasks.append((finish_typed_decl, stmt[1], env))
+    push_expression(m, stmt[2], env)
+
+def finish_typed_decl(m, var_name, env):
+    env.set(var_name, m.values.pop())
+
+def exec_typed_assign(m, stmt, env):
+    m.tasks.append((finish_typed_assign, stmt[1], env))
+    push_expression(m, stmt[2], env)
+
+def finish_typed_assign(m, var_name, env):
+    env.set(var_name, m.values.pop(), update_existing=True)
+
+def exec_index_assign(m, stmt, env):
+    _, array_name, index_expr, value_expr = stmt
+    array = env.get(array_name)
+    if not is_array(array) and array.__class__ is not dict:
+        raise RuntimeError(f"'{array_name}' is not an array")
+    m.values.append(array)
+    m.tasks.append((resolve_assign_index, value_expr, env))
+    push_expression(m, index_expr, env)
+
+def resolve_assign_index(m, value_expr, env):
+    # The index is checked before the value is evaluated, as in the tree-walker
+    index = m.values.pop()
+    array = m.values[-1]
+    m.values.append(check_key(index) if array.__class__ is dict else resolve_index(array, index))
+    m.tasks.append((finish_index_assign, None, env))
+    push_expression(m, value_expr, env)
+
+def finish_index_assign(m, _, env):
+    value = m.values.pop()
+    index = m.values.pop()
+    array = m.values.pop()
+    if array.__class__ is dict:
+        array[index] = value
+    else:
+        array.set(index, value)
+
+def exec_for(m, stmt, env):
+    _, var_name, start, end, body = stmt
+    next_for(m, (var_name, iter(range(start, end + 1)), body), env)
+
+def next_for(m, loop, env):
+    var_name, counter, body = loop
+    i = next(counter, None)
+    if i is not None:
+        env.set(var_name, i)
+        m.tasks.append((next_for, loop, env))
+        push_block(m, body, env)
+
+def exec_while(m, stmt, env):
+    m.tasks.append((next_while, stmt, env))
+    push_expression(m, stmt[1], env)
+
+def next_while(m, stmt, env):
+    result = m.values.pop()
+    if result is True or result == 'slay':
+        m.tasks.append((exec_while, stmt, env))
+        push_block(m, stmt[2], env)
+
+def exec_if_else(m, stmt, env):
+    m.tasks.append((choose_branch, stmt, env))
+    push_expression(m, stmt[1], env)
+
+def choose_branch(m, stmt, env):
+    result = m.values.pop()
+    push_block(m, stmt[2] if result is True or result == 'slay' else stmt[3], env)
+
+def exec_try_catch(m, stmt, env):
+    m.handlers.append(Handler(len(m.frames), len(m.tasks), len(m.values), stmt[2], env))
+    m.tasks.append((pop_handler, None, env))
+    push_block(m, stmt[1], env)
+
+def run_panik_statement(m, stmt, env):
+    m.handlers.append(Handler(len(m.frames), len(m.tasks), len(m.values), None, env))
+    m.tasks.append((pop_handler, None, env))
+    m.tasks.append((run_statement, stmt, env))
+
+def pop_handler(m, _, env):
+    m.handlers.pop()
+
+def exec_return(m, stmt, env):
+    m.tasks.append((finish_return, None, env))
+    push_expression(m, stmt[1], env)
+
+def finish_return(m, _, env):
+    value = m.values.pop()
+    # Open sus/panik blocks are left along with the frame
+    while m.in_handler():
+        m.handlers.pop()
+    if not m.frames:
+        # A top-level yeet ends the program
+        del m.tasks[:]
+        return
+    frame = m.frames.pop()
+    del m.tasks[frame.task_base:]
+    del m.values[frame.value_base:]
+    leave_frame(m, frame, 'nvm' if frame.discard else value)
+
+def exec_tail_call(m, stmt, env):
+    m.tasks.append((finish_tail_call, (len(stmt[1]), stmt[2]), env))
+    push_arguments(m, stmt[1], env)
+
+def finish_tail_call(m, call_info, env):
+    argc, returns_value = call_info
+    args = pop_arguments(m, argc)
+    frame = m.frames[-1]
+    func = frame.func
+    if rebind_tail_call(func, env, args):
+        # Restart the body in place, keeping only the frame's leave_function task
+        frame.discard = frame.discard or not returns_value
+        del m.tasks[frame.task_base + 1:]
+        del m.values[frame.value_base:]
+        push_block(m, tail_call_body(func, env.root.cache), env)
+        return
+    # The name no longer means this function: make an ordinary call
+    m.values.extend(args)
+    m.tasks.append((finish_return, None, env) if returns_value else (discard_value, None, env))
+    m.tasks.append((call, (func[1], argc), env))
+
+def exec_exit(m, stmt, env):
+    exit(0)
+
+def exec_function(m, stmt, env):
+    env.set(stmt[1], stmt)
+
+STATEMENTS = HandlerTable('statement', {
+    'PRINT': exec_print,
+    'CALL_STMT': exec_call_stmt,
+    'SQUAD_DECL': exec_declaration,
+    'STASH_DECL': exec_declaration,
+    'SIGMA_DECL': exec_declaration,
+    'TWEET_DECL': exec_declaration,
+    'TRY_CATCH': exec_try_catch,
+    'VAR_ASSIGN': exec_var_assign,
+    'TYPED_DECL': exec_typed_decl,
+    'TYPED_ASSIGN': exec_typed_assign,
+    'INDEX_ASSIGN': exec_index_assign,
+    'FOR': exec_for,
+    'WHILE': exec_while,
+    'IF_ELSE': exec_if_else,
+    'RETURN': exec_return,
+    'TAIL_CALL': exec_tail_call,
+    'EXIT': exec_exit,
+    'FUNCTION': exec_function,
+})
+
+def run(ast, env):
+    Machine(ast, env).run()
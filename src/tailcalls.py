@@ -0,0 +1,56 @@
+# tailcalls.py
+"""Tail-call elimination for self-recursive cook functions.
+
+`yeet f(...)` inside f, and a call statement `f(...)` that ends f (or is
+followed by `yeet nvm`), become ('TAIL_CALL', args, returns_value) nodes.
+Running one hands a TailCall status back to the function call loop, which
+rebinds the parameters in the same environment and runs the body again
+instead of nesting a call. Reusing the environment without clearing it is safe under
+dynamic scoping: the caller never runs again after a tail call, and the
+callee would have seen the caller's variables through its parent anyway.
+
+Tail calls inside `sus`/`panik` are left alone, since an error raised by the
+call must still reach panik.
+"""
+
+class TailCall:
+    """Status a TAIL_CALL statement hands back, like interpreter.ReturnValue"""
+    __slots__ = ('call_args', 'returns_value')
+
+    def __init__(self, args, returns_value):
+        self.call_args = args
+        self.returns_value = returns_value
+
+def is_self_call(expr, name):
+    return expr[0] == 'CALL' and expr[1] == name
+
+def returns_nvm(stmt):
+    return stmt[0] == 'RETURN' and (stmt[1][0] == 'NULL' or stmt[1] == ('CONST', 'nvm'))
+
+def mark_block(body, name, tail):
+    """tail says whether running off the end of this block ends the function"""
+    marked = []
+    last = len(body) - 1
+    for index, stmt in enumerate(body):
+        kind = stmt[0]
+        at_end = tail and index == last
+        if kind == 'RETURN' and is_self_call(stmt[1], name):
+            stmt = ('TAIL_CALL', stmt[1][2], True)
+        elif kind == 'CALL_STMT' and stmt[1] == name and (
+                at_end or (index < last and returns_nvm(body[index + 1]))):
+            stmt = ('TAIL_CALL', stmt[2], False)
+        elif kind == 'IF_ELSE':
+            stmt = ('IF_ELSE', stmt[1], mark_block(stmt[2], name, at_end), mark_block(stmt[3], name, at_end))
+        elif kind == 'FOR':
+            stmt = ('FOR', stmt[1], stmt[2], stmt[3], mark_block(stmt[4], name, False))
+        elif kind == 'WHILE':
+            stmt = ('WHILE', stmt[1], mark_block(stmt[2], name, False))
+        marked.append(stmt)
+    return marked
+
+def mark_function(func, cache):
+    return mark_block(func[3], func[1], True)
+
+def tail_call_body(func, cache):
+    """func's body with its self-recursive tail calls marked, once per run"""
+    return cache.nodes(mark_function).get(func)
@@ -0,0 +1,289 @@
+# typeinfer.py
+"""Type inference pass run after the optimizer (`-O`).
+
+Walks every block tracking the types variables certainly hold at each point
+('number', 'string', 'bool', 'squad' or 'stash'; a name that is missing could hold
+anything) and rewrites the statements whose coercion provably does nothing:
+
+- `sigma x = <number or bool>`, `tweet x = <string>` and `squad x = <string>`
+  become ('TYPED_DECL', name, expr, type), which binds the value as is
+- `x = <expr>`, when x's current type and the value's type need no coercion,
+  becomes ('TYPED_ASSIGN', name, expr, type), which rebinds x without reading
+  the old value first
+
+Everything else keeps its checked node. Under dynamic scoping a cook
+function can reassign its caller's variables, so every call forgets the
+types of the names some function assigns (all names when the whole program
+isn't known, as in the shell). Inside a function, names it hasn't declared
+itself belong to a caller and are never typed.
+"""
+
+NUMBER = 'number'
+STRING = 'string'
+BOOL = 'bool'
+SQUAD = 'squad'
+STASH = 'stash'
+
+COMPARISON_OPS = ('>', '<', '==', '!=', '<=', '>=')
+# These compare a numeric squad element by element, giving a squad
+ORDERING_OPS = ('>', '<', '<=', '>=')
+ARITHMETIC_OPS = ('+', '-', '*', '/')
+# Booleans are the numbers 1 and 0 in arithmetic
+NUMERIC = (NUMBER, BOOL)
+TYPED_STATEMENTS = ('TYPED_DECL', 'TYPED_ASSIGN')
+
+def value_type(value):
+    if value.__class__ is bool:
+        return BOOL
+    if value.__class__ in (int, float):
+        return NUMBER
+    if value.__class__ is str:
+        return STRING
+    return None
+
+def join(left, right):
+    """Types both states agree on; None is the state after yeet/skibidi"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return {name: kind for name, kind in left.items() if right.get(name) == kind}
+
+def bind(state, name, kind):
+    state = dict(state)
+    if kind is None:
+        state.pop(name, None)
+    else:
+        state[name] = kind
+    return state
+
+def has_call(expr):
+    while True:
+        kind = expr[0]
+        if kind in ('CALL', 'METHOD_CALL'):
+            return True
+        if kind == 'ARRAY':
+            return any(has_call(element) for element in expr[1])
+        if kind == 'STASH':
+            return any(has_call(key) or has_call(value) for key, value in expr[1])
+        if kind == 'SLICE':
+            return any(bound is not None and has_call(bound) for bound in expr[2:])
+        if kind == 'INDEX' or kind == 'UNARY_OP':
+            expr = expr[2]
+        elif kind in ('BIN_OP', 'LOGIC_OP'):
+            # Walk the left spine iteratively so long chains don't recurse
+            if has_call(expr[3]):
+                return True
+            expr = expr[1]
+        else:
+            return False
+
+def statement_expressions(stmt):
+    kind = stmt[0]
+    if kind in ('PRINT', 'RETURN', 'WHILE', 'IF_ELSE'):
+        return [stmt[1]]
+    if kind in ('SIGMA_DECL', 'TWEET_DECL', 'SQUAD_DECL', 'STASH_DECL', 'VAR_ASSIGN'):
+        return [stmt[2]]
+    if kind == 'INDEX_ASSIGN':
+        return [stmt[2], stmt[3]]
+    if kind == 'CALL_STMT':
+        return [('CALL', stmt[1], stmt[2])]
+    return []
+
+def walk_statements(body, into_functions=True):
+    """Every statement of a block and its nested blocks"""
+    for stmt in body:
+        yield stmt
+        kind = stmt[0]
+        if kind == 'FOR':
+            yield from walk_statements(stmt[4], into_functions)
+        elif kind == 'WHILE':
+            yield from walk_statements(stmt[2], into_functions)
+        elif kind in ('IF_ELSE', 'TRY_CATCH'):
+            yield from walk_statements(stmt[-2], into_functions)
+            yield from walk_statements(stmt[-1], into_functions)
+        elif kind == 'FUNCTION' and into_functions:
+            yield from walk_statements(stmt[3], into_functions)
+
+def function_assignments(ast):
+    """Names assigned with `=` inside any cook function of the program"""
+    return {stmt[1]
+            for func in walk_statements(ast) if func[0] == 'FUNCTION'
+            for stmt in walk_statements(func[3]) if stmt[0] == 'VAR_ASSIGN'}
+
+def declared_type(kind, value):
+    """(type the declared variable holds, whether the coercion can be skipped)"""
+    if kind == 'SIGMA_DECL':
+        return (value, True) if value in NUMERIC else (None, False)
+    if kind == 'TWEET_DECL':
+        if value == STRING:
+            return STRING, True
+        return (STRING if value in NUMERIC else None), False
+    if kind == 'STASH_DECL':
+        # Always copied
+        return (STASH if value == STASH else None), False
+    # squad: strings are kept as they are, squads are copied
+    if value == STRING:
+        return STRING, True
+    return (SQUAD if value == SQUAD else None), False
+
+def assigned_type(existing, value):
+    """Like declared_type, for `x = value` while x holds existing"""
+    if existing is None:
+        return None, False
+    if existing == value or existing in (SQUAD, STASH):
+        return value, True
+    if existing == NUMBER:
+        return (value, True) if value in (BOOL, SQUAD, STASH) else (None, False)
+    # string, or bool (which assignment treats like slay/cap)
+    if value in (STRING, SQUAD, STASH):
+        return value, True
+    return (STRING if value in NUMERIC else None), False
+
+class TypeInference:
+    def __init__(self, callee_assigned):
+        # Names a call may reassign behind the caller's back; None means any
+        self.callee_assigned = callee_assigned
+
+    def after_call(self, state):
+        if self.callee_assigned is None:
+            return {}
+        return {name: kind for name, kind in state.items() if name not in self.callee_assigned}
+
+    def evaluate(self, expr, state):
+        """State once expr has been evaluated"""
+        return self.after_call(state) if has_call(expr) else state
+
+    def forget(self, state, body):
+        """state without whatever running part of body may have changed"""
+        names = {stmt[1] for stmt in walk_statements(body, into_functions=False)
+                 if stmt[0] in ('SIGMA_DECL', 'TWEET_DECL', 'SQUAD_DECL', 'STASH_DECL', 'VAR_ASSIGN',
+                                'FUNCTION', 'FOR')}
+        if any(has_call(expr) for stmt in walk_statements(body, into_functions=False)
+               for expr in statement_expressions(stmt)):
+            state = self.after_call(state)
+        return {name: kind for name, kind in state.items() if name not in names}
+
+    def expression_type(self, expr, state):
+        kind = expr[0]
+        if kind == 'NUMBER' or kind == 'UNDECIDED':
+            return NUMBER
+        if kind == 'STRING' or kind == 'NULL':
+            return STRING
+        if kind == 'BOOLEAN' or kind == 'LOGIC_OP':
+            return BOOL
+        if kind == 'CONST':
+            return value_type(expr[1])
+        if kind == 'IDENTIFIER':
+            return state.get(expr[1])
+        if kind == 'ARRAY' or kind == 'SLICE':
+            return SQUAD
+        if kind == 'STASH':
+            return STASH
+        if kind == 'UNARY_OP':
+            if expr[1] == 'nah':
+                return BOOL
+            if expr[1] == '-' and self.expression_type(expr[2], state) in NUMERIC:
+                return NUMBER
+            return None
+        if kind == 'BIN_OP':
+            chain = []
+            while expr[0] == 'BIN_OP':
+                chain.append(expr)
+                expr = expr[1]
+            result = self.expression_type(expr, state)
+            for node in reversed(chain):
+                if node[2] in ORDERING_OPS:
+                    right = self.expression_type(node[3], state)
+                    result = None if result in (None, SQUAD) or right in (None, SQUAD) else BOOL
+                elif node[2] in COMPARISON_OPS:
+                    result = BOOL
+                elif (node[2] in ARITHMETIC_OPS and result in NUMERIC
+                      and self.expression_type(node[3], state) in NUMERIC):
+                    result = NUMBER
+                else:
+                    result = None
+            return result
+        return None
+
+    # --- statements ----------------------------------------------------------
+
+    def block(self, body, state):
+        """(rewritten statements, state after them)"""
+        rewritten = []
+        for stmt in body:
+            if state is None:
+                # Unreachable after yeet/skibidi
+                rewritten.append(stmt)
+            else:
+                stmt, state = self.statement(stmt, state)
+                rewritten.append(stmt)
+        return rewritten, state
+
+    def loop(self, run_body, state):
+        """Widen the state at a loop's head until a pass over the body keeps it;
+        returns (body, head, state at the end of the body)"""
+        while True:
+            body, end = run_body(state)
+            head = join(state, end)
+            if head == state:
+                return body, head, end
+            state = head
+
+    def statement(self, stmt, state):
+        kind = stmt[0]
+        if kind in ('SIGMA_DECL', 'TWEET_DECL', 'SQUAD_DECL', 'STASH_DECL'):
+            _, name, expr = stmt
+            state = self.evaluate(expr, state)
+            result, plain = declared_type(kind, self.expression_type(expr, state))
+            if plain:
+                stmt = ('TYPED_DECL', name, expr, result)
+            return stmt, bind(state, name, result)
+        if kind == 'VAR_ASSIGN':
+            _, name, expr = stmt
+            state = self.evaluate(expr, state)
+            result, plain = assigned_type(state.get(name), self.expression_type(expr, state))
+            if plain:
+                stmt = ('TYPED_ASSIGN', name, expr, result)
+            return stmt, bind(state, name, result)
+        if kind == 'FUNCTION':
+            body, _ = self.block(stmt[3], {})
+            return ('FUNCTION', stmt[1], stmt[2], body), bind(state, stmt[1], None)
+        if kind == 'FOR':
+            _, var_name, start, end, body = stmt
+            if start > end:
+                return stmt, state
+            body, _, after = self.loop(lambda head: self.block(body, bind(head, var_name, NUMBER)), state)
+            return ('FOR', var_name, start, end, body), after
+        if kind == 'WHILE':
+            condition = stmt[1]
+            body, head, _ = self.loop(lambda head: self.block(stmt[2], self.evaluate(condition, head)), state)
+            return ('WHILE', condition, body), self.evaluate(condition, head)
+        if kind == 'IF_ELSE':
+            state = self.evaluate(stmt[1], state)
+            then_body, then_state = self.block(stmt[2], state)
+            else_body, else_state = self.block(stmt[3], state)
+            return ('IF_ELSE', stmt[1], then_body, else_body), join(then_state, else_state)
+        if kind == 'TRY_CATCH':
+            try_body, try_state = self.block(stmt[1], state)
+            # An error can stop the sus block anywhere, and each panik statement halfway
+            catch_state = self.forget(state, stmt[1])
+            catch_body = []
+            for catch_stmt in stmt[2]:
+                rewritten, after = self.statement(catch_stmt, catch_state)
+                catch_body.append(rewritten)
+                catch_state = join(self.forget(catch_state, [catch_stmt]), after)
+            return ('TRY_CATCH', try_body, catch_body), join(try_state, catch_state)
+        for expr in statement_expressions(stmt):
+            state = self.evaluate(expr, state)
+        if kind in ('RETURN', 'EXIT'):
+            return stmt, None
+        return stmt, state
+
+def infer_types(ast, whole_program=True):
+    """Return (AST with TYPED_DECL/TYPED_ASSIGN nodes, number of them).
+    whole_program says every cook function that can run is defined in ast,
+    so calls only forget the names those functions assign."""
+    inference = TypeInference(function_assignments(ast) if whole_program else None)
+    typed, _ = inference.block(ast, {})
+    return typed, sum(1 for stmt in walk_statements(typed) if stmt[0] in TYPED_STATEMENTS)
@@ -0,0 +1,750 @@
+# vm.py
+"""Bytecode compiler and stack-based virtual machine.
+
+compile_program() lowers the AST from parser.parse() into Code objects: a flat
+array of (opcode, argument) pairs plus a constant pool and a name table.
+Control flow (flex, rizz_check/nah_fam, yap, sus/panik, yeet) becomes jumps,
+and BS-Lang calls push VM frames instead of recursing in Python. Values,
+coercions and error messages come from the tree-walker's helpers, so
+programs behave the same on both engines.
+"""
+
+import operator
+from array import array
+from resolver import function_layout, bind_locals, CallSite
+from tailcalls import mark_block
+from memo import memo_table, MISSING
+from interpreter import (
+    Environment, MAX_RECURSION_DEPTH, binary_op, print_value, Squad, is_array, slice_squad,
+    resolve_index, yields_bool, compares_order, check_key, stash_get, coerce_squad, coerce_stash, coerce_sigma,
+    coerce_tweet, coerce_assignment,
+)
+
+OPCODES = [
+    'LOAD_CONST',         # push consts[arg]
+    'LOAD_NAME',          # push env.get(names[arg])
+    'STORE_SIGMA',        # pop value, declare names[arg] as sigma
+    'STORE_TWEET',        # pop value, declare names[arg] as tweet
+    'STORE_SQUAD',        # pop value, declare names[arg] as squad
+    'STORE_STASH',        # pop value, declare names[arg] as stash
+    'STORE_NAME',         # pop value, bind names[arg] in the current env as is
+    'ASSIGN_NAME',        # pop value, reassign existing names[arg] with coercion
+    'REBIND_NAME',        # pop value, reassign existing names[arg] as is
+    'BINARY_OP',          # pop right, left; push left <BINARY_OPS[arg]> right
+    'UNARY_NOT',          # nah
+    'UNARY_MINUS',        # unary -
+    'UNARY_UNKNOWN',      # pop operand, push None (unknown unary operators)
+    'LOGIC_AND',          # frfr (both sides already evaluated)
+    'LOGIC_OR',           # maybe
+    'BUILD_ARRAY',        # pop arg items, push them as a squad
+    'BUILD_STASH',        # pop arg key/value pairs, push them as a stash
+    'LOAD_ARRAY',         # push names[arg], which must be a squad
+    'LOAD_CONTAINER',     # push names[arg], which must be a squad or stash
+    'RESOLVE_INDEX',      # replace TOS index with a bounds-checked index (or checked key) into TOS1
+    'BINARY_SUBSCR',      # pop index, container; push container[index]
+    'STORE_SUBSCR',       # pop value, resolved index, container; container[index] = value
+    'SLICE_SUBSCR',       # pop step, stop, start, squad; push squad[start:stop:step] (None: left out)
+    'CALL',               # consts[arg] = (name, argc, call site cache, returns value); call with the top argc values
+    'POP_TOP',
+    'PRINT',
+    'JUMP',               # pc = arg
+    'JUMP_IF_NOT_SLAY',   # pop condition; jump to arg unless it is slay
+    'JUMP_IF_FALSE',      # pop a native bool, or a squad from a comparison; jump to arg unless it is True
+    'GET_RANGE',          # consts[arg] = (start, end); push an iterator over start..end
+    'FOR_ITER',           # next value of the iterator on TOS, or pop it and jump to arg
+    'SETUP_SUS',          # errors until POP_BLOCK jump to arg (the panik body)
+    'SETUP_PANIK',        # errors until POP_BLOCK are printed and execution resumes at arg
+    'POP_BLOCK',
+    'RETURN_VALUE',       # pop value and return it from the current function
+    'EXIT',
+    'MAKE_FUNCTION',      # bind consts[arg], a FUNCTION node, under its name
+    'RAISE_ERROR',        # raise RuntimeError(consts[arg])
+    'NAME_OP_CONST',      # consts[arg] = (name, constant, op): push name <op> constant
+    'NAME_OP_NAME',       # consts[arg] = (left, op, right): push left <op> right
+    'TAIL_CALL',          # like CALL, but a call of the running function restarts its frame
+]
+for _code, _name in enumerate(OPCODES):
+    globals()[_name] = _code
+
+BINARY_OPS = ['+', '-', '*', '/', '>', '<', '==', '!=', '<=', '>=']
+BINARY_OP_CODES = {op: code for code, op in enumerate(BINARY_OPS)}
+# Direct int/float implementations; division keeps the generic division-by-zero error
+NUMERIC_OPS = [operator.add, operator.sub, operator.mul, None,
+               operator.gt, operator.lt, operator.eq, operator.ne, operator.le, operator.ge]
+NUMERIC_TYPES = (int, float)
+# Arguments of these opcodes are jump targets rather than table indexes
+JUMP_OPCODES = frozenset([JUMP, JUMP_IF_NOT_SLAY, JUMP_IF_FALSE, FOR_ITER, SETUP_SUS, SETUP_PANIK])
+
+class Code:
+    """Compiled function or program body"""
+    def __init__(self, name, function=None):
+        self.name = name
+        self.function = function  # the FUNCTION node, None for the program
+        self.instructions = array('l')
+        self.consts = []
+        self.names = []
+        self.const_index = {}
+        self.name_index = {}
+
+    def __len__(self):
+        return len(self.instructions) // 2
+
+class Compiler:
+    """Lowers one function or program body to a Code object"""
+    def __init__(self, name, function=None):
+        self.code = Code(name, function)
+
+    def emit(self, opcode, arg=0):
+        self.code.instructions.extend((opcode, arg))
+        return len(self.code) - 1
+
+    def patch(self, position, target=None):
+        """Point the jump at position to target (default: the next instruction)"""
+        self.code.instructions[position * 2 + 1] = len(self.code) if target is None else target
+
+    def const(self, value):
+        # Key on the type too so 1, 1.0 and slay never share a slot
+        key = (type(value), value) if isinstance(value, (int, float, str)) else ('id', id(value))
+        index = self.code.const_index.get(key)
+        if index is None:
+            index = len(self.code.consts)
+            self.code.consts.append(value)
+            self.code.const_index[key] = index
+        return index
+
+    def name(self, name):
+        index = self.code.name_index.get(name)
+        if index is None:
+            index = len(self.code.names)
+            self.code.names.append(name)
+            self.code.name_index[name] = index
+        return index
+
+    # --- statements ----------------------------------------------------------
+
+    def block(self, body):
+        for stmt in body:
+            self.statement(stmt)
+
+    def statement(self, stmt):
+        stype = stmt[0]
+        if stype == 'PRINT':
+            self.expression(stmt[1])
+            self.emit(PRINT)
+        elif stype == 'CALL_STMT':
+            self.call(stmt[1], stmt[2])
+            self.emit(POP_TOP)
+        elif stype in DECLARATION_OPCODES:
+            self.expression(stmt[2])
+            self.emit(DECLARATION_OPCODES[stype], self.name(stmt[1]))
+        elif stype == 'VAR_ASSIGN':
+            self.expression(stmt[2])
+            self.emit(ASSIGN_NAME, self.name(stmt[1]))
+        elif stype == 'TYPED_DECL':
+            self.expression(stmt[2])
+            self.emit(STORE_NAME, self.name(stmt[1]))
+        elif stype == 'TYPED_ASSIGN':
+            self.expression(stmt[2])
+            self.emit(REBIND_NAME, self.name(stmt[1]))
+        elif stype == 'INDEX_ASSIGN':
+            _, array_name, index_expr, value_expr = stmt
+            self.emit(LOAD_CONTAINER, self.name(array_name))
+            self.expression(index_expr)
+            self.emit(RESOLVE_INDEX)
+            self.expression(value_expr)
+            self.emit(STORE_SUBSCR)
+        elif stype == 'FOR':
+            _, var_name, start, end, body = stmt
+            self.emit(GET_RANGE, self.const((start, end)))
+            loop = self.emit(FOR_ITER)
+            self.emit(STORE_NAME, self.name(var_name))
+            self.block(body)
+            self.emit(JUMP, loop)
+            self.patch(loop)
+        elif stype == 'WHILE':
+            top = len(self.code)
+            exit_jump = self.condition(stmt[1])
+            self.block(stmt[2])
+            self.emit(JUMP, top)
+            self.patch(exit_jump)
+        elif stype == 'IF_ELSE':
+            _, condition, then_body, else_body = stmt
+            else_jump = self.condition(condition)
+            self.block(then_body)
+            if else_body:
+                end_jump = self.emit(JUMP)
+                self.patch(else_jump)
+                self.block(else_body)
+                self.patch(end_jump)
+            else:
+                self.patch(else_jump)
+        elif stype == 'TRY_CATCH':
+            setup = self.emit(SETUP_SUS)
+            self.block(stmt[1])
+            self.emit(POP_BLOCK)
+            end_jump = self.emit(JUMP)
+            self.patch(setup)
+            # Each panik statement reports its own error and moves on to the next
+            for s in stmt[2]:
+                guard = self.emit(SETUP_PANIK)
+                self.statement(s)
+                self.emit(POP_BLOCK)
+                self.patch(guard)
+            self.patch(end_jump)
+        elif stype == 'RETURN':
+            self.expression(stmt[1])
+            self.emit(RETURN_VALUE)
+        elif stype == 'TAIL_CALL':
+            name = self.code.function[1]
+            for arg in stmt[1]:
+                self.expression(arg)
+            self.emit(TAIL_CALL, self.const((name, len(stmt[1]), CallSite(name), stmt[2])))
+            # Reached only when the name no longer means this function and an ordinary call ran
+            self.emit(RETURN_VALUE if stmt[2] else POP_TOP)
+        elif stype == 'EXIT':
+            self.emit(EXIT)
+        elif stype == 'FUNCTION':
+            self.emit(MAKE_FUNCTION, self.const(stmt))
+        else:
+            self.emit(RAISE_ERROR, self.const(f"Unknown statement type: {stype}"))
+
+    # --- expressions ---------------------------------------------------------
+
+    def condition(self, expr):
+        """Evaluate expr and emit the jump taken when it isn't slay"""
+        self.expression(expr)
+        return self.emit(JUMP_IF_FALSE if yields_bool(expr) or compares_order(expr) else JUMP_IF_NOT_SLAY)
+
+    def expression(self, expr):
+        etype = expr[0]
+        if etype == 'NUMBER' or etype == 'CONST':
+            self.emit(LOAD_CONST, self.const(expr[1]))
+        elif etype == 'STRING':
+            self.emit(LOAD_CONST, self.const(expr[1][1:-1]))
+        elif etype == 'BOOLEAN':
+            self.emit(LOAD_CONST, self.const(expr[1]))
+        elif etype == 'NULL':
+            self.emit(LOAD_CONST, self.const('nvm'))
+        elif etype == 'UNDECIDED':
+            self.emit(LOAD_CONST, self.const(float('inf')))
+        elif etype == 'IDENTIFIER':
+            self.emit(LOAD_NAME, self.name(expr[1]))
+        elif etype == 'ARRAY':
+            for element in expr[1]:
+                self.expression(element)
+            self.emit(BUILD_ARRAY, len(expr[1]))
+        elif etype == 'STASH':
+            for key, value in expr[1]:
+                self.expression(key)
+                self.expression(value)
+            self.emit(BUILD_STASH, len(expr[1]))
+        elif etype == 'INDEX':
+            self.emit(LOAD_CONTAINER, self.name(expr[1]))
+            self.expression(expr[2])
+            self.emit(BINARY_SUBSCR)
+        elif etype == 'SLICE':
+            self.emit(LOAD_ARRAY, self.name(expr[1]))
+            for bound in expr[2:]:
+                if bound is None:
+                    self.emit(LOAD_CONST, self.const(None))
+                else:
+                    self.expression(bound)
+            self.emit(SLICE_SUBSCR)
+        elif etype == 'UNARY_OP':
+            self.expression(expr[2])
+            self.emit(UNARY_OPCODES.get(expr[1], UNARY_UNKNOWN))
+        elif etype == 'LOGIC_OP':
+            self.expression(expr[1])
+            self.expression(expr[3])
+            if expr[2] == 'frfr':
+                self.emit(LOGIC_AND)
+            elif expr[2] == 'maybe':
+                self.emit(LOGIC_OR)
+            else:
+                self.emit(POP_TOP)
+                self.emit(UNARY_UNKNOWN)
+        elif etype == 'BIN_OP':
+            # Walk the left spine iteratively so long chains don't recurse per term
+            chain = []
+            while expr[0] == 'BIN_OP':
+                chain.append(expr)
+                expr = expr[1]
+            if len(chain) == 1 and self.fused_binary(chain[0]):
+                return
+            self.expression(expr)
+            for node in reversed(chain):
+                self.expression(node[3])
+                if node[2] in BINARY_OP_CODES:
+                    self.emit(BINARY_OP, BINARY_OP_CODES[node[2]])
+                else:
+                    self.emit(RAISE_ERROR, self.const(f"Unknown operator {node[2]}"))
+        elif etype == 'CALL':
+            self.call(expr[1], expr[2])
+        elif etype == 'METHOD_CALL':
+            # obj.method(args) calls method(obj, args...)
+            self.emit(LOAD_NAME, self.name(expr[1]))
+            for arg in expr[3]:
+                self.expression(arg)
+            self.emit(CALL, self.const((expr[2], len(expr[3]) + 1, CallSite(expr[2]), True)))
+        else:
+            self.emit(RAISE_ERROR, self.const(f"Unknown expression type: {etype}"))
+
+    def fused_binary(self, node):
+        """Emit one superinstruction for `name <op> constant` and `name <op> name`"""
+        _, left, op, right = node
+        if left[0] != 'IDENTIFIER' or op not in BINARY_OP_CODES:
+            return False
+        if right[0] == 'NUMBER' or right[0] == 'CONST':
+            self.emit(NAME_OP_CONST, self.const((left[1], right[1], BINARY_OP_CODES[op])))
+            return True
+        if right[0] == 'IDENTIFIER':
+            self.emit(NAME_OP_NAME, self.const((left[1], BINARY_OP_CODES[op], right[1])))
+            return True
+        return False
+
+    def call(self, name, args):
+        for arg in args:
+            self.expression(arg)
+        self.emit(CALL, self.const((name, len(args), CallSite(name), True)))
+
+DECLARATION_OPCODES = {
+    'SIGMA_DECL': STORE_SIGMA,
+    'TWEET_DECL': STORE_TWEET,
+    'SQUAD_DECL': STORE_SQUAD,
+    'STASH_DECL': STORE_STASH,
+}
+UNARY_OPCODES = {
+    'nah': UNARY_NOT,
+    '-': UNARY_MINUS,
+}
+
+def compile_function(func):
+    compiler = Compiler(func[1], func)
+    compiler.block(mark_block(func[3], func[1], True))
+    return compiler.code
+
+def compile_function_code(func, cache):
+    bind_locals(function_layout(func), cache)
+    return compile_function(func)
+
+def function_code(func, cache):
+    """func's Code, compiled once per run"""
+    return cache.nodes(compile_function_code).get(func)
+
+def compile_program(ast):
+    compiler = Compiler('<program>')
+    compiler.block(ast)
+    return compiler.code
+
+# --- disassembler ------------------------------------------------------------
+
+def disassemble(code):
+    """Return a human-readable listing of code and every function it defines"""
+    lines = [f"Disassembly of {code.name}:"]
+    nested = []
+    instructions = code.instructions
+    for position in range(len(code)):
+        opcode, arg = instructions[position * 2], instructions[position * 2 + 1]
+        name = OPCODES[opcode]
+        if opcode in (NAME_OP_CONST, NAME_OP_NAME):
+            first, second, third = code.consts[arg]
+            if opcode == NAME_OP_CONST:
+                detail = f"{first} {BINARY_OPS[third]} {second!r}"
+            else:
+                detail = f"{first} {BINARY_OPS[second]} {third}"
+        elif opcode in (LOAD_CONST, CALL, TAIL_CALL, GET_RANGE, RAISE_ERROR, MAKE_FUNCTION):
+            value = code.consts[arg]
+            if opcode == MAKE_FUNCTION:
+                nested.append(compile_function(value))
+                detail = f"<function {value[1]}({', '.join(value[2])})>"
+            elif opcode == CALL or opcode == TAIL_CALL:
+                detail = f"{value[0]}, {value[1]} args"
+            else:
+                detail = repr(value)
+        elif opcode in (LOAD_NAME, STORE_SIGMA, STORE_TWEET, STORE_SQUAD, STORE_STASH, STORE_NAME,
+                        ASSIGN_NAME, REBIND_NAME, LOAD_ARRAY, LOAD_CONTAINER):
+            detail = code.names[arg]
+        elif opcode == BINARY_OP:
+            detail = BINARY_OPS[arg]
+        elif opcode in JUMP_OPCODES:
+            detail = f"to {arg}"
+        elif opcode == BUILD_ARRAY:
+            detail = f"{arg} items"
+        elif opcode == BUILD_STASH:
+            detail = f"{arg} pairs"
+        else:
+            lines.append(f"{position:>6} {name}")
+            continue
+        lines.append(f"{position:>6} {name:<18} {arg:>4} ({detail})")
+    for func_code in nested:
+        lines.append("")
+        lines.append(disassemble(func_code))
+    return "\n".join(lines)
+
+# --- virtual machine ---------------------------------------------------------
+
+class Frame:
+    __slots__ = ('code', 'pc', 'env', 'stack', 'blocks', 'discard', 'memo')
+
+    def __init__(self, code, env):
+        self.code = code
+        self.pc = 0
+        self.env = env
+        self.stack = []
+        self.blocks = []  # (opcode, handler pc, stack depth)
+        self.discard = False  # a tail call statement ran, so the function returns nvm
+        self.memo = None  # (MemoTable, key) to store the result under
+
+def execute(code, env):
+    """Run a Code object to completion with explicit VM frames"""
+    frames = [Frame(code, env)]
+    while True:
+        try:
+            return dispatch(frames)
+        except Exception as e:
+            unwind(frames, e)
+
+def unwind(frames, error):
+    """Route an error to the innermost sus/panik block, popping frames as needed"""
+    while frames:
+        frame = frames[-1]
+        if frame.blocks:
+            opcode, handler, depth = frame.blocks.pop()
+            del frame.stack[depth:]
+            if opcode == SETUP_PANIK:
+                print(f"Error in panik block: {error}")
+            frame.pc = handler
+            return
+        frames.pop()
+    raise error
+
+def fast_binary(left, op, right):
+    """binary_op with a direct path for int/float operands"""
+    if left.__class__ in NUMERIC_TYPES and right.__class__ in NUMERIC_TYPES:
+        fast = NUMERIC_OPS[op]
+        if fast is not None:
+            try:
+                return fast(left, right)
+            except OverflowError:
+                return float('inf')
+    return binary_op(left, BINARY_OPS[op], right)
+
+def dispatch(frames):
+    frame = frames[-1]
+    code = frame.code
+    instructions = code.instructions
+    consts = code.consts
+    names = code.names
+    env = frame.env
+    variables = env.vars
+    stack = frame.stack
+    push = stack.append
+    pop = stack.pop
+    pc = frame.pc
+    end = len(instructions)
+
+    while True:
+        if pc >= end:
+            # Falling off the end of a body: functions return nvm
+            if len(frames) == 1:
+                return None
+            frames.pop()
+            value = 'nvm'
+        else:
+            opcode = instructions[pc]
+            arg = instructions[pc + 1]
+            pc += 2
+
+            if opcode == LOAD_NAME:
+                name = names[arg]
+                push(variables[name] if name in variables else env.get(name))
+                continue
+            if opcode == NAME_OP_CONST:
+                name, right, op = consts[arg]
+                push(fast_binary(variables[name] if name in variables else env.get(name), op, right))
+                continue
+            if opcode == LOAD_CONST:
+                push(consts[arg])
+                continue
+            if opcode == BINARY_OP:
+                right = pop()
+                push(fast_binary(pop(), arg, right))
+                continue
+            if opcode == JUMP_IF_FALSE:
+                if pop() is not True:
+                    pc = arg * 2
+                continue
+            if opcode == JUMP_IF_NOT_SLAY:
+                value = pop()
+                if value is not True and value != 'slay':
+                    pc = arg * 2
+                continue
+            if opcode == NAME_OP_NAME:
+                left_name, op, right_name = consts[arg]
+                left = variables[left_name] if left_name in variables else env.get(left_name)
+                right = variables[right_name] if right_name in variables else env.get(right_name)
+                push(fast_binary(left, op, right))
+                continue
+            if opcode == ASSIGN_NAME:
+                name = names[arg]
+                value = pop()
+                if name in variables:
+                    existing = variables[name]
+                    if value.__class__ is not existing.__class__:
+                        value = coerce_assignment(existing, value)
+                    variables[name] = value
+                else:
+                    env.set(name, coerce_assignment(env.get(name), value), update_existing=True)
+                continue
+            if opcode == REBIND_NAME:
+                name = names[arg]
+                if name in variables:
+                    variables[name] = pop()
+                else:
+                    env.set(name, pop(), update_existing=True)
+                continue
+            if opcode == JUMP:
+                pc = arg * 2
+                continue
+            if opcode == STORE_SIGMA:
+                name = names[arg]
+                env.set(name, coerce_sigma(name, pop()))
+                continue
+            if opcode == FOR_ITER:
+                value = next(stack[-1], None)
+                if value is None:
+                    pop()
+                    pc = arg * 2
+                else:
+                    push(value)
+                continue
+            if opcode == STORE_NAME:
+                env.set(names[arg], pop())
+                continue
+            if opcode == TAIL_CALL:
+                name, argc, site, returns_value = consts[arg]
+                func = code.function
+                if env.get(name) is func:
+                    # Self tail call: rebind the parameters and restart this frame
+                    params = func[2]
+                    args = stack[-argc:] if argc else []
+                    if len(params) != len(args):
+                        raise RuntimeError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
+                    del stack[:]
+                    for param, value in zip(params, args):
+                        variables[param] = value
+                    if not returns_value:
+                        frame.discard = True
+                    pc = 0
+                    continue
+                opcode = CALL
+            if opcode == CALL:
+                name, argc, site, _ = consts[arg]
+                if argc:
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    args = []
+                func = env.root.vars.get(name)
+                if func is site.func:
+                    callee = site.target
+                    if callee.__class__ is not Code:
+                        push(callee(args))
+                        continue
+                else:
+                    func = env.get(name)
+                    if func.__class__ is not tuple:
+                        raise RuntimeError(f"'{name}' is not a function")
+                    if func[0] == 'BUILTIN_FUNCTION':
+                        site.fill(func, env.root.cache)
+                        push(func[2](args))
+                        continue
+                    if func[0] != 'FUNCTION':
+                        raise RuntimeError(f"'{name}' is not a function")
+                    cache = env.root.cache
+                    callee = function_code(func, cache)
+                    site.fill(func, cache, callee)
+                table = memo_table(func, env.root.cache)
+                key = None if table is None else table.key(args, env)
+                if key is not None:
+                    value = table.get(key)
+                    if value is not MISSING:
+                        push(value)
+                        continue
+                if len(frames) > MAX_RECURSION_DEPTH:
+                    raise RuntimeError("Stack overflow: too delulu")
+                params = func[2]
+                func_env = Environment(parent=env)
+                if len(params) != len(args):
+                    raise RuntimeError(f"Function '{name}' expects {len(params)} arguments, got {len(args)}")
+                for param, value in zip(params, args):
+                    func_env.vars[param] = value
+                frame.pc = pc
+                frame = Frame(callee, func_env)
+                if key is not None:
+                    frame.memo = (table, key)
+                frames.append(frame)
+                code = frame.code
+                instructions = code.instructions
+                consts = code.consts
+                names = code.names
+                env = func_env
+                variables = env.vars
+                stack = frame.stack
+                push = stack.append
+                pop = stack.pop
+                pc = 0
+                end = len(instructions)
+                continue
+            if opcode == LOAD_ARRAY:
+                name = names[arg]
+                value = env.get(name)
+                if not is_array(value):
+                    raise RuntimeError(f"'{name}' is not an array")
+                push(value)
+                continue
+            if opcode == LOAD_CONTAINER:
+                name = names[arg]
+                value = env.get(name)
+                if not is_array(value) and value.__class__ is not dict:
+                    raise RuntimeError(f"'{name}' is not an array")
+                push(value)
+                continue
+            if opcode == BINARY_SUBSCR:
+                index = pop()
+                squad = pop()
+                if squad.__class__ is dict:
+                    push(stash_get(squad, index))
+                else:
+                    push(squad.items[resolve_index(squad, index)])
+                continue
+            if opcode == SLICE_SUBSCR:
+                step = pop()
+                stop = pop()
+                start = pop()
+                push(slice_squad(pop(), start, stop, step))
+                continue
+            if opcode == RESOLVE_INDEX:
+                container = stack[-2]
+                if container.__class__ is dict:
+                    push(check_key(pop()))
+                else:
+                    push(resolve_index(container, pop()))
+                continue
+            if opcode == STORE_SUBSCR:
+                value = pop()
+                index = pop()
+                container = pop()
+                if container.__class__ is dict:
+                    container[index] = value
+                else:
+                    container.set(index, value)
+                continue
+            if opcode == PRINT:
+                print_value(pop())
+                continue
+            if opcode == POP_TOP:
+                pop()
+                continue
+            if opcode == UNARY_NOT:
+                value = pop()
+                push(value is not True and value != 'slay')
+                continue
+            if opcode == UNARY_MINUS:
+                value = pop()
+                if isinstance(value, str) and value in ['slay', 'cap']:
+                    value = 1 if value == 'slay' else 0
+                push(-value)
+                continue
+            if opcode == LOGIC_AND:
+                right = pop()
+                left = pop()
+                push((left is True or left == 'slay') and (right is True or right == 'slay'))
+                continue
+            if opcode == LOGIC_OR:
+                right = pop()
+                left = pop()
+                push((left is True or left == 'slay') or (right is True or right == 'slay'))
+                continue
+            if opcode == BUILD_ARRAY:
+                if arg:
+                    items = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    items = []
+                push(Squad(items))
+                continue
+            if opcode == BUILD_STASH:
+                stash = {}
+                if arg:
+                    pairs = stack[-2 * arg:]
+                    del stack[-2 * arg:]
+                    for position in range(0, 2 * arg, 2):
+                        stash[check_key(pairs[position])] = pairs[position + 1]
+                push(stash)
+                continue
+            if opcode == GET_RANGE:
+                start, stop = consts[arg]
+                push(iter(range(start, stop + 1)))
+                continue
+            if opcode == STORE_TWEET:
+                name = names[arg]
+                env.set(name, coerce_tweet(name, pop()))
+                continue
+            if opcode == STORE_SQUAD:
+                name = names[arg]
+                env.set(name, coerce_squad(name, pop()))
+                continue
+            if opcode == STORE_STASH:
+                name = names[arg]
+                env.set(name, coerce_stash(name, pop()))
+                continue
+            if opcode == SETUP_SUS or opcode == SETUP_PANIK:
+                frame.blocks.append((opcode, arg * 2, len(stack)))
+                continue
+            if opcode == POP_BLOCK:
+                frame.blocks.pop()
+                continue
+            if opcode == MAKE_FUNCTION:
+                func = consts[arg]
+                env.set(func[1], func)
+                continue
+            if opcode == UNARY_UNKNOWN:
+                pop()
+                push(None)
+                continue
+            if opcode == EXIT:
+                exit(0)
+            if opcode == RAISE_ERROR:
+                raise RuntimeError(consts[arg])
+            if opcode != RETURN_VALUE:
+                raise RuntimeError(f"Unknown opcode {opcode}")
+
+            # RETURN_VALUE: any sus/panik blocks go away with the frame, and a
+            # return at top level ends the program
+            value = pop()
+            if len(frames) == 1:
+                return None
+            if frame.discard:
+                value = 'nvm'
+            frames.pop()
+
+        # Hand the return value to the calling frame
+        if frame.memo is not None:
+            frame.memo[0].put(frame.memo[1], value)
+        frame = frames[-1]
+        code = frame.code
+        instructions = code.instructions
+        consts = code.consts
+        names = code.names
+        env = frame.env
+        variables = env.vars
+        stack = frame.stack
+        push = stack.append
+        pop = stack.pop
+        pc = frame.pc
+        end = len(instructions)
+        push(value)
+
+def run(ast, env):
+    execute(compile_program(ast), env)
@@ -3,7 +3,7 @@ import io
 import gradio as gr
 import tempfile
 import os
-from lexer import tokenize
+from lexer import tokenize, iter_tokens
 from parser import parse
 from interpreter import run, Environment
 
@@ -29,7 +29,7 @@ def run_lava_code(code, show_tokens=False, show_ast=False, *inputs):
     
     env = Environment()
     # Override built-in gimme to use our input manager
-    env.set('gimme', ('BUILTIN_FUNCTION', 'gimme', web_gimme), update_existing=True)
+    env.set('gimme', ('BUILTIN_FUNCTION', 'gimme', web_gimme, False), update_existing=True)
     
     old_stdout = sys.stdout
     old_stderr = sys.stderr
@@ -221,8 +221,7 @@ with gr.Blocks(css=custom_css, title="🔥 LAVA Playground") as app:
     def analyze_code(code):
         """Analyze code to determine needed inputs"""
         try:
-            tokens = tokenize(code)
-            ast = parse(tokens)
+            ast = parse(iter_tokens(code))
             input_count = count_inputs(ast)
             
             # Create input components state
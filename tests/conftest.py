@@ -0,0 +1,43 @@
+# conftest.py
+"""Shared helpers for the test suite.
+
+The interpreter sources live in src/; put that directory first on the path so
+the old copies kept in tests/ never shadow them.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+EXAMPLES_DIR = os.path.abspath(os.path.join(SRC_DIR, '..', 'examples'))
+
+import pytest
+
+from lexer import iter_tokens
+from parser import parse
+from interpreter import run, Environment, ENGINE_MODULES
+from optimizer import optimize
+
+ENGINES = ['tree'] + list(ENGINE_MODULES)
+
+def run_source(code, engine='tree', optimize_ast=False, env=None):
+    """Parse and run a program, returning everything it printed"""
+    ast = parse(iter_tokens(code))
+    if optimize_ast:
+        ast = optimize(ast)[0]
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        run(ast, Environment() if env is None else env, engine)
+    return out.getvalue()
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    return request.param
+
+@pytest.fixture
+def bs():
+    """run_source as a fixture: bs(code, engine=..., optimize_ast=...)"""
+    return run_source
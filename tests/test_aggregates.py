@@ -0,0 +1,61 @@
+# test_aggregates.py
+
+import pytest
+
+from conftest import run_source
+from interpreter import Squad, builtin_len, builtin_sum, builtin_min, builtin_max, builtin_mean, builtin_has, builtin_keys
+
+def test_aggregates_of_typed_and_mixed_squads():
+    for squad in (Squad([3, 1, 2]), Squad([3.0, 1.0, 2.0]), Squad([3, 1.0, 2])):
+        assert builtin_len([squad]) == 3
+        assert builtin_sum([squad]) == 6
+        assert builtin_min([squad]) == 1
+        assert builtin_max([squad]) == 3
+        assert builtin_mean([squad]) == 2.0
+
+def test_len_of_strings_and_stashes():
+    assert builtin_len(['word']) == 4
+    assert builtin_len([{'a': 1, 'b': 2}]) == 2
+
+def test_has_and_keys():
+    assert builtin_has([{'a': 1}, 'a']) is True
+    assert builtin_has([{'a': 1}, Squad([])]) is False
+    assert builtin_has([Squad([1, 2]), 2]) is True
+    assert list(builtin_keys([{'b': 1, 'a': 2}])) == ['b', 'a']
+
+@pytest.mark.parametrize('func, args, message', [
+    (builtin_sum, [Squad([1, 'x'])], r'sum\(\) needs a squad of numbers'),
+    (builtin_mean, [Squad([])], r'mean\(\) of an empty squad'),
+    (builtin_mean, [Squad(['a'])], r'mean\(\) needs a squad of numbers'),
+    (builtin_min, [Squad([])], r'min\(\) of an empty squad'),
+    (builtin_max, [Squad([1, 'x'])], r"max\(\) can't compare the elements of this squad"),
+    (builtin_sum, [5], r'sum\(\) takes one squad'),
+    (builtin_len, [Squad([]), Squad([])], r'len\(\) takes one squad'),
+    (builtin_keys, [Squad([])], r'keys\(\) takes one stash'),
+])
+def test_bad_arguments(func, args, message):
+    with pytest.raises(RuntimeError, match=message):
+        func(args)
+
+AGGREGATES = '''squad xs = [4, 8, 15, 16, 23, 42]
+sigma total = 0
+yap i till 0 to 5 {
+    total = total + xs[i]
+}
+hawk_tuah(total == sum(xs))
+hawk_tuah(sum(xs))
+hawk_tuah(xs.sum() + xs.len())
+hawk_tuah(min(xs))
+hawk_tuah(xs.max())
+hawk_tuah(mean(xs))
+hawk_tuah(sum(xs[1:3]))
+hawk_tuah(len("four"))
+stash s = {"a": 1}
+hawk_tuah(len(s))
+sus { hawk_tuah(mean([])) } panik { hawk_tuah("empty") }
+'''
+
+def test_aggregates_in_programs(engine):
+    expected = 'slay\n108\n114\n4\n42\n18.0\n23\n4\n1\nempty\n'
+    assert run_source(AGGREGATES, engine) == expected
+    assert run_source(AGGREGATES, engine, optimize_ast=True) == expected
@@ -0,0 +1,57 @@
+# test_booleans.py
+
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from interpreter import Environment, EXPRESSION_HANDLERS, Squad, binary_op, external, is_slay
+
+def evaluate(code):
+    expr = parse(iter_tokens(f'hawk_tuah({code})'))[0][1]
+    return EXPRESSION_HANDLERS[expr[0]](expr, Environment())
+
+def test_comparisons_and_logic_are_python_bools():
+    assert evaluate('1 < 2') is True
+    assert evaluate('slay frfr 1 > 2') is False
+    assert evaluate('nah cap') is True
+    assert evaluate('slay') is True and evaluate('cap') is False
+
+def test_booleans_only_read_as_slay_and_cap_at_the_edges():
+    assert external(Squad([True, 1, Squad([False])])) == ['slay', 1, ['cap']]
+    assert external({True: False}) == {'slay': 'cap'}
+    assert binary_op('is ', '+', True) == 'is slay'
+    assert binary_op(True, '+', 1) == 2
+    assert binary_op('slay', '+', 1) == 2
+    assert is_slay('slay') and is_slay(True) and not is_slay('cap') and not is_slay(1)
+
+PRINTING = '''hawk_tuah(1 == 1)
+hawk_tuah(nah (2 > 1))
+squad xs = [1 > 0, cap]
+hawk_tuah(xs)
+stash s = {"k": slay}
+hawk_tuah(s)
+hawk_tuah("is " + (1 == 1))
+hawk_tuah((1 < 0) + "")
+hawk_tuah((1 == 1) + 1)
+hawk_tuah(slay == "slay")
+tweet t = 1 > 0
+hawk_tuah(t)
+sigma y = slay
+hawk_tuah(y + 1)
+'''
+
+def test_output_is_unchanged(engine):
+    expected = "slay\ncap\n['slay', 'cap']\n{'k': 'slay'}\nis slay\ncap\n2\nslay\nslay\n2\n"
+    assert run_source(PRINTING, engine) == expected
+    assert run_source(PRINTING, engine, optimize_ast=True) == expected
+
+def test_slay_strings_from_input_are_conditions(engine, monkeypatch):
+    answers = iter(['slay', 'cap', 'slay'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    code = ('sigma n = 0\nflex gimme("?") {\n    n = n + 1\n}\nhawk_tuah(n)\n'
+            'rizz_check gimme("?") { hawk_tuah("yes") } nah_fam { hawk_tuah("no") }\n')
+    assert run_source(code, engine) == '1\nyes\n'
+
+def test_squad_elements_count_as_booleans(engine):
+    code = ('squad flags = [slay, "slay", cap]\nsigma hits = 0\n'
+            'yap i till 0 to 2 {\n    rizz_check flags[i] { hits = hits + 1 }\n}\nhawk_tuah(hits)\n')
+    assert run_source(code, engine) == '2\n'
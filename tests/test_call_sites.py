@@ -0,0 +1,77 @@
+# test_call_sites.py
+
+import pytest
+
+from conftest import run_source
+from interpreter import Environment
+from resolver import CallSite, UNCACHED, bind_locals
+from runcache import RunCache
+
+def builtin(name):
+    return ('BUILTIN_FUNCTION', name, len, True)
+
+def test_builtin_sites_cache_the_python_function():
+    site = CallSite('site_test_builtin')
+    func = builtin('site_test_builtin')
+    site.fill(func, RunCache())
+    assert site.func is func and site.target is len
+
+def test_only_functions_are_cached():
+    site = CallSite('site_test_value')
+    cache = RunCache()
+    site.fill(42, cache)
+    site.fill(('SQUAD', []), cache)
+    assert site.func is UNCACHED
+
+def test_locally_bound_names_reset_and_skip_their_sites():
+    cache = RunCache()
+    site = CallSite('site_test_local')
+    func = ('FUNCTION', 'site_test_local', [], [])
+    site.fill(func, cache, 'compiled')
+    assert site.func is func and site.target == 'compiled'
+    bind_locals(['site_test_local'], cache)
+    assert site.func is UNCACHED and site.target is None
+    assert 'site_test_local' not in cache.call_sites
+    site.fill(func, cache, 'compiled')
+    assert site.func is UNCACHED
+
+def test_locals_of_one_run_dont_reach_another(engine):
+    binds = 'cook f() {\n    sigma helper = 1\n    yeet helper\n}\nhawk_tuah(f())\n'
+    calls = 'cook helper() {\n    yeet 2\n}\ncook g() {\n    yeet helper()\n}\nhawk_tuah(g())\n'
+    first, second = Environment(), Environment()
+    assert run_source(binds, engine, env=first) == '1\n'
+    assert run_source(calls, engine, env=second) == '2\n'
+    assert 'helper' in first.cache.locally_bound
+    assert 'helper' not in second.cache.locally_bound
+
+def test_redefinition_is_seen_by_a_hot_call_site(engine):
+    code = ('cook step() {\n    yeet 1\n}\n'
+            'cook run() {\n    sigma total = 0\n    yap i till 1 to 3 {\n        total = total + step()\n    }\n    yeet total\n}\n'
+            'hawk_tuah(run())\n'
+            'cook step() {\n    yeet 100\n}\n'
+            'hawk_tuah(run())\n')
+    assert run_source(code, engine) == '3\n300\n'
+
+def test_shadowing_a_builtin(engine):
+    code = ('hawk_tuah(len([1, 2]))\n'
+            'cook len(xs) {\n    yeet "mine"\n}\n'
+            'hawk_tuah(len([1, 2]))\n')
+    assert run_source(code, engine) == '2\nmine\n'
+
+def test_caller_bindings_of_a_called_name_win(engine):
+    code = ('cook greet() {\n    yeet "hi"\n}\ncook shout() {\n    yeet "HI"\n}\n'
+            'cook use() {\n    yeet greet()\n}\n'
+            'cook shadow() {\n    sigma greet = shout\n    yeet use()\n}\n'
+            'hawk_tuah(use())\nhawk_tuah(shadow())\nhawk_tuah(use())\n')
+    assert run_source(code, engine) == 'hi\nHI\nhi\n'
+
+def test_rebinding_to_a_value_is_not_a_function(engine):
+    code = ('cook f() {\n    yeet 1\n}\nhawk_tuah(f())\nf = 5\nhawk_tuah(f())\n')
+    with pytest.raises(Exception, match="'f' is not a function"):
+        run_source(code, engine)
+
+def test_recursive_calls(engine):
+    code = ('cook fact(n) {\n    rizz_check n < 2 { yeet 1 }\n    yeet n * fact(n - 1)\n}\n'
+            'cook fib(n) {\n    rizz_check n < 2 { yeet n }\n    yeet fib(n - 1) + fib(n - 2)\n}\n'
+            'hawk_tuah(fact(20))\nhawk_tuah(fib(20))\n')
+    assert run_source(code, engine) == '2432902008176640000\n6765\n'
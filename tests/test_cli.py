@@ -0,0 +1,131 @@
+# test_cli.py
+
+import os
+
+import pytest
+
+import astcache
+import memo
+from astcache import load_ast, cache_path, CACHE_DIRNAME
+from cli import Options, main
+
+SOURCE = 'sigma x = 1 + 2\nhawk_tuah(x)\n'
+
+def test_defaults():
+    options = Options(['prog.bs'], '.bs')
+    assert options.files == ['prog.bs']
+    assert (options.engine, options.lexer, options.cache_dir, options.stack_budget) == ('tree', 'regex', None, None)
+    assert options.use_cache and not options.optimize and not options.shell
+    assert options.memo.enabled and options.memo.cache_size == memo.DEFAULT_CACHE_SIZE
+
+def test_flags():
+    options = Options(['-engine=vm', '-lexer=scan', '--no-cache', '-cache-dir=/tmp/c=d', '-O', '-dis',
+                       '-emit-py', '-token', '-ast', '-stack-budget=4', '-no-memo', '-memo-size=8',
+                       '-memo-stats', 'a.lava', 'b.bs'], '.lava')
+    assert options.files == ['a.lava']
+    assert (options.engine, options.lexer, options.cache_dir) == ('vm', 'scan', '/tmp/c=d')
+    assert not options.use_cache
+    assert options.optimize and options.show_bytecode and options.show_python
+    assert options.show_tokens and options.show_ast and options.memo_stats
+    assert options.stack_budget == 4 * 1024 * 1024
+    assert not options.memo.enabled and options.memo.cache_size == 8
+    assert not Options(['-no-cache', 'x.bs'], '.bs').use_cache
+
+def test_main_runs_a_file(tmp_path, capsys):
+    script = tmp_path / 'prog.bs'
+    script.write_text(SOURCE)
+    main([str(script), '-engine=closure', '-O'], 'bs', '.bs', 'banner')
+    assert capsys.readouterr().out == '3\n'
+
+def test_main_wants_a_file_of_its_extension(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / 'prog.bs')], 'python lava.py', '.lava', 'banner')
+    assert capsys.readouterr().out == 'Error: No .lava file provided.\n'
+
+def write_script(tmp_path, code=SOURCE):
+    script = tmp_path / 'prog.bs'
+    script.write_text(code)
+    return str(script)
+
+def parse_count(monkeypatch):
+    calls = []
+    real = astcache.Parser
+    def counting(tokens):
+        calls.append(1)
+        return real(tokens)
+    monkeypatch.setattr(astcache, 'Parser', counting)
+    return calls
+
+def test_cache_is_written_and_reused(tmp_path, monkeypatch):
+    monkeypatch.delenv('BSCACHEPREFIX', raising=False)
+    script = write_script(tmp_path)
+    calls = parse_count(monkeypatch)
+    first = load_ast(script, SOURCE)
+    assert os.path.exists(os.path.join(tmp_path, CACHE_DIRNAME, os.path.basename(cache_path(script))))
+    assert load_ast(script, SOURCE) == first
+    assert len(calls) == 1
+
+def test_changed_source_is_parsed_again(tmp_path, monkeypatch):
+    script = write_script(tmp_path)
+    calls = parse_count(monkeypatch)
+    load_ast(script, SOURCE, cache_prefix=str(tmp_path / 'cache'))
+    changed = SOURCE.replace('2', '3')
+    assert load_ast(script, changed, cache_prefix=str(tmp_path / 'cache'))[0][2][3] == ('NUMBER', 3)
+    assert len(calls) == 2
+
+def test_corrupt_cache_falls_back_to_parsing(tmp_path):
+    script = write_script(tmp_path)
+    prefix = str(tmp_path / 'cache')
+    expected = load_ast(script, SOURCE, cache_prefix=prefix)
+    path = cache_path(script, prefix)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-3])
+    assert load_ast(script, SOURCE, cache_prefix=prefix) == expected
+
+def test_scripts_with_syntax_errors_are_not_cached(tmp_path, capsys):
+    code = 'sigma = 1\n'
+    script = write_script(tmp_path, code)
+    prefix = str(tmp_path / 'cache')
+    load_ast(script, code, cache_prefix=prefix)
+    assert not os.path.exists(cache_path(script, prefix))
+
+def test_no_cache_leaves_no_files(tmp_path, monkeypatch):
+    monkeypatch.delenv('BSCACHEPREFIX', raising=False)
+    script = write_script(tmp_path)
+    load_ast(script, SOURCE, use_cache=False)
+    assert os.listdir(tmp_path) == ['prog.bs']
+
+def test_scripts_differing_only_in_extension_get_their_own_cache(tmp_path):
+    prefix = str(tmp_path / 'cache')
+    lava = tmp_path / 'prog.lava'
+    lava.write_text('hawk_tuah(2)\n')
+    script = write_script(tmp_path)
+    assert cache_path(script, prefix) != cache_path(str(lava), prefix)
+    load_ast(script, SOURCE, cache_prefix=prefix)
+    assert load_ast(str(lava), 'hawk_tuah(2)\n', cache_prefix=prefix) == [('PRINT', ('NUMBER', 2))]
+    assert load_ast(script, SOURCE, cache_prefix=prefix)[0][0] == 'SIGMA_DECL'
+
+@pytest.mark.parametrize('module, name, error', [
+    (astcache.marshal, 'dumps', ValueError('unmarshallable')),
+    (astcache.os, 'replace', OSError('read-only')),
+])
+def test_failed_cache_writes_leave_no_temp_file(tmp_path, monkeypatch, module, name, error):
+    def fail(*args):
+        raise error
+    monkeypatch.setattr(module, name, fail)
+    script = write_script(tmp_path)
+    prefix = tmp_path / 'cache'
+    load_ast(script, SOURCE, cache_prefix=str(prefix))
+    directory = os.path.dirname(cache_path(script, str(prefix)))
+    assert not os.path.exists(directory) or os.listdir(directory) == []
+
+@pytest.mark.parametrize('lexer', ['regex', 'scan'])
+def test_lexer_errors_stop_the_whole_script(tmp_path, capsys, monkeypatch, lexer):
+    monkeypatch.delenv('BSCACHEPREFIX', raising=False)
+    script = write_script(tmp_path, 'hawk_tuah("before")\nsigma x = 1 @ 2\nhawk_tuah("after")\n')
+    with pytest.raises(SyntaxError, match='Unexpected token: @ at line 2'):
+        main([script, f'-lexer={lexer}'], 'bs', '.bs', 'banner')
+    assert capsys.readouterr().out == ''
+    assert not os.path.exists(os.path.join(tmp_path, CACHE_DIRNAME))
@@ -0,0 +1,179 @@
+# test_engines.py
+"""Every engine, with and without -O, must behave like the tree-walking
+interpreter: same output, same error"""
+
+import contextlib
+import glob
+import io
+import os
+
+import pytest
+
+from conftest import ENGINES, EXAMPLES_DIR
+from lexer import iter_tokens
+from parser import parse
+from interpreter import run, Environment
+from optimizer import optimize
+
+PROGRAMS = {
+    'control flow': '''
+sigma total = 0
+yap i till 1 to 10 {
+    rizz_check i / 2 * 2 == i { total = total + i } nah_fam { total = total - 1 }
+}
+hawk_tuah(total)
+sigma n = 0
+flex n < 5 frfr nah (n == 3) {
+    n = n + 1
+}
+hawk_tuah(n)
+hawk_tuah(i)
+''',
+    'functions': '''
+cook fib(n) {
+    rizz_check n < 2 { yeet n }
+    yeet fib(n - 1) + fib(n - 2)
+}
+cook first_big(limit) {
+    yap i till 0 to 100 {
+        rizz_check i * i > limit { yeet i }
+    }
+    yeet nvm
+}
+cook count_down(n) {
+    rizz_check n == 0 { yeet "liftoff" }
+    yeet count_down(n - 1)
+}
+cook shout(word) {
+    hawk_tuah(word + "!")
+}
+hawk_tuah(fib(15))
+hawk_tuah(first_big(50))
+hawk_tuah(count_down(500))
+shout("hey")
+hawk_tuah(shout("again"))
+sigma f = fib
+hawk_tuah(f(10))
+''',
+    'dynamic scoping': '''
+sigma x = 1
+cook show() {
+    yeet x
+}
+cook shadow() {
+    sigma x = 2
+    yeet show()
+}
+cook bump() {
+    x = x + 10
+}
+hawk_tuah(show())
+hawk_tuah(shadow())
+bump()
+hawk_tuah(x)
+''',
+    'values and coercion': '''
+sigma a = 7
+tweet t = a
+hawk_tuah(t + "1")
+sigma b = "5"
+hawk_tuah(b * 2)
+sigma flag = slay
+hawk_tuah(flag frfr cap)
+hawk_tuah(flag == "slay")
+hawk_tuah(nah flag maybe 1 > 0)
+hawk_tuah(3 / 2)
+hawk_tuah(6 / 3)
+hawk_tuah(-2.5 * 2)
+hawk_tuah(nvm)
+hawk_tuah(delulu)
+''',
+    'errors': '''
+cook risky(d) {
+    yeet 10 / d
+}
+sus {
+    hawk_tuah(risky(2))
+    hawk_tuah(risky(0))
+    hawk_tuah("skipped")
+} panik {
+    hawk_tuah("caught")
+    hawk_tuah(missing)
+    hawk_tuah("still here")
+}
+hawk_tuah(risky(0))
+''',
+    'squads': '''
+squad xs = [3, 1, 2]
+squad ys = xs
+ys[0] = 30
+hawk_tuah(xs)
+hawk_tuah(ys)
+squad grid = [[1, 2], [3, 4]]
+squad copy = grid
+squad row = copy[0]
+row[0] = 99
+hawk_tuah(grid)
+hawk_tuah(copy)
+scooch(xs, 4)
+hawk_tuah(xs.len())
+hawk_tuah(xs[-1])
+hawk_tuah(xs[1:3])
+hawk_tuah(xs[::-1])
+hawk_tuah(sum(xs) + max(xs) - min(xs))
+hawk_tuah(mean(xs))
+hawk_tuah(sorted(xs))
+xs.sort()
+hawk_tuah(xs)
+hawk_tuah(search(xs, 3))
+hawk_tuah(xs + [5])
+squad base = [0]
+hawk_tuah(base * 3)
+hawk_tuah(scale(xs, 2) + 1)
+hawk_tuah(xs[10])
+''',
+    'stashes': '''
+stash s = {"a": 1, 2: "two"}
+s["b"] = s["a"] + 1
+hawk_tuah(s)
+hawk_tuah(s.keys())
+hawk_tuah(has(s, 2))
+stash t = s
+t["a"] = 100
+hawk_tuah(s["a"])
+hawk_tuah(s["zzz"])
+''',
+}
+
+def example_programs():
+    return {os.path.basename(path): open(path).read()
+            for path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.bs')))}
+
+ALL_PROGRAMS = {**PROGRAMS, **example_programs()}
+
+def outcome(code, engine, optimize_ast, monkeypatch):
+    """Everything a run printed, then how it ended"""
+    # Examples ask for input and read files next to them
+    answers = iter(['21', '4', 'Ada', '30'] * 10)
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    monkeypatch.chdir(EXAMPLES_DIR)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        ast = parse(iter_tokens(code))
+        if optimize_ast:
+            ast = optimize(ast)[0]
+        try:
+            run(ast, Environment(), engine)
+            ending = 'ok'
+        except SystemExit:
+            ending = 'exit'
+        except Exception as e:
+            ending = f"{type(e).__name__}: {e}"
+    return out.getvalue(), ending
+
+@pytest.mark.parametrize('optimize_ast', [False, True], ids=['plain', '-O'])
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('name', list(ALL_PROGRAMS))
+def test_engines_match_tree_interpreter(name, engine, optimize_ast, monkeypatch):
+    code = ALL_PROGRAMS[name]
+    assert outcome(code, engine, optimize_ast, monkeypatch) == outcome(code, 'tree', False, monkeypatch)
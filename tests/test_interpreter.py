@@ -0,0 +1,61 @@
+# test_interpreter.py
+
+import pytest
+
+from lexer import iter_tokens
+from parser import parse
+from interpreter import run, Environment, EXPRESSION_HANDLERS, STATEMENT_HANDLERS
+
+CORE = '''sigma total = 0
+yap i till 1 to 4 {
+    total = total + i
+}
+hawk_tuah(total)
+sigma n = 3
+flex n > 0 {
+    n = n - 1
+}
+rizz_check n == 0 { hawk_tuah("done") } nah_fam { hawk_tuah("not done") }
+tweet word = "ab"
+hawk_tuah(word + "c")
+squad xs = [1, "two", slay]
+xs[1] = nvm
+hawk_tuah(xs)
+cook add(a, b) {
+    yeet a + b
+}
+hawk_tuah(add(2, 3))
+sus {
+    hawk_tuah(1 / 0)
+} panik {
+    hawk_tuah("caught")
+}
+hawk_tuah(delulu == delulu)
+skibidi
+hawk_tuah("unreachable")
+'''
+
+def test_core_statements(capsys):
+    with pytest.raises(SystemExit):
+        run(parse(iter_tokens(CORE)), Environment())
+    assert capsys.readouterr().out == "10\ndone\nabc\n[1, 'nvm', 'slay']\n5\ncaught\nslay\n"
+
+@pytest.mark.parametrize('ast, message', [
+    ([('BOGUS',)], 'Unknown statement type: BOGUS'),
+    ([('PRINT', ('BOGUS',))], 'Unknown expression type: BOGUS'),
+])
+def test_unknown_nodes_are_runtime_errors(ast, message):
+    with pytest.raises(RuntimeError, match=message):
+        run(ast, Environment())
+
+def test_every_parsed_node_has_a_handler():
+    statements = ['PRINT', 'SQUAD_DECL', 'STASH_DECL', 'SIGMA_DECL', 'TWEET_DECL', 'INDEX_ASSIGN', 'VAR_ASSIGN',
+                  'CALL_STMT', 'FOR', 'WHILE', 'IF_ELSE', 'RETURN', 'EXIT', 'TRY_CATCH', 'FUNCTION']
+    expressions = ['NUMBER', 'STRING', 'IDENTIFIER', 'BOOLEAN', 'NULL', 'UNDECIDED', 'ARRAY', 'STASH', 'INDEX',
+                   'SLICE', 'CALL', 'METHOD_CALL', 'BIN_OP', 'LOGIC_OP', 'UNARY_OP']
+    assert set(statements) <= set(STATEMENT_HANDLERS)
+    assert set(expressions) <= set(EXPRESSION_HANDLERS)
+
+def test_unknown_engine():
+    with pytest.raises(ValueError, match="Unknown engine 'turbo'"):
+        run([], Environment(), 'turbo')
@@ -0,0 +1,135 @@
+# test_lexer.py
+"""Differential tests: every lexer engine must agree with the regex reference,
+token for token and error for error"""
+
+import glob
+import os
+
+import pytest
+
+from conftest import EXAMPLES_DIR
+from lexer import iter_tokens, tokenize, pack_tokens, BufferCursor, LEXER_ENGINES
+
+EDGE_CASES = [
+    'sigma x = -5.25 - 3\n',
+    'hawk_tuah("a b" + "c")\r\n',
+    'a==b!=c<=d>=e<f>g!h',
+    '1. 2.x 3.45.6 -7',
+    'on_read{multi\nline}x on_readx on_read {',
+    'on_read{never closed',
+    '"unterminated',
+    '"unterminated\n"',
+    'tweet s = "ok"\nhawk_tuah("still open)\n',
+    'sigma x = 1 $',
+    'sigma x = 1\n\n   sigma y = @',
+    'on_read{one\ntwo\nthree}\r\n  #',
+    'sigma é = 1',
+    'sigma x = ٣٤ + ²',
+    '\t  \n\n  yeet',
+    '',
+]
+
+def example_sources():
+    return sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.bs')))
+
+def read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+def lex_outcome(code, engine):
+    try:
+        return list(iter_tokens(code, engine))
+    except SyntaxError as e:
+        return ('SyntaxError', str(e))
+
+def lex_error(code, engine):
+    with pytest.raises(SyntaxError) as info:
+        tokenize(code, engine)
+    return str(info.value)
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+@pytest.mark.parametrize('code', EDGE_CASES)
+def test_engines_agree_on_edge_cases(engine, code):
+    assert lex_outcome(code, engine) == lex_outcome(code, 'regex')
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+@pytest.mark.parametrize('path', example_sources(), ids=os.path.basename)
+def test_engines_agree_on_examples(engine, path):
+    code = read(path)
+    assert lex_outcome(code, engine) == lex_outcome(code, 'regex')
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+def test_unterminated_string(engine):
+    assert lex_error('tweet s = "never closed', engine) == 'Unexpected token: " at line 1, column 11'
+    # Strings do not span lines
+    assert lex_error('hawk_tuah("a\nb")', engine) == 'Unexpected token: " at line 1, column 11'
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+def test_unknown_character(engine):
+    assert lex_error('sigma x = 1 $', engine) == 'Unexpected token: $ at line 1, column 13'
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+def test_unclosed_comment(engine):
+    assert lex_error('sigma x = 1\n  on_read{never closed', engine) == 'Unclosed comment at line 2, column 3'
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+@pytest.mark.parametrize('code, position', [
+    ('sigma x = 1\n\n   sigma y = @', 'line 3, column 14'),
+    ('on_read{one\ntwo\nthree} @', 'line 3, column 8'),
+    ('\t$', 'line 1, column 2'),
+])
+def test_error_position(engine, code, position):
+    assert lex_error(code, engine).endswith(f'at {position}')
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+def test_line_and_column_tracking(engine):
+    code = 'sigma x = 1\n  on_read{one\ntwo} yeet x\n\n\thawk_tuah("a b")'
+    assert [(kind, line, column) for kind, _, line, column in iter_tokens(code, engine)] == [
+        ('SIGMA', 1, 1), ('IDENTIFIER', 1, 7), ('ASSIGN', 1, 9), ('NUMBER', 1, 11),
+        ('YEET', 3, 6), ('IDENTIFIER', 3, 11),
+        ('HAWK_TUAH', 5, 2), ('LPAREN', 5, 11), ('STRING', 5, 12), ('RPAREN', 5, 17),
+    ]
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+def test_tokens(engine):
+    assert tokenize('sigma x = -5.25 frfr "a b"', engine) == [
+        ('SIGMA', 'sigma'), ('IDENTIFIER', 'x'), ('ASSIGN', '='), ('NUMBER', '-5.25'),
+        ('AND', 'frfr'), ('STRING', '"a b"'),
+    ]
+
+def drain(cursor):
+    tokens = []
+    while cursor.peek_type() != 'EOF':
+        tokens.append(cursor.advance())
+    return tokens
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+@pytest.mark.parametrize('code', EDGE_CASES + [read(path) for path in example_sources()])
+def test_token_buffer_matches_token_list(engine, code):
+    expected = lex_outcome(code, engine)
+    if isinstance(expected, list):
+        expected = [token[:2] for token in expected]
+    try:
+        actual = drain(BufferCursor(pack_tokens(code, engine)))
+    except SyntaxError as e:
+        actual = ('SyntaxError', str(e))
+    assert actual == expected
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+def test_tokens_are_produced_lazily(engine):
+    # The error at the end only surfaces once the lexer gets there
+    tokens = iter_tokens('sigma x = 1 $', engine)
+    assert next(tokens) == ('SIGMA', 'sigma', 1, 1)
+    assert next(tokens) == ('IDENTIFIER', 'x', 1, 7)
+    with pytest.raises(SyntaxError):
+        list(tokens)
+
+@pytest.mark.parametrize('engine', LEXER_ENGINES)
+def test_keywords_are_not_identifier_prefixes(engine):
+    assert tokenize('sigmax yeet_ on_readx nah_fam', engine) == [
+        ('IDENTIFIER', 'sigmax'), ('IDENTIFIER', 'yeet_'), ('IDENTIFIER', 'on_readx'), ('NAH_FAM', 'nah_fam'),
+    ]
+
+def test_unknown_engine():
+    with pytest.raises(ValueError, match="Unknown lexer engine 'fast'"):
+        iter_tokens('', 'fast')
@@ -0,0 +1,103 @@
+# test_memo.py
+
+import pytest
+
+import memo
+from conftest import run_source
+from interpreter import Environment
+from memo import MemoSettings
+
+@pytest.fixture
+def env():
+    return Environment()
+
+def table_of(env, name):
+    tables = [table for func, table in env.cache.nodes(memo.build_memo_table).items() if func[1] == name]
+    assert len(tables) == 1
+    return tables[0]
+
+def test_pure_function_is_cached(engine, env):
+    code = ('cook square(x) {\n    yeet x * x\n}\n'
+            'hawk_tuah(square(3))\nhawk_tuah(square(3))\nhawk_tuah(square(4))\n')
+    assert run_source(code, engine, env=env) == '9\n9\n16\n'
+    table = table_of(env, 'square')
+    assert (table.hits, table.misses) == (1, 2)
+
+def test_calls_through_pure_builtins_are_cached(engine, env):
+    code = ('cook total(n) {\n    squad xs = [n, n, 1]\n    yeet sum(xs) + len(xs)\n}\n'
+            'hawk_tuah(total(2))\nhawk_tuah(total(2))\n')
+    assert run_source(code, engine, env=env) == '8\n8\n'
+    assert table_of(env, 'total').hits == 1
+
+def assert_never_cached(env, name):
+    table = table_of(env, name)
+    if table is not None:
+        assert table.hits == 0
+        assert not table.cache
+
+def test_gimme_is_never_cached(engine, env, monkeypatch):
+    answers = iter(['first', 'second'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    code = 'cook ask(p) {\n    yeet gimme(p)\n}\nhawk_tuah(ask("?"))\nhawk_tuah(ask("?"))\n'
+    assert run_source(code, engine, env=env) == 'first\nsecond\n'
+    assert_never_cached(env, 'ask')
+
+def test_scoop_is_never_cached(engine, env, tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('hello')
+    code = f'cook read(f) {{\n    yeet scoop(f)\n}}\nhawk_tuah(read("{path}"))\nhawk_tuah(read("{path}"))\n'
+    assert run_source(code, engine, env=env) == 'hello\nhello\n'
+    assert_never_cached(env, 'read')
+
+def test_scooch_and_sort_are_never_cached(engine, env):
+    code = ('cook grow(n) {\n    squad xs = [3, 1]\n    scooch(xs, n)\n    xs.sort()\n    yeet xs[0]\n}\n'
+            'hawk_tuah(grow(2))\nhawk_tuah(grow(2))\n')
+    assert run_source(code, engine, env=env) == '1\n1\n'
+    assert_never_cached(env, 'grow')
+
+def test_global_writes_are_never_cached(engine, env):
+    code = ('sigma counter = 0\n'
+            'cook bump(x) {\n    counter = counter + 1\n    yeet x\n}\n'
+            'hawk_tuah(bump(1))\nhawk_tuah(bump(1))\nhawk_tuah(counter)\n')
+    assert run_source(code, engine, env=env) == '1\n1\n2\n'
+    assert_never_cached(env, 'bump')
+
+def test_dynamically_scoped_reads_are_never_cached(engine, env):
+    code = ('sigma offset = 10\n'
+            'cook shifted(x) {\n    yeet x + offset\n}\n'
+            'cook inner(x) {\n    sigma offset = 100\n    yeet shifted(x)\n}\n'
+            'hawk_tuah(shifted(1))\nhawk_tuah(inner(1))\noffset = 20\nhawk_tuah(shifted(1))\n')
+    assert run_source(code, engine, env=env) == '11\n101\n21\n'
+    assert_never_cached(env, 'shifted')
+
+def test_rebinding_a_called_name_drops_cached_results(engine):
+    code = ('cook base(x) {\n    yeet x\n}\n'
+            'cook twice(x) {\n    yeet base(x) * 2\n}\n'
+            'hawk_tuah(twice(3))\n'
+            'cook base(x) {\n    yeet x + 1\n}\n'
+            'hawk_tuah(twice(3))\n')
+    assert run_source(code, engine) == '6\n8\n'
+
+def test_settings_can_turn_memoization_off(engine):
+    code = 'cook square(x) {\n    yeet x * x\n}\nhawk_tuah(square(3))\nhawk_tuah(square(3))\n'
+    env = Environment(memo=MemoSettings(enabled=False))
+    assert run_source(code, engine, env=env) == '9\n9\n'
+    table = table_of(env, 'square')
+    assert table.hits == 0 and not table.cache
+
+def test_settings_bound_the_cache(engine):
+    code = ('cook square(x) {\n    yeet x * x\n}\n'
+            'yap i till 0 to 9 {\n    square(i)\n}\nhawk_tuah(square(9))\n')
+    env = Environment(memo=MemoSettings(cache_size=3))
+    assert run_source(code, engine, env=env) == '81\n'
+    table = table_of(env, 'square')
+    assert len(table.cache) == 3
+    assert table.hits == 1
+
+def test_every_run_has_its_own_tables(engine):
+    code = 'cook square(x) {\n    yeet x * x\n}\nhawk_tuah(square(3))\nhawk_tuah(square(3))\n'
+    first, second = Environment(), Environment()
+    assert run_source(code, engine, env=first) == '9\n9\n'
+    assert memo.report(second.cache) == 'memo: no memoized calls'
+    assert run_source(code, engine, env=second) == '9\n9\n'
+    assert memo.report(first.cache) == memo.report(second.cache) == 'memo: square: 1 hits, 1 misses, 1 cached'
@@ -0,0 +1,76 @@
+# test_optimizer.py
+
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from optimizer import optimize
+
+PANIK_YEET = '''cook f() {
+    sus {
+        sigma x = 1 / 0
+    } panik {
+        hawk_tuah("caught")
+        yeet 1 / 0
+        hawk_tuah("after failing yeet")
+        yeet 2 + 3
+        hawk_tuah("never")
+    }
+}
+hawk_tuah(f())
+'''
+
+def optimized(code):
+    return optimize(parse(iter_tokens(code)))
+
+def test_panik_keeps_statements_after_a_yeet_that_can_raise(engine):
+    expected = 'caught\nError in panik block: Division by zero\nafter failing yeet\n5\n'
+    assert run_source(PANIK_YEET, engine) == expected
+    assert run_source(PANIK_YEET, engine, optimize_ast=True) == expected
+
+def test_panik_cuts_after_a_yeet_that_cannot_raise():
+    ast, report = optimized(PANIK_YEET)
+    catch_body = ast[0][3][0][2]
+    assert [stmt[0] for stmt in catch_body] == ['PRINT', 'RETURN', 'PRINT', 'RETURN']
+    assert '1 unreachable statements' in report
+
+def test_code_after_yeet_outside_panik_is_dropped():
+    ast, report = optimized('cook f() {\n  yeet 1 / 0\n  hawk_tuah("never")\n}')
+    assert [stmt[0] for stmt in ast[0][3]] == ['RETURN']
+    assert '1 unreachable statements' in report
+
+def test_constants_are_folded_and_literals_decoded():
+    ast, report = optimized('hawk_tuah(20 - 15)\nhawk_tuah("a" + "b")\nhawk_tuah(nah slay maybe cap)\nhawk_tuah(-slay)\n')
+    assert ast == [('PRINT', ('CONST', 5)), ('PRINT', ('CONST', 'ab')),
+                   ('PRINT', ('CONST', False)), ('PRINT', ('CONST', -1))]
+    assert '8 operands folded' in report
+
+def test_failing_operations_are_left_for_run_time(engine):
+    ast, _ = optimized('hawk_tuah(1 / 0)\n')
+    assert ast == [('PRINT', ('BIN_OP', ('CONST', 1), '/', ('CONST', 0)))]
+    assert run_source('sus {\n    hawk_tuah(1 / 0)\n} panik {\n    hawk_tuah("caught")\n}\n',
+                      engine, optimize_ast=True) == 'caught\n'
+
+def test_constant_conditions_keep_only_the_branch_that_runs():
+    ast, report = optimized('rizz_check slay { hawk_tuah(1) } nah_fam { hawk_tuah(2) }\n'
+                            'rizz_check 1 > 2 { hawk_tuah(3) }\n')
+    assert ast == [('PRINT', ('CONST', 1))]
+    assert '2 branches pruned' in report
+
+def test_empty_loops_and_blocks_are_dropped(engine):
+    code = ('yap i till 5 to 1 {\n    hawk_tuah(i)\n}\nyap j till 0 to 3 {\n}\n'
+            'flex cap {\n    hawk_tuah(1)\n}\nsus {\n} panik {\n    hawk_tuah(2)\n}\nhawk_tuah(j)\n')
+    ast, report = optimized(code)
+    assert [stmt[0] for stmt in ast] == ['TYPED_DECL', 'PRINT']
+    assert '4 empty loops/blocks' in report
+    assert run_source(code, engine, optimize_ast=True) == run_source(code, 'tree') == '3\n'
+
+def test_code_after_skibidi_is_dropped():
+    ast, report = optimized('hawk_tuah(1)\nskibidi\nhawk_tuah(2)\n')
+    assert ast == [('PRINT', ('CONST', 1)), ('EXIT',)]
+    assert report.startswith('optimizer: removed 2 of 5 nodes')
+
+def test_long_operator_chains(engine):
+    code = 'sigma x = 1\nhawk_tuah(' + ' + '.join(['x'] * 20000) + ')\n'
+    ast, report = optimized(code)
+    assert report.startswith('optimizer: removed 0 of 40002 nodes')
+    assert run_source(code, engine, optimize_ast=True) == '20000\n'
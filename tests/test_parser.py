@@ -0,0 +1,113 @@
+# test_parser.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import run_source
+from lexer import iter_tokens, tokenize
+from parser import Parser, parse
+
+PROGRAM = '''cook helper_{i}(a, b) {{
+    sigma total = a * {i} + b / 3.5 - 1
+    rizz_check total >= 10 frfr slay {{
+        hawk_tuah("big " + total)
+    }} nah_fam {{
+        squad xs = [1, -2, "three", slay, nvm]
+    }}
+    yeet total
+}}
+hawk_tuah(helper_{i}({i}, 2))
+'''
+
+def programs(count):
+    return [''.join(PROGRAM.format(i=i + j) for j in range(1 + i % 7)) for i in range(count)]
+
+def yielding(tokens):
+    """Hand out tokens one at a time, letting other threads run in between"""
+    for token in tokens:
+        time.sleep(0)
+        yield token
+
+def test_parsers_in_threads_match_serial_parse():
+    sources = programs(48)
+    serial = [parse(tokenize(code)) for code in sources]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(3):
+            parallel = list(pool.map(lambda code: parse(yielding(iter_tokens(code))), sources))
+            assert parallel == serial
+
+def test_interleaved_parsers_keep_separate_state():
+    # Two parsers driven alternately from one thread share no cursor
+    left = Parser(tokenize('sigma a = 1 + 2 * 3'))
+    right = Parser(tokenize('tweet b = "x"'))
+    assert left.advance() == ('SIGMA', 'sigma')
+    assert right.advance() == ('TWEET', 'tweet')
+    assert left.peek_value() == 'a' and right.peek_value() == 'b'
+    assert right.parse() == [('VAR_ASSIGN', 'b', ('STRING', '"x"'))]
+    assert left.parse() == [('VAR_ASSIGN', 'a', ('BIN_OP', ('NUMBER', 1), '+',
+                                                 ('BIN_OP', ('NUMBER', 2), '*', ('NUMBER', 3))))]
+
+def test_syntax_errors_stay_with_their_parser(capsys):
+    broken = 'sigma = 1\nhawk_tuah(2)'
+    good = 'sigma x = 1'
+    results = {}
+    barrier = threading.Barrier(2)
+
+    def work(name, code):
+        barrier.wait()
+        parser = Parser(yielding(iter_tokens(code)))
+        results[name] = (parser.parse(), parser.errors)
+
+    threads = [threading.Thread(target=work, args=args) for args in [('broken', broken), ('good', good)]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ast, errors = results['broken']
+    assert ast == [('PRINT', ('NUMBER', 2))]
+    assert len(errors) == 1
+    assert results['good'] == ([('SIGMA_DECL', 'x', ('NUMBER', 1))], [])
+    assert 'Syntax Error' in capsys.readouterr().out
+
+def expression(code):
+    return Parser(tokenize(code)).parse_expression()
+
+def n(value):
+    return ('NUMBER', value)
+
+def v(name):
+    return ('IDENTIFIER', name)
+
+@pytest.mark.parametrize('code, tree', [
+    ('1 + 2 * 3', ('BIN_OP', n(1), '+', ('BIN_OP', n(2), '*', n(3)))),
+    ('1 * 2 + 3', ('BIN_OP', ('BIN_OP', n(1), '*', n(2)), '+', n(3))),
+    ('8 - 4 - 2', ('BIN_OP', ('BIN_OP', n(8), '-', n(4)), '-', n(2))),
+    ('8 / 4 / 2', ('BIN_OP', ('BIN_OP', n(8), '/', n(4)), '/', n(2))),
+    ('a + 1 < b * 2', ('BIN_OP', ('BIN_OP', v('a'), '+', n(1)), '<', ('BIN_OP', v('b'), '*', n(2)))),
+    ('a maybe b frfr c', ('LOGIC_OP', v('a'), 'maybe', ('LOGIC_OP', v('b'), 'frfr', v('c')))),
+    ('nah a == b frfr c', ('LOGIC_OP', ('UNARY_OP', 'nah', ('BIN_OP', v('a'), '==', v('b'))), 'frfr', v('c'))),
+    ('- a * b', ('BIN_OP', ('UNARY_OP', '-', v('a')), '*', v('b'))),
+    ('-2 * 3', ('BIN_OP', n(-2), '*', n(3))),
+    ('(1 + 2) * 3', ('BIN_OP', ('BIN_OP', n(1), '+', n(2)), '*', n(3))),
+])
+def test_precedence_and_associativity(code, tree):
+    assert expression(code) == tree
+
+def test_long_operator_chains_do_not_recurse():
+    code = ' + '.join(['1'] * 50000)
+    tree = expression(code)
+    depth = 0
+    while tree[0] == 'BIN_OP':
+        assert tree[3] == n(1)
+        tree = tree[1]
+        depth += 1
+    assert depth == 49999
+
+def test_precedence_on_every_engine(engine):
+    code = 'hawk_tuah(2 + 3 * 4 - 10 / 5)\nhawk_tuah(nah 1 > 2 frfr 3 == 3)\n'
+    assert run_source(code, engine) == '12.0\nslay\n'
+    assert run_source(code, engine, optimize_ast=True) == '12.0\nslay\n'
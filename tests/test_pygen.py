@@ -0,0 +1,67 @@
+# test_pygen.py
+
+import ast as python_ast
+
+import pytest
+
+import pygen
+from cli import main
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from pygen import generate, compile_source, load
+
+def parsed(code):
+    return parse(iter_tokens(code))
+
+PROGRAM = ('cook f(n) {\n    rizz_check n > 1 { yeet n } nah_fam { yeet 0 }\n}\n'
+           'sus {\n    hawk_tuah(f(2))\n} panik {\n    hawk_tuah("x")\n}\n'
+           'sigma k = 0\nflex k < 2 {\n    k = k + 1\n}\nhawk_tuah(f(1) + 1)\n')
+
+def test_generated_source_is_python():
+    source = generate(parsed(PROGRAM))
+    tree = python_ast.parse(source)
+    assert [node.name for node in tree.body] == ['bs_program', 'bs_fn_0']
+    assert 'while ' in source and 'try:' in source
+
+def test_semantics_survive_translation():
+    code = ('squad xs = [1, 2, 3]\nhawk_tuah(xs[-1])\n'
+            'sigma s = "4"\nhawk_tuah(s + 1)\n'
+            'tweet t = 5\nhawk_tuah(t + "!")\n'
+            'hawk_tuah(delulu)\nhawk_tuah(-delulu)\n'
+            'rizz_check slay { hawk_tuah(slay) }\n'
+            'rizz_check cap { hawk_tuah("no") } nah_fam { hawk_tuah(cap) }\n'
+            'hawk_tuah(1 < 2)\n')
+    expected = '3\n5.0\n5!\ndelulu\n-delulu\nslay\ncap\nslay\n'
+    assert run_source(code, 'python') == run_source(code, 'tree') == expected
+
+def test_compiled_code_is_cached_by_source():
+    source = generate(parsed(PROGRAM))
+    first = compile_source(source)
+    assert compile_source(source) is first
+    assert compile_source(source + '\n') is not first
+
+def test_rerunning_a_program_reuses_its_code_object(monkeypatch):
+    compiles = []
+    real = compile
+    def counting(*args):
+        compiles.append(args[0])
+        return real(*args)
+    monkeypatch.setattr(pygen, 'compile', counting, raising=False)
+    pygen.code_cache.clear()
+    assert run_source(PROGRAM, 'python') == run_source(PROGRAM, 'python') == '2\n1\n'
+    assert compiles and len(compiles) == len(set(compiles))
+
+def test_too_deeply_nested_programs_fall_back_to_the_tree_walker():
+    depth = 120
+    code = 'sigma x = 0\n' + 'rizz_check slay {\n' * depth + 'x = 1\n' + '}\n' * depth + 'hawk_tuah(x)\n'
+    assert load(parsed(code)) is None
+    assert run_source(code, 'python') == '1\n'
+
+def test_emit_py_flag(tmp_path, capsys):
+    script = tmp_path / 'prog.bs'
+    script.write_text(PROGRAM)
+    main([str(script), '--no-cache', '-emit-py', '-engine=python'], 'bs', '.bs', 'banner')
+    out = capsys.readouterr().out
+    assert out.startswith('-> PYTHON:\ndef bs_program(env):')
+    assert out.endswith('\n2\n1\n')
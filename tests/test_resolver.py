@@ -0,0 +1,85 @@
+# test_resolver.py
+
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from interpreter import Environment, Frame, UNBOUND
+from resolver import function_layout, address
+
+def function(code):
+    return parse(iter_tokens(code))[0]
+
+def test_layout_puts_parameters_first_then_every_declaration():
+    func = function('cook f(a, b) {\n'
+                    '    sigma x = a\n'
+                    '    rizz_check x > 0 { tweet t = "s" } nah_fam { squad xs = [] }\n'
+                    '    yap i till 0 to 2 {\n        stash s = {}\n    }\n'
+                    '    flex cap {\n        sigma w = 1\n    }\n'
+                    '    sus {\n        sigma a = 2\n    } panik {\n        sigma e = 3\n    }\n'
+                    '    x = b\n'
+                    '}')
+    assert function_layout(func) == {'a': 0, 'b': 1, 'x': 2, 't': 3, 'xs': 4, 'i': 5, 's': 6,
+                                     'w': 7, 'e': 8}
+
+def test_undeclared_names_stay_dynamic():
+    layout = function_layout(function('cook f(a) {\n    sigma x = a + y\n}'))
+    assert address(layout, 'x') == (0, 1)
+    assert address(layout, 'y') is None
+    assert address(None, 'x') is None
+
+def test_frame_slots_and_fallback_to_the_caller():
+    root = Environment()
+    root.set('x', 'outer')
+    frame = Frame({'x': 0, 'n': 1}, root)
+    frame.set('n', 5)
+    assert frame.slots == [UNBOUND, 5]
+    # An undeclared slot reads and assigns through the caller chain
+    assert frame.get('x') == 'outer'
+    frame.set('x', 'updated', update_existing=True)
+    assert root.vars['x'] == 'updated' and frame.slots[0] is UNBOUND
+    frame.set('x', 'local')
+    assert frame.get('x') == 'local' and root.get('x') == 'updated'
+    # Names outside the layout still get a dict binding
+    frame.set('extra', 1)
+    assert frame.vars == {'extra': 1}
+
+DYNAMIC = '''sigma x = "global"
+cook show() {
+    yeet x
+}
+cook caller() {
+    sigma x = "caller"
+    yeet show()
+}
+cook before_declaring() {
+    sigma seen = x
+    sigma x = "late"
+    yeet seen + " " + x
+}
+cook assign_outer() {
+    x = "assigned"
+}
+cook counter() {
+    yap k till 1 to 3 {
+        sigma last = k
+    }
+    yeet last + k
+}
+hawk_tuah(show())
+hawk_tuah(caller())
+hawk_tuah(before_declaring())
+assign_outer()
+hawk_tuah(x)
+hawk_tuah(counter())
+'''
+
+def test_dynamic_scoping_with_slots(engine):
+    expected = 'global\ncaller\nglobal late\nassigned\n6\n'
+    assert run_source(DYNAMIC, engine) == expected
+    assert run_source(DYNAMIC, engine, optimize_ast=True) == expected
+
+def test_deep_call_chain_reads_the_nearest_binding(engine):
+    code = ('cook leaf() {\n    yeet depth\n}\n'
+            'cook down(n) {\n    sigma depth = n\n    rizz_check n == 0 { yeet leaf() }\n    yeet down(n - 1) + 0\n}\n'
+            'hawk_tuah(down(50))\n')
+    assert run_source(code, engine) == '0\n'
@@ -0,0 +1,63 @@
+# test_slices.py
+
+import pytest
+
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from interpreter import Squad, SquadView, slice_squad, builtin_sum
+
+def test_slice_syntax():
+    assert parse(iter_tokens('hawk_tuah(xs[1:-1])'))[0][1] == ('SLICE', 'xs', ('NUMBER', 1), ('NUMBER', -1), None)
+    assert parse(iter_tokens('hawk_tuah(xs[::2])'))[0][1] == ('SLICE', 'xs', None, None, ('NUMBER', 2))
+    assert parse(iter_tokens('hawk_tuah(xs[:])'))[0][1] == ('SLICE', 'xs', None, None, None)
+
+def test_slices_are_views_on_the_same_storage():
+    squad = Squad(list(range(10)))
+    part = slice_squad(squad, 2, 8, None)
+    assert part.items.__class__ is SquadView and part.items.base is squad.items
+    inner = slice_squad(part, 1, None, 2)
+    assert inner.items.base is squad.items
+    assert list(inner) == [3, 5, 7]
+    assert builtin_sum([inner]) == 15
+
+def test_writes_materialize_only_the_written_side():
+    squad = Squad([1, 2, 3, 4])
+    part = slice_squad(squad, None, None, -1)
+    part.set(0, 40)
+    assert list(part) == [40, 3, 2, 1] and list(squad) == [1, 2, 3, 4]
+    squad = Squad([1, 2, 3, 4])
+    part = slice_squad(squad, 1, 3, None)
+    squad.set(1, 20)
+    assert list(squad) == [1, 20, 3, 4] and list(part) == [2, 3]
+
+@pytest.mark.parametrize('bounds, message', [
+    ((0, 'x', None), 'Slice bounds must be integers, got str'),
+    ((1.0, None, None), 'Slice bounds must be integers, got float'),
+    ((None, None, 0), 'Slice step cannot be zero'),
+])
+def test_bad_bounds(bounds, message):
+    with pytest.raises(RuntimeError, match=message):
+        slice_squad(Squad([1, 2]), *bounds)
+
+SLICES = '''squad xs = [0, 1, 2, 3, 4, 5]
+squad head = xs[:3]
+hawk_tuah(head)
+hawk_tuah(xs[-2:])
+hawk_tuah(xs[::-2])
+squad mid = xs[1:5]
+hawk_tuah(mid[1:3])
+hawk_tuah(xs[4:1])
+head[0] = "h"
+xs[5] = "x"
+hawk_tuah(head)
+hawk_tuah(xs)
+hawk_tuah(head[-1])
+hawk_tuah(sum(xs[1:4]))
+sus { hawk_tuah(xs[::0]) } panik { hawk_tuah("zero step") }
+'''
+
+def test_slices_in_programs(engine):
+    expected = "[0, 1, 2]\n[4, 5]\n[5, 3, 1]\n[2, 3]\n[]\n['h', 1, 2]\n[0, 1, 2, 3, 4, 'x']\n2\n6\nzero step\n"
+    assert run_source(SLICES, engine) == expected
+    assert run_source(SLICES, engine, optimize_ast=True) == expected
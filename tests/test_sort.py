@@ -0,0 +1,68 @@
+# test_sort.py
+
+import pytest
+
+from conftest import run_source
+from interpreter import Environment, Squad, builtin_search
+
+def call(name, *args):
+    return Environment().get(name)[2](list(args))
+
+def test_sorted_returns_a_copy():
+    squad = Squad([3, 1, 2])
+    result = call('sorted', squad)
+    assert list(result) == [1, 2, 3] and list(squad) == [3, 1, 2]
+
+def test_sort_is_in_place_and_leaves_copies_alone():
+    squad = Squad([3, 1.5, 2])
+    twin = squad.copy()
+    assert call('sort', squad) == 'nvm'
+    assert list(squad) == [1.5, 2, 3] and list(twin) == [3, 1.5, 2]
+
+def test_mixed_ints_and_floats_compare_exactly():
+    big = 2 ** 53
+    assert list(call('sorted', Squad([big + 1, float(big), 1]))) == [1, float(big), big + 1]
+
+def test_search():
+    squad = Squad([1, 3, 5, 7])
+    assert [builtin_search([squad, value]) for value in (1, 5, 7, 4, 0, 8, 5.0)] == [0, 2, 3, -1, -1, -1, 2]
+    assert builtin_search([Squad([]), 1]) == -1
+
+@pytest.mark.parametrize('name, args, message', [
+    ('sorted', [Squad([1, 'a'])], r"sorted\(\) can't compare the elements of this squad"),
+    ('sort', [5], r'sort\(\) takes a squad and an optional key function'),
+    ('sorted', [Squad([1]), 5], r'sorted\(\) key must be a function'),
+    ('search', [Squad([1, 2]), 'a'], r"search\(\) can't compare the value with this squad"),
+    ('search', [Squad([1])], r'search\(\) takes a sorted squad and a value'),
+])
+def test_bad_arguments(name, args, message):
+    with pytest.raises(RuntimeError, match=message):
+        call(name, *args)
+
+SORTING = '''cook neg(x) {
+    yeet 0 - x
+}
+squad xs = [5, 2, 9, 1]
+squad ys = xs
+xs.sort()
+hawk_tuah(xs)
+hawk_tuah(ys)
+hawk_tuah(sorted(ys, neg))
+hawk_tuah(ys.sorted())
+squad words = ["ccc", "a", "bb"]
+sort(words, len)
+hawk_tuah(words)
+hawk_tuah(search(xs, 9))
+hawk_tuah(xs.search(3))
+'''
+
+def test_sorting_in_programs(engine):
+    expected = "[1, 2, 5, 9]\n[5, 2, 9, 1]\n[9, 5, 2, 1]\n[1, 2, 5, 9]\n['a', 'bb', 'ccc']\n3\n-1\n"
+    assert run_source(SORTING, engine) == expected
+    assert run_source(SORTING, engine, optimize_ast=True) == expected
+
+def test_key_functions_see_top_level_variables(engine):
+    code = ('sigma offset = 10\ncook dist(x) {\n    yeet (x - offset) * (x - offset)\n}\n'
+            'cook run() {\n    sigma offset = 0\n    yeet sorted([13, 1, 8, 20], dist)\n}\n'
+            'hawk_tuah(run())\n')
+    assert run_source(code, engine) == '[8, 13, 1, 20]\n'
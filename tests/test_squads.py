@@ -0,0 +1,146 @@
+# test_squads.py
+
+from array import array
+
+import pytest
+
+from conftest import run_source
+from interpreter import Squad, binary_op
+
+def test_numeric_squads_use_typed_storage():
+    assert Squad([1, 2, 3]).items == array('q', [1, 2, 3])
+    assert Squad([1.5, 2.0]).items == array('d', [1.5, 2.0])
+    assert Squad([1, 2.0]).items == [1, 2.0]
+    assert Squad([1, True]).items == [1, True]
+
+def test_writing_another_type_leaves_typed_storage():
+    squad = Squad([1, 2, 3])
+    squad.set(0, 'x')
+    assert squad.items == ['x', 2, 3]
+    squad = Squad([1, 2])
+    squad.append(2 ** 70)
+    assert squad.items == [1, 2, 2 ** 70]
+
+def test_arithmetic_with_a_number_is_element_wise():
+    squad = Squad([10, 20, 30])
+    assert binary_op(squad, '+', 1).items == array('q', [11, 21, 31])
+    assert binary_op(squad, '-', 0.5).items == array('d', [9.5, 19.5, 29.5])
+    assert binary_op(60, '/', squad).items == array('d', [6.0, 3.0, 2.0])
+    with pytest.raises(RuntimeError, match="Division by zero"):
+        binary_op(squad, '/', 0)
+
+def test_multiplying_by_an_int_repeats_the_squad():
+    assert list(binary_op(Squad([0]), '*', 3)) == [0, 0, 0]
+    assert list(binary_op(Squad([1, 2]), '*', 2)) == [1, 2, 1, 2]
+    assert list(binary_op(Squad(['a']), '*', 2)) == ['a', 'a']
+
+def test_ordering_comparisons_are_element_wise():
+    assert list(binary_op(Squad([1, 2, 3]), '>', 1)) == [False, True, True]
+    assert list(binary_op(2, '<=', Squad([1.0, 2.0, 3.0]))) == [False, True, True]
+    assert list(binary_op(Squad([2 ** 53 + 1]), '>', float(2 ** 53))) == [True]
+    assert binary_op(Squad([5]), '==', 5) is False
+    assert binary_op(Squad([1, 2]), '==', Squad([1, 2])) is True
+    with pytest.raises(TypeError):
+        binary_op(Squad(['a']), '>', 1)
+
+COMPARISONS = '''squad prices = [10, 20, 30]
+hawk_tuah(prices > 15)
+hawk_tuah(25 >= prices)
+squad cheap = prices < 20
+hawk_tuah(cheap[0])
+rizz_check prices > 5 { hawk_tuah("slay") } nah_fam { hawk_tuah("a squad is never slay") }
+sigma n = 0
+flex prices[n] < 30 {
+    n = n + 1
+}
+hawk_tuah(n)
+hawk_tuah(prices == 10)
+'''
+
+def test_comparisons_in_programs(engine):
+    expected = "['cap', 'slay', 'slay']\n['slay', 'slay', 'cap']\nslay\na squad is never slay\n2\ncap\n"
+    assert run_source(COMPARISONS, engine) == expected
+    assert run_source(COMPARISONS, engine, optimize_ast=True) == expected
+
+SCALE = '''squad prices = [10, 20, 30]
+hawk_tuah(scale(prices, 2))
+hawk_tuah(prices.scale(0.5))
+hawk_tuah(prices * 2)
+hawk_tuah(prices + 1)
+hawk_tuah(prices + [40])
+hawk_tuah(prices == 5)
+sus { scale(["a"], 2) } panik { hawk_tuah("strings don't scale") }
+'''
+
+def test_scale_and_repeat(engine):
+    expected = ("[20, 40, 60]\n[5.0, 10.0, 15.0]\n[10, 20, 30, 10, 20, 30]\n[11, 21, 31]\n"
+                "[10, 20, 30, 40]\ncap\nstrings don't scale\n")
+    assert run_source(SCALE, engine) == expected
+    assert run_source(SCALE, engine, optimize_ast=True) == expected
+
+def test_squad_conditions(engine):
+    # A squad is never slay, but comparing squads gives a plain boolean
+    code = ('squad xs = [1]\n'
+            'rizz_check xs { hawk_tuah("slay") } nah_fam { hawk_tuah("cap") }\n'
+            'rizz_check xs == xs frfr xs != [2] { hawk_tuah("same") }\n')
+    assert run_source(code, engine) == 'cap\nsame\n'
+    assert run_source(code, engine, optimize_ast=True) == 'cap\nsame\n'
+
+@pytest.mark.parametrize('declaration', ['squad xs = [1, 2]', 'squad xs = []', 'stash xs = {}', 'sigma xs = 0'])
+def test_calling_a_value_says_it_is_not_a_function(engine, declaration):
+    with pytest.raises(RuntimeError, match="'xs' is not a function"):
+        run_source(f'{declaration}\nxs(1)', engine)
+
+def test_copies_share_items_until_written():
+    original = Squad([1, 2, 3])
+    twin = original.copy()
+    assert twin.items is original.items
+    twin.set(0, 10)
+    assert list(original) == [1, 2, 3] and list(twin) == [10, 2, 3]
+    assert twin.items is not original.items
+    original.append(4)
+    assert list(original) == [1, 2, 3, 4] and list(twin) == [10, 2, 3]
+
+def test_nested_copies_share_nothing():
+    inner = Squad([1])
+    outer = Squad([inner, inner, {'k': inner}])
+    twin = outer.copy()
+    assert twin.items[0] is not inner
+    # An inner squad reachable twice is copied once
+    assert twin.items[0] is twin.items[1] is twin.items[2]['k']
+    twin.items[0].set(0, 99)
+    assert list(inner) == [1]
+
+def test_a_squad_holding_itself_can_be_copied():
+    squad = Squad([1])
+    squad.append(squad)
+    twin = squad.copy()
+    assert twin.items[1] is twin
+
+VALUE_SEMANTICS = '''squad xs = [1, 2, 3]
+squad ys = xs
+ys[0] = 10
+scooch(xs, 4)
+hawk_tuah(xs)
+hawk_tuah(ys)
+squad grid = [[1, 2], [3]]
+squad copy = grid
+squad row = copy[0]
+row[1] = 20
+scooch(copy[1], 4)
+hawk_tuah(grid)
+hawk_tuah(copy)
+cook poke(a) {
+    a[0] = "poked"
+}
+poke(xs)
+hawk_tuah(xs)
+hawk_tuah(ys)
+'''
+
+def test_squad_declarations_copy_and_arguments_share(engine):
+    # row is declared, so it is a copy too
+    expected = ("[1, 2, 3, 4]\n[10, 2, 3]\n[[1, 2], [3]]\n[[1, 2], [3, 4]]\n"
+                "['poked', 2, 3, 4]\n[10, 2, 3]\n")
+    assert run_source(VALUE_SEMANTICS, engine) == expected
+    assert run_source(VALUE_SEMANTICS, engine, optimize_ast=True) == expected
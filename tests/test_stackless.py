@@ -0,0 +1,50 @@
+# test_stackless.py
+
+import pytest
+
+import stackless
+from cli import main
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from stackless import Machine
+
+DEPTH = '''cook depth(n) {
+    rizz_check n == 0 { yeet 0 }
+    yeet 1 + depth(n - 1)
+}
+hawk_tuah(depth(N))
+'''
+
+def machine(code, budget=None):
+    return Machine(parse(iter_tokens(code)), budget=budget)
+
+def test_recursion_deeper_than_the_python_stack():
+    assert run_source(DEPTH.replace('N', '20000'), 'stackless') == '20000\n'
+
+def test_budget_bounds_recursion():
+    with pytest.raises(RuntimeError, match='Stack overflow: too delulu'):
+        machine(DEPTH.replace('N', '20000'), budget=64 * 1024).run()
+
+def test_overflow_can_be_caught(capsys):
+    code = DEPTH.replace('hawk_tuah(depth(N))\n', 'sus {\n    hawk_tuah(depth(100000))\n'
+                         '} panik {\n    hawk_tuah("too deep")\n}\nhawk_tuah(depth(10))\n')
+    assert machine(code, budget=64 * 1024).run()
+    assert capsys.readouterr().out == 'too deep\n10\n'
+
+def test_pause_and_resume(capsys):
+    m = machine('sigma x = 1\nhawk_tuah(x)\nx = x + 1\nhawk_tuah(x)\n')
+    assert not m.run(statements=2)
+    assert capsys.readouterr().out == '1\n'
+    assert not m.finished
+    assert m.run()
+    assert m.finished
+    assert capsys.readouterr().out == '2\n'
+
+def test_stack_budget_flag(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(stackless, 'memory_budget', stackless.DEFAULT_MEMORY_BUDGET)
+    script = tmp_path / 'prog.bs'
+    script.write_text(DEPTH.replace('N', '1000'))
+    main([str(script), '--no-cache', '-engine=stackless', '-stack-budget=1'], 'bs', '.bs', 'banner')
+    assert stackless.memory_budget == 1024 * 1024
+    assert capsys.readouterr().out == '1000\n'
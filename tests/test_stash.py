@@ -0,0 +1,61 @@
+# test_stash.py
+
+import pytest
+
+from conftest import run_source
+from lexer import iter_tokens
+from parser import Parser
+
+STASH = '''stash ages = {"bob": 3, "amy": 4, 7: slay}
+ages["cat"] = 10
+ages["bob"] = ages["bob"] + 1
+hawk_tuah(ages)
+hawk_tuah(has(ages, "cat"))
+hawk_tuah(ages.has("zed"))
+hawk_tuah(ages.keys())
+hawk_tuah(len(ages))
+stash copy = ages
+copy["bob"] = 99
+hawk_tuah(ages["bob"])
+hawk_tuah(copy["bob"])
+sus { hawk_tuah(ages["nope"]) } panik { hawk_tuah("missing") }
+squad xs = [1]
+sus { ages[xs] = 1 } panik { hawk_tuah("bad key") }
+cook build(n) {
+    stash t = {}
+    yap i till 0 to 3 {
+        t[i] = i * n
+    }
+    yeet t[3]
+}
+hawk_tuah(build(5))
+rizz_check ({"a": 1} == {"a": 1}) { hawk_tuah("equal") }
+'''
+
+def test_stash(engine):
+    expected = ("{'bob': 4, 'amy': 4, 7: 'slay', 'cat': 10}\nslay\ncap\n['bob', 'amy', 7, 'cat']\n4\n"
+                "4\n99\nmissing\nbad key\n15\nequal\n")
+    assert run_source(STASH, engine) == expected
+    assert run_source(STASH, engine, optimize_ast=True) == expected
+
+def parse_errors(code):
+    parser = Parser(iter_tokens(code))
+    ast = parser.parse()
+    return ast, [str(error) for error in parser.errors]
+
+@pytest.mark.parametrize('keyword', ['flex', 'rizz_check'])
+def test_missing_condition_is_a_targeted_error(keyword, capsys):
+    ast, errors = parse_errors(f'{keyword} {{\n  hawk_tuah(1)\n}}\nhawk_tuah(2)\n')
+    assert errors[0] == f"Expected a condition after '{keyword}', got LBRACE at line 1, column {len(keyword) + 2}"
+    # Parsing carries on after the block
+    assert ast[-1] == ('PRINT', ('NUMBER', 2))
+
+def test_stash_literal_condition_needs_parentheses(capsys):
+    ast, errors = parse_errors('flex ({} == {}) { skibidi }')
+    assert errors == []
+    assert ast == [('WHILE', ('BIN_OP', ('STASH', []), '==', ('STASH', [])), [('EXIT',)])]
+
+def test_recovery_steps_over_stray_braces(capsys):
+    ast, errors = parse_errors('}\n}\nsigma x = 1')
+    assert len(errors) == 2
+    assert ast == [('SIGMA_DECL', 'x', ('NUMBER', 1))]
@@ -0,0 +1,59 @@
+# test_tailcalls.py
+
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from runcache import RunCache
+from tailcalls import tail_call_body
+
+def marked(code):
+    return tail_call_body(parse(iter_tokens(code))[0], RunCache())
+
+def test_yeet_of_a_self_call_is_a_tail_call():
+    body = marked('cook count(n, acc) {\n'
+                  '    rizz_check n == 0 { yeet acc } nah_fam { yeet count(n - 1, acc + n) }\n'
+                  '}')
+    assert body[0][3][0][0] == 'TAIL_CALL' and body[0][3][0][2] is True
+
+def test_call_statements_that_end_the_function_are_tail_calls():
+    body = marked('cook loop(n) {\n    rizz_check n > 0 { loop(n - 1) }\n}')
+    assert body[0][2][0][::2] == ('TAIL_CALL', False)
+    body = marked('cook loop(n) {\n    loop(n - 1)\n    yeet nvm\n}')
+    assert [stmt[0] for stmt in body] == ['TAIL_CALL', 'RETURN']
+
+def test_other_calls_are_left_alone():
+    body = marked('cook f(n) {\n'
+                  '    f(n - 1)\n'
+                  '    yap i till 0 to 1 {\n        f(n - 1)\n    }\n'
+                  '    sus {\n        yeet f(n - 1)\n    } panik {\n        yeet 0\n    }\n'
+                  '    yeet 1 + f(n - 1)\n'
+                  '}')
+    assert 'TAIL_CALL' not in repr(body)
+
+ACCUMULATE = '''cook count(n, acc) {
+    rizz_check n == 0 { yeet acc }
+    yeet count(n - 1, acc + n)
+}
+sigma calls = 0
+cook spin(n) {
+    calls = calls + 1
+    rizz_check n > 0 { spin(n - 1) }
+}
+hawk_tuah(count(20000, 0))
+spin(10000)
+hawk_tuah(calls)
+'''
+
+def test_deep_tail_recursion_runs_in_constant_stack(engine):
+    assert run_source(ACCUMULATE, engine) == '200010000\n10001\n'
+    assert run_source(ACCUMULATE, engine, optimize_ast=True) == '200010000\n10001\n'
+
+def test_tail_calls_see_the_new_arguments_only(engine):
+    code = ('cook f(n, label) {\n    sigma seen = label\n'
+            '    rizz_check n == 0 { yeet seen }\n    yeet f(n - 1, label * 10 + n)\n}\n'
+            'hawk_tuah(f(3, 7))\n')
+    assert run_source(code, engine) == '7321\n'
+
+def test_tail_call_statement_returns_nvm(engine):
+    code = 'cook f(n) {\n    rizz_check n > 0 { f(n - 1) }\n}\nhawk_tuah(f(3))\n'
+    assert run_source(code, engine) == 'nvm\n'
@@ -0,0 +1,76 @@
+# test_typeinfer.py
+
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from typeinfer import infer_types
+
+def inferred(code, whole_program=True):
+    return infer_types(parse(iter_tokens(code)), whole_program)
+
+def kinds(ast):
+    return [stmt[0] for stmt in ast]
+
+def test_proven_types_skip_coercions():
+    ast, typed = inferred('sigma i = 0\ni = i + 1\ntweet t = "a"\nsigma k = 1 > 0\nsquad w = "word"\n')
+    assert ast == [('TYPED_DECL', 'i', ('NUMBER', 0), 'number'),
+                   ('TYPED_ASSIGN', 'i', ('BIN_OP', ('IDENTIFIER', 'i'), '+', ('NUMBER', 1)), 'number'),
+                   ('TYPED_DECL', 't', ('STRING', '"a"'), 'string'),
+                   ('TYPED_DECL', 'k', ('BIN_OP', ('NUMBER', 1), '>', ('NUMBER', 0)), 'bool'),
+                   ('TYPED_DECL', 'w', ('STRING', '"word"'), 'string')]
+    assert typed == 5
+
+def test_comparing_a_squad_is_not_a_bool():
+    ast, typed = inferred('squad xs = [1, 2]\nsigma k = xs > 1\nsigma j = 2 > 1\n')
+    assert kinds(ast) == ['SQUAD_DECL', 'SIGMA_DECL', 'TYPED_DECL']
+    assert ast[2][3] == 'bool'
+
+def test_unknown_types_keep_their_checks():
+    ast, typed = inferred('sigma g = gimme("?")\ng = g + 1\ntweet t = 5\nsquad xs = [1]\nstash s = {}\n')
+    assert kinds(ast) == ['SIGMA_DECL', 'VAR_ASSIGN', 'TWEET_DECL', 'SQUAD_DECL', 'STASH_DECL']
+    assert typed == 0
+
+def test_calls_forget_what_functions_assign():
+    code = ('sigma i = 0\nsigma j = 0\ncook f() {\n    i = "text"\n}\n'
+            'f()\ni = i + 1\nj = j + 1\n')
+    assert kinds(inferred(code)[0])[-2:] == ['VAR_ASSIGN', 'TYPED_ASSIGN']
+    # Without the whole program any function might assign j too
+    assert kinds(inferred(code, whole_program=False)[0])[-2:] == ['VAR_ASSIGN', 'VAR_ASSIGN']
+
+def test_callers_variables_are_never_typed_inside_functions():
+    ast, _ = inferred('cook f(n) {\n    sigma j = 0\n    j = j + n\n    outer = 1\n}\n')
+    assert kinds(ast[0][3]) == ['TYPED_DECL', 'VAR_ASSIGN', 'VAR_ASSIGN']
+
+def test_branches_join_their_types():
+    ast, _ = inferred('sigma x = 0\nrizz_check gimme("?") { x = "s" }\nx = x + 1\n'
+                      'sigma y = 0\nrizz_check gimme("?") { y = 2 } nah_fam { y = 3 }\ny = y + 1\n')
+    assert kinds(ast)[2] == 'VAR_ASSIGN'
+    assert kinds(ast)[-1] == 'TYPED_ASSIGN'
+
+COERCIONS = '''sigma i = 0
+yap k till 1 to 3 {
+    i = i + k
+}
+tweet t = i
+t = t + "!"
+sigma s = "4"
+s = s + 1
+sigma b = 2 > 1
+b = b + 1
+squad w = "word"
+squad xs = [1]
+xs = w
+tweet u = "x"
+u = 7
+hawk_tuah(i)
+hawk_tuah(t)
+hawk_tuah(s)
+hawk_tuah(b)
+hawk_tuah(xs)
+hawk_tuah(u + "!")
+'''
+
+def test_typed_programs_behave_the_same(engine):
+    expected = '6\n6!\n5.0\n2\nword\n7!\n'
+    assert run_source(COERCIONS, 'tree') == expected
+    assert run_source(COERCIONS, engine, optimize_ast=True) == expected
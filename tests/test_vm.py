@@ -0,0 +1,77 @@
+# test_vm.py
+
+import pytest
+
+from cli import main
+from conftest import run_source
+from lexer import iter_tokens
+from parser import parse
+from vm import compile_program, disassemble, OPCODES, JUMP_OPCODES
+
+def compiled(code):
+    return compile_program(parse(iter_tokens(code)))
+
+def opcodes(code):
+    return [OPCODES[code.instructions[i]] for i in range(0, len(code.instructions), 2)]
+
+LOOP = 'sigma x = 1\nyap i till 0 to 3 {\n    x = x + i\n}\nhawk_tuah(x)\n'
+
+def test_disassembly_of_a_loop():
+    assert disassemble(compiled(LOOP)) == '\n'.join([
+        "Disassembly of <program>:",
+        "     0 LOAD_CONST            0 (1)",
+        "     1 STORE_SIGMA           0 (x)",
+        "     2 GET_RANGE             1 ((0, 3))",
+        "     3 FOR_ITER              8 (to 8)",
+        "     4 STORE_NAME            1 (i)",
+        "     5 NAME_OP_NAME          2 (x + i)",
+        "     6 ASSIGN_NAME           0 (x)",
+        "     7 JUMP                  3 (to 3)",
+        "     8 LOAD_NAME             0 (x)",
+        "     9 PRINT",
+    ])
+
+def test_control_flow_becomes_jumps():
+    code = compiled('sigma k = 0\n'
+                    'flex k < 2 {\n    k = k + 1\n}\n'
+                    'rizz_check k == 2 { hawk_tuah("two") } nah_fam { hawk_tuah("other") }\n'
+                    'sus {\n    hawk_tuah(1 / 0)\n} panik {\n    hawk_tuah("caught")\n}\n')
+    ops = opcodes(code)
+    assert ops.count('JUMP_IF_FALSE') == 2
+    assert ['SETUP_SUS', 'SETUP_PANIK'] == [op for op in ops if op.startswith('SETUP')]
+    for position in range(len(code)):
+        if code.instructions[position * 2] in JUMP_OPCODES:
+            assert 0 <= code.instructions[position * 2 + 1] <= len(code)
+
+def test_functions_are_listed_after_the_program():
+    listing = disassemble(compiled('cook twice(n) {\n    yeet n * 2\n}\nhawk_tuah(twice(4))\n'))
+    program, function = listing.split('\n\n')
+    assert '(<function twice(n)>)' in program and '(twice, 1 args)' in program
+    assert function.splitlines()[0] == 'Disassembly of twice:'
+    assert 'RETURN_VALUE' in function
+
+def test_constant_pool_is_shared_but_typed():
+    code = compiled('hawk_tuah(1)\nhawk_tuah(1)\nhawk_tuah(1.0)\nhawk_tuah("1")\n')
+    assert code.consts == [1, 1.0, '1']
+    assert len(code.instructions) == 2 * len(code)
+
+def test_vm_runs_a_hot_loop():
+    code = 'sigma total = 0\nyap i till 0 to 20000 {\n    total = total + i\n}\nhawk_tuah(total)\n'
+    assert run_source(code, 'vm') == '200010000\n'
+
+def test_errors_unwind_to_the_enclosing_sus():
+    code = ('cook inner(d) {\n    yeet 10 / d\n}\ncook outer(d) {\n    yeet inner(d) + 1\n}\n'
+            'sus {\n    hawk_tuah(outer(0))\n} panik {\n    hawk_tuah("caught")\n}\nhawk_tuah(outer(5))\n')
+    assert run_source(code, 'vm') == 'caught\n3.0\n'
+
+def test_uncaught_errors_propagate():
+    with pytest.raises(RuntimeError, match='Division by zero'):
+        run_source('hawk_tuah(1 / 0)\n', 'vm')
+
+def test_dis_flag(tmp_path, capsys):
+    script = tmp_path / 'prog.bs'
+    script.write_text(LOOP)
+    main([str(script), '--no-cache', '-dis', '-engine=vm'], 'bs', '.bs', 'banner')
+    out = capsys.readouterr().out
+    assert out.startswith('-> BYTECODE:\nDisassembly of <program>:\n')
+    assert out.endswith('     9 PRINT\n7\n')